@@ -0,0 +1,112 @@
+"""
+Runs the benchmark suite and writes the results as JSON.
+
+    python -m benchmarks                               # every benchmark at 10, 100 and 1000 tests
+    python -m benchmarks --benchmarks status --sizes 10 100 --output results.json
+
+Each benchmark runs at each size in a fresh process, so that server state and peak memory don't carry over
+between runs.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timezone
+from importlib import metadata
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict
+
+from benchmarks.common import use_simulated_environment
+
+BENCHMARKS = {
+    "calls": "benchmarks.bench_calls",
+    "status": "benchmarks.bench_status",
+    "evaluation": "benchmarks.bench_evaluation",
+    "import": "benchmarks.bench_import",
+}
+DEFAULT_SIZES = [10, 100, 1000]
+
+def run_case(benchmark: str, size: int, output: str):
+    """
+    Runs one benchmark at one size in this process and writes its metrics to output.
+    """
+    use_simulated_environment()
+    module = __import__(BENCHMARKS[benchmark], fromlist=["run"])
+    metrics = asyncio.run(module.run(size))
+    with open(output, "w") as f:
+        json.dump(metrics, f)
+
+def spawn_case(benchmark: str, size: int, timeout: float, verbose: bool) -> Dict[str, Any]:
+    """
+    Runs one benchmark at one size in a child process and returns its result.
+    """
+    fd, output = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks", "--case", benchmark, "--size", str(size), "--case-output", output],
+            stdout=None if verbose else subprocess.DEVNULL,
+            stderr=None if verbose else subprocess.PIPE,
+            timeout=timeout,
+            text=True,
+        )
+        if completed.returncode != 0:
+            stderr = (completed.stderr or "").strip().splitlines()
+            return {"benchmark": benchmark, "size": size, "error": stderr[-1] if stderr else f"exit code {completed.returncode}"}
+        with open(output) as f:
+            return {"benchmark": benchmark, "size": size, "metrics": json.load(f)}
+    except subprocess.TimeoutExpired:
+        return {"benchmark": benchmark, "size": size, "error": f"timed out after {timeout}s"}
+    finally:
+        os.remove(output)
+
+def environment() -> Dict[str, Any]:
+    try:
+        version = metadata.version("fixa-dev")
+    except metadata.PackageNotFoundError:
+        version = None
+    return {
+        "fixa_version": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the fixa test runner against local stand-ins.")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="numbers of concurrent tests")
+    parser.add_argument("--output", type=str, help="file to write the results to (stdout if not given)")
+    parser.add_argument("--timeout", type=float, default=900, help="seconds before a single run is abandoned")
+    parser.add_argument("--verbose", action="store_true", help="show the output of each run")
+    parser.add_argument("--case", choices=list(BENCHMARKS), help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--case-output", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case is not None:
+        run_case(args.case, args.size, args.case_output)
+        return
+
+    results = []
+    for benchmark in args.benchmarks:
+        for size in args.sizes:
+            print(f"⏱️  {benchmark} @ {size}...", file=sys.stderr, flush=True)
+            result = spawn_case(benchmark, size, args.timeout, args.verbose)
+            if "error" in result:
+                print(f"❌ {benchmark} @ {size}: {result['error']}", file=sys.stderr, flush=True)
+            results.append(result)
+
+    document = json.dumps({"environment": environment(), "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Runs `size` concurrent outbound tests end to end through TestRunner, which places its calls in-process with the
+server's place_outbound_call, then the /ws route and the real bot pipeline, against the simulated carrier and stub bot services.
+"""
+import time
+from typing import Any, Dict
+
+from benchmarks.common import Stopwatch, free_port, peak_rss_bytes, summarize
+
+async def run(size: int) -> Dict[str, Any]:
+    from fixa import Agent, Evaluation, Scenario, Test, TestRunner
+    from fixa.bot_services import set_bot_service_factory
+    from fixa.metrics import EventLoopLagMonitor
+    from fixa.testing import SimulatedCallScript, SimulatedCarrier, StubBotServiceFactory
+
+    port = free_port()
+    server_url = f"http://127.0.0.1:{port}"
+    # The simulated agent speaks long enough for the bot's VAD to pick it up even when the event loop lags, then waits
+    # (up to silence_seconds) for the bot's reply to finish before hanging up
+    script = SimulatedCallScript(turns=1, speech_seconds=1.0, silence_seconds=15.0, response_delay_seconds=0.25, recording_delay_seconds=2.0)
+    async with SimulatedCarrier(server_url, script=script) as carrier:
+        set_bot_service_factory(StubBotServiceFactory(twilio_client=carrier))
+        test_runner = TestRunner(port=port, ngrok_url=server_url, twilio_phone_number="+15550000000")
+        scenario = Scenario(
+            name="benchmark",
+            prompt="order a dozen donuts",
+            evaluations=[Evaluation(name="order_success", prompt="the order was successful")],
+        )
+        for i in range(size):
+            test_runner.add_test(Test(scenario=scenario, agent=Agent(name=f"agent_{i}", prompt="you are a simulated caller")))
+
+        rss_before = peak_rss_bytes()
+        started = time.monotonic()
+        async with EventLoopLagMonitor(interval=0.05, keep_samples=True) as lag:
+            with Stopwatch() as wall:
+                test_results = await test_runner.run_tests(phone_number="+15551111111")
+        rss_after = peak_rss_bytes()
+
+    calls = list(carrier.calls_by_sid.values())
+    placing_seconds = max((call.created_at for call in calls), default=started) - started
+    answer_latencies = [call.answered_at - call.created_at for call in calls if call.answered_at is not None]
+    # How long the bot took to answer once the simulated agent stopped speaking
+    response_latencies = [
+        call.first_media_at - call.answered_at - script.speech_seconds
+        for call in calls
+        if call.first_media_at is not None and call.answered_at is not None
+    ]
+    calls_with_bot_audio = sum(1 for call in calls if call.first_media_at is not None)
+    if calls and not calls_with_bot_audio:
+        # Without any bot audio there is no response latency to report, so don't pass this off as a result
+        raise RuntimeError(f"None of the {len(calls)} calls got audio from the bot")
+    return {
+        "calls_placed": len(calls),
+        "calls_failed": sum(1 for result in test_results if result.error is not None),
+        "calls_with_bot_audio": calls_with_bot_audio,
+        "wall_seconds": round(wall.elapsed, 3),
+        "calls_placed_per_second": round(len(calls) / placing_seconds, 3) if placing_seconds > 0 else None,
+        "calls_completed_per_second": round(len(test_results) / wall.elapsed, 3),
+        "peak_rss_bytes": rss_after,
+        "memory_per_call_bytes": (rss_after - rss_before) // size if size else None,
+        **summarize(answer_latencies, "answer_ms", scale=1000),
+        **summarize(response_latencies, "bot_response_ms", scale=1000),
+        **summarize(lag.samples, "loop_lag_ms", scale=1000),
+    }
@@ -0,0 +1,62 @@
+"""
+Measures evaluation throughput for `size` completed calls against the OpenAI stub: one request per call on the
+evaluation pool, batched requests with `evaluate_batch`, and a fully cached rerun.
+"""
+from typing import Any, Dict
+
+from benchmarks.common import Stopwatch, sample_transcript
+
+async def run(size: int) -> Dict[str, Any]:
+    from fixa import Evaluation, Scenario
+    from fixa.evaluators import CachedEvaluator, EvaluationRequest, InMemoryEvaluationCache, LocalEvaluator
+    from fixa.test_runner.evaluation_pool import EvaluationPool
+    from fixa.testing import create_openai_stub_app, create_openai_stub_client
+
+    scenario = Scenario(
+        name="benchmark",
+        prompt="order a dozen donuts",
+        evaluations=[
+            Evaluation(name="order_success", prompt="the order was successful"),
+            Evaluation(name="polite", prompt="the agent was polite"),
+        ],
+    )
+    transcript = sample_transcript()
+    # Distinct transcripts, so that the cache can't collapse calls
+    requests = [
+        EvaluationRequest(scenario=scenario, transcript=transcript + [{"role": "user", "content": f"call {i}"}], stereo_recording_url="")
+        for i in range(size)
+    ]
+    results: Dict[str, Any] = {}
+
+    # One request per call, on the same pool TestRunner uses
+    app = create_openai_stub_app()
+    evaluator = LocalEvaluator(client=create_openai_stub_client(app))
+    async def evaluate(call_id: str):
+        request = requests[int(call_id)]
+        await evaluator.evaluate(request.scenario, request.transcript, request.stereo_recording_url)
+    pool = EvaluationPool(evaluate)
+    with Stopwatch() as wall:
+        pool.start()
+        for i in range(size):
+            pool.submit(str(i))
+        await pool.join()
+    results["pooled_calls_per_second"] = round(size / wall.elapsed, 3)
+    results["pooled_requests"] = app.state.requests
+    results["pooled_prompt_chars"] = app.state.prompt_chars
+
+    # Several calls per request
+    app = create_openai_stub_app()
+    evaluator = LocalEvaluator(client=create_openai_stub_client(app))
+    cached = CachedEvaluator(evaluator, cache=InMemoryEvaluationCache(max_entries=size))
+    with Stopwatch() as wall:
+        await cached.evaluate_batch(requests)
+    results["batched_calls_per_second"] = round(size / wall.elapsed, 3)
+    results["batched_requests"] = app.state.requests
+    results["batched_prompt_chars"] = app.state.prompt_chars
+
+    # The same calls again, all served from the cache
+    with Stopwatch() as wall:
+        await cached.evaluate_batch(requests)
+    results["cached_calls_per_second"] = round(size / wall.elapsed, 3)
+    results["cache_hits"] = cached.hits
+    return results
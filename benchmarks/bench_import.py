@@ -0,0 +1,59 @@
+"""
+Measures the cost of importing fixa in a fresh interpreter: `import fixa` followed by defining `size` tests,
+as a test collection step would, and importing the test runner. Also counts the heavy dependencies each one
+loads, which `import fixa` alone should leave out.
+"""
+import asyncio
+import json
+import sys
+from typing import Any, Dict, List
+
+from benchmarks.common import summarize
+
+SAMPLES = 5
+HEAVY_MODULES = ["pipecat", "twilio", "uvicorn", "fastapi", "aiohttp", "openai", "dotenv", "loguru", "numpy", "scipy"]
+
+SNIPPETS = {
+    "define_tests": (
+        "import fixa\n"
+        "tests = [fixa.Test(scenario=fixa.Scenario(name=f'scenario_{{i}}', prompt='order a dozen donuts', "
+        "evaluations=[fixa.Evaluation(name='order_success', prompt='the order was successful')]), "
+        "agent=fixa.Agent(name=f'agent_{{i}}', prompt='you are a simulated caller')) for i in range({size})]\n"
+    ),
+    "test_runner": "from fixa import TestRunner\n",
+}
+
+# Times the snippet and reports its peak memory and the heavy modules it loaded, as JSON
+TEMPLATE = """
+import json, resource, sys, time
+start = time.perf_counter()
+{snippet}
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "seconds": elapsed,
+    "peak_rss_bytes": peak if sys.platform == "darwin" else peak * 1024,
+    "heavy_modules": sorted({{name.split(".")[0] for name in sys.modules}} & set({heavy_modules!r})),
+}}))
+"""
+
+async def _sample(snippet: str) -> Dict[str, Any]:
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", TEMPLATE.format(snippet=snippet, heavy_modules=HEAVY_MODULES),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(stderr.decode().strip().splitlines()[-1])
+    return json.loads(stdout.decode().strip().splitlines()[-1])
+
+async def run(size: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for name, snippet in SNIPPETS.items():
+        # One at a time, so that the samples don't compete for the CPU
+        samples: List[Dict[str, Any]] = [await _sample(snippet.format(size=size)) for _ in range(SAMPLES)]
+        results.update(summarize([sample["seconds"] for sample in samples], f"{name}_ms", scale=1000))
+        results[f"{name}_peak_rss_bytes"] = max(sample["peak_rss_bytes"] for sample in samples)
+        results[f"{name}_heavy_modules"] = samples[-1]["heavy_modules"]
+    return results
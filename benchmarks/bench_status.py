@@ -0,0 +1,44 @@
+"""
+Measures /status payload size and latency with `size` calls on the server, for full polls and for
+incremental polls that pick up a single changed call.
+"""
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import sample_transcript, summarize
+
+POLLS = 50
+
+async def _poll(client, params: Dict[str, Any]) -> Dict[str, Any]:
+    latencies: List[float] = []
+    size = 0
+    for _ in range(POLLS):
+        start = time.perf_counter()
+        response = await client.get("/status", params=params)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        size = len(response.content)
+    return {"bytes": size, **summarize(latencies, "ms", scale=1000)}
+
+async def run(size: int) -> Dict[str, Any]:
+    import httpx
+    from fixa.test_runner import server
+
+    transcript = sample_transcript()
+    recording_url = "https://api.twilio.com/2010-04-01/Accounts/ACsimulated/Recordings/RE0"
+    for i in range(size):
+        server.set_call_status(f"CA{i:032d}", "completed", transcript=transcript, stereo_recording_url=recording_url)
+
+    results: Dict[str, Any] = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://server") as client:
+        for name, value in (await _poll(client, {})).items():
+            results[f"full_{name}"] = value
+
+        # An incremental poll after one call changed
+        cursor = server.get_state_store().cursor
+        server.set_call_status(f"CA{0:032d}", "completed", transcript=transcript, stereo_recording_url=recording_url)
+        for name, value in (await _poll(client, {"since": cursor})).items():
+            results[f"delta_{name}"] = value
+        for name, value in (await _poll(client, {"since": cursor, "include_transcript": True})).items():
+            results[f"delta_with_transcript_{name}"] = value
+    return results
@@ -0,0 +1,71 @@
+import os
+import resource
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+from fixa.metrics import percentile
+
+SIMULATED_ENV_VARS = ["OPENAI_API_KEY", "DEEPGRAM_API_KEY", "CARTESIA_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "NGROK_AUTH_TOKEN"]
+
+def use_simulated_environment():
+    """
+    Sets placeholder credentials so TestRunner starts without any real services, and turns off telemetry.
+    Must be called before a TestRunner is created.
+    """
+    for env_var in SIMULATED_ENV_VARS:
+        os.environ.setdefault(env_var, "simulated")
+    os.environ["ANONYMIZED_TELEMETRY"] = "false"
+
+def free_port() -> int:
+    """
+    Returns a local TCP port that nothing is listening on.
+    """
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def peak_rss_bytes() -> int:
+    """
+    Returns the peak resident set size of this process.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def summarize(values: List[float], prefix: str, scale: float = 1) -> Dict[str, Optional[float]]:
+    """
+    Summarizes samples as {prefix}_p50, {prefix}_p95, {prefix}_p99 and {prefix}_max, multiplied by scale.
+    Percentiles are by nearest rank, as in the runner's own latency summaries.
+    """
+    def scaled(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * scale, 3)
+    return {
+        f"{prefix}_p50": scaled(percentile(values, 50)),
+        f"{prefix}_p95": scaled(percentile(values, 95)),
+        f"{prefix}_p99": scaled(percentile(values, 99)),
+        f"{prefix}_max": scaled(max(values) if values else None),
+    }
+
+def sample_transcript(turns: int = 10) -> List[Dict[str, str]]:
+    """
+    Returns a transcript of a call with the given number of back-and-forth turns.
+    """
+    transcript = [{"role": "system", "content": "you are a simulated caller ordering a dozen donuts with sprinkles"}]
+    for i in range(turns):
+        transcript.append({"role": "assistant", "content": f"this is what the simulated caller says on turn {i}"})
+        transcript.append({"role": "user", "content": f"this is what the agent under test answers on turn {i}"})
+    return transcript
+
+class Stopwatch:
+    """
+    Measures wall time with time.perf_counter.
+    """
+    def __enter__(self) -> "Stopwatch":
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self.start
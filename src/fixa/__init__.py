@@ -1,8 +1,36 @@
+from typing import TYPE_CHECKING
+
 from .agent import Agent
 from .evaluation import Evaluation
 from .scenario import Scenario
 from .test import Test
-from .test_runner.service import TestRunner
-from .test_runner.views import TestResult
 
-__all__ = ['Agent', 'Evaluation', 'Scenario', 'Test', 'TestRunner', 'TestResult']
+if TYPE_CHECKING:
+    from .test_runner.numbers import PhoneNumberPool
+    from .test_runner.service import TestRunner
+    from .test_runner.sharded import Shard, ShardedTestRunner
+    from .test_runner.views import TestResult
+
+# The test runner pulls in the server, pipecat and every service client, so it is only imported
+# once one of these is first used. Defining agents, scenarios and tests stays cheap.
+_LAZY_ATTRIBUTES = {
+    'TestRunner': '.test_runner.service',
+    'TestResult': '.test_runner.views',
+    'Shard': '.test_runner.sharded',
+    'ShardedTestRunner': '.test_runner.sharded',
+    'PhoneNumberPool': '.test_runner.numbers',
+}
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    # Cache it, so later lookups don't come back here
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
+
+__all__ = ['Agent', 'Evaluation', 'Scenario', 'Test', 'TestRunner', 'TestResult', 'Shard', 'ShardedTestRunner', 'PhoneNumberPool']
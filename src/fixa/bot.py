@@ -1,11 +1,8 @@
-import os
-from typing import List
+from typing import List, Optional
 import asyncio
 
 from openai.types.chat import ChatCompletionMessageParam, ChatCompletionToolParam
-from twilio.rest import Client
 
-from pipecat.audio.vad.silero import SileroVADAnalyzer
 from pipecat.frames.frames import EndFrame, EndTaskFrame
 from pipecat.processors.frame_processor import FrameDirection
 from pipecat.pipeline.pipeline import Pipeline
@@ -13,9 +10,6 @@ from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
 from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
 from pipecat.serializers.twilio import TwilioFrameSerializer
-from pipecat.services.cartesia import CartesiaTTSService
-from pipecat.services.deepgram import DeepgramSTTService
-from pipecat.services.openai import OpenAILLMService
 from pipecat.transports.network.fastapi_websocket import (
     FastAPIWebsocketParams,
     FastAPIWebsocketTransport,
@@ -25,16 +19,36 @@ import sys
 
 from fixa.scenario import Scenario
 from fixa.agent import Agent
-
-logger.remove(0)
-logger.add(sys.stderr, level="DEBUG")
+from fixa.bot_services import get_bot_service_factory
+from fixa.bot_timing import AgentTurnTracker, FrameProbe, TurnLatencyTracker
+from fixa.metrics import CallTimings
+from fixa.telephony import run_twilio_request
+
+_logger_configured = False
+
+def configure_logger():
+    """
+    Sends pipecat's logs to stderr at DEBUG level, the first time a bot runs.
+    This happens on first use rather than on import, and only if loguru still has its default handler,
+    so that an application that configured loguru itself keeps its configuration.
+    """
+    global _logger_configured
+    if _logger_configured:
+        return
+    _logger_configured = True
+    try:
+        logger.remove(0)
+    except ValueError:
+        return
+    logger.add(sys.stderr, level="DEBUG")
 
 class Bot:
-    def __init__(self, websocket_client, stream_sid, call_sid):
+    def __init__(self, websocket_client, stream_sid, call_sid, timings: Optional[CallTimings] = None):
         self.websocket_client = websocket_client
         self.stream_sid = stream_sid
         self.call_sid = call_sid
-        self.twilio_client = Client(os.getenv("TWILIO_ACCOUNT_SID"), os.getenv("TWILIO_AUTH_TOKEN"))
+        self.timings = timings if timings is not None else CallTimings()
+        self.twilio_client = get_bot_service_factory().twilio_client
         self.task = None
         self.transport = None
 
@@ -43,7 +57,7 @@ class Bot:
 
     async def end_call(self, function_name, tool_call_id, args, llm, context, result_callback):
         print("ending call!")
-        self.twilio_client.calls(self.call_sid).update(twiml=self.get_end_call_twiml())
+        await run_twilio_request(self.twilio_client.calls(self.call_sid).update, twiml=self.get_end_call_twiml())
         await llm.push_frame(EndTaskFrame(), FrameDirection.UPSTREAM)
 
     async def on_client_connected(self, transport, client):
@@ -59,19 +73,22 @@ class Bot:
         await self.task.queue_frames([EndFrame()])
 
     async def run(self, agent: Agent, scenario: Scenario):
+        configure_logger()
+        services = get_bot_service_factory()
+        vad_analyzer = services.create_vad_analyzer()
         self.transport = FastAPIWebsocketTransport(
             websocket=self.websocket_client,
             params=FastAPIWebsocketParams(
                 audio_out_enabled=True,
                 add_wav_header=False,
                 vad_enabled=True,
-                vad_analyzer=SileroVADAnalyzer(),
+                vad_analyzer=vad_analyzer,
                 vad_audio_passthrough=True,
                 serializer=TwilioFrameSerializer(self.stream_sid),
             ),
         )
 
-        llm = OpenAILLMService(api_key=os.getenv("OPENAI_API_KEY") or "", model="gpt-4o")
+        llm = services.create_llm(model="gpt-4o")
         llm.register_function("end_call", self.end_call)
 
         tools = [
@@ -84,11 +101,10 @@ class Bot:
             )
         ]
 
-        stt = DeepgramSTTService(api_key=os.getenv("DEEPGRAM_API_KEY") or "")
-        tts = CartesiaTTSService(
-            api_key=os.getenv("CARTESIA_API_KEY") or "",
-            voice_id=agent.voice_id,
-        )
+        # Use the services connected while the call was ringing, if there are any
+        prewarmed = await services.claim_prewarmed(self.call_sid)
+        stt = prewarmed.stt if prewarmed is not None else services.create_stt()
+        tts = prewarmed.tts if prewarmed is not None else services.create_tts(voice_id=agent.voice_id)
 
         self.messages: List[ChatCompletionMessageParam] = [
             {
@@ -108,14 +124,28 @@ class Bot:
         context = OpenAILLMContext(self.messages, tools)
         self.context_aggregator = llm.create_context_aggregator(context)
 
+        # Probes between the stages time each of the bot's turns, and each of the agent's
+        latency = TurnLatencyTracker(self.timings)
+        agent_turns = AgentTurnTracker(
+            self.timings,
+            vad_start_secs=vad_analyzer.params.start_secs,
+            vad_stop_secs=vad_analyzer.params.stop_secs,
+        )
+
         pipeline = Pipeline(
             [
                 self.transport.input(),
+                FrameProbe(agent_turns.after_input),
                 stt,
+                FrameProbe(latency.after_stt),
                 self.context_aggregator.user(),
+                FrameProbe(latency.after_context),
                 llm,
+                FrameProbe(latency.after_llm),
                 tts,
+                FrameProbe(latency.after_tts),
                 self.transport.output(),
+                FrameProbe(agent_turns.after_output),
                 self.context_aggregator.assistant(),
             ]
         )
@@ -130,8 +160,8 @@ class Bot:
 
         return self.messages
 
-async def run_bot(agent: Agent, scenario: Scenario, websocket_client, stream_sid, call_sid):
-    bot = Bot(websocket_client, stream_sid, call_sid)
+async def run_bot(agent: Agent, scenario: Scenario, websocket_client, stream_sid, call_sid, timings: Optional[CallTimings] = None):
+    bot = Bot(websocket_client, stream_sid, call_sid, timings)
     try:
         transcript = await bot.run(agent, scenario)
         return transcript
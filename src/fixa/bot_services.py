@@ -0,0 +1,256 @@
+import asyncio
+import copy
+from dataclasses import dataclass
+from importlib import resources
+import os
+from typing import Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from twilio.rest import Client
+
+from pipecat.audio.vad.silero import SileroOnnxModel, SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
+from pipecat.services.ai_services import LLMService, STTService, TTSService
+from pipecat.services.cartesia import CartesiaTTSService
+from pipecat.services.deepgram import DeepgramSTTService
+from pipecat.services.openai import OpenAILLMService
+from loguru import logger
+
+from fixa.telephony import create_twilio_client
+
+# Seconds that pre-warmed services wait to be claimed by their call's bot before they are closed
+PREWARM_TTL = 60
+
+def load_silero_model() -> SileroOnnxModel:
+    """
+    Loads the Silero VAD model that ships with pipecat, the way SileroVADAnalyzer does.
+    """
+    model_path = resources.files("pipecat.audio.vad.data").joinpath("silero_vad.onnx")
+    return SileroOnnxModel(str(model_path), force_onnx_cpu=True)
+
+class SharedSileroVADAnalyzer(SileroVADAnalyzer):
+    """
+    A Silero VAD analyzer that runs on an already loaded model.
+
+    The model's ONNX session itself is stateless (the recurrent state is passed in on every run),
+    so each analyzer works on a copy of the model that shares its session but keeps its own state.
+    This relies on the internals of SileroVADAnalyzer in the pinned pipecat version.
+    """
+    def __init__(self, model: SileroOnnxModel, *, sample_rate: int = 16000, params: VADParams = VADParams()):
+        # Skip SileroVADAnalyzer.__init__, which would load the model again
+        VADAnalyzer.__init__(self, sample_rate=sample_rate, num_channels=1, params=params)
+        if sample_rate != 16000 and sample_rate != 8000:
+            raise ValueError("Silero VAD sample rate needs to be 16000 or 8000")
+
+        self._model = copy.copy(model)
+        self._model.reset_states()
+        self._last_reset_time = 0
+
+class SharedClientOpenAILLMService(OpenAILLMService):
+    """
+    An OpenAI LLM service that uses an existing AsyncOpenAI client instead of creating its own.
+    """
+    def __init__(self, *, client: AsyncOpenAI, **kwargs):
+        self._shared_client = client
+        super().__init__(**kwargs)
+
+    def create_client(self, api_key=None, base_url=None, **kwargs):
+        return self._shared_client
+
+class PrewarmedDeepgramSTTService(DeepgramSTTService):
+    """
+    A Deepgram STT service that can open its websocket before its pipeline starts.
+    The pipeline then uses that connection instead of opening its own.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._prewarmed = False
+
+    async def prewarm(self):
+        await self._connect()
+        self._prewarmed = self._connection.is_connected
+
+    async def _connect(self):
+        if self._prewarmed:
+            self._prewarmed = False
+            return
+        await super()._connect()
+
+class PrewarmedCartesiaTTSService(CartesiaTTSService):
+    """
+    A Cartesia TTS service that can open its websocket before its pipeline starts.
+    The pipeline then uses that connection instead of opening its own.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._prewarmed = False
+
+    async def prewarm(self):
+        await self._connect_websocket()
+        self._prewarmed = self._websocket is not None
+
+    async def _connect_websocket(self):
+        if self._prewarmed:
+            self._prewarmed = False
+            return
+        await super()._connect_websocket()
+
+@dataclass
+class PrewarmedServices:
+    """The services created for a call while it was ringing.
+
+    Attributes:
+        stt (STTService): The call's STT service, connected if it supports it
+        tts (TTSService): The call's TTS service, connected if it supports it
+    """
+    stt: STTService
+    tts: TTSService
+
+async def _close_service(service):
+    # Only a connection opened by prewarm needs closing, as the service never joined a pipeline
+    try:
+        if isinstance(service, PrewarmedDeepgramSTTService):
+            await service._disconnect()
+        elif isinstance(service, PrewarmedCartesiaTTSService):
+            await service._disconnect_websocket()
+    except Exception as e:
+        logger.warning(f"Failed to close pre-warmed {service}: {e}")
+
+class BotServiceFactory:
+    """
+    Creates the services used by each bot, sharing everything that can safely be shared between calls.
+
+    The Silero model is loaded once and reused by every call's VAD analyzer, and the Twilio and OpenAI
+    clients (with their connection pools) are shared by every bot in the process.
+
+    A call's STT and TTS services can also be created and connected while the call is ringing, with
+    `prewarm`, so that its bot doesn't wait for those connections once the call is answered.
+    """
+    def __init__(self):
+        self._vad_model: Optional[SileroOnnxModel] = None
+        self._twilio_client: Optional[Client] = None
+        self._openai_client: Optional[AsyncOpenAI] = None
+        self._openai_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._openai_client_warm = False
+        self._prewarmed: Dict[str, asyncio.Task] = {}
+
+    def preload(self):
+        """
+        Loads the VAD model ahead of the first call.
+        """
+        if self._vad_model is None:
+            self._vad_model = load_silero_model()
+
+    @property
+    def twilio_client(self) -> Client:
+        if self._twilio_client is None:
+            self._twilio_client = create_twilio_client()
+        return self._twilio_client
+
+    def create_vad_analyzer(self) -> VADAnalyzer:
+        self.preload()
+        assert self._vad_model is not None
+        return SharedSileroVADAnalyzer(self._vad_model)
+
+    def _get_openai_client(self) -> AsyncOpenAI:
+        # httpx clients are bound to the event loop they were first used on
+        loop = asyncio.get_running_loop()
+        if self._openai_client is None or self._openai_client_loop is not loop:
+            self._openai_client = AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY") or "",
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(max_keepalive_connections=100, max_connections=1000, keepalive_expiry=None)
+                ),
+            )
+            self._openai_client_loop = loop
+            self._openai_client_warm = False
+        return self._openai_client
+
+    def create_llm(self, model: str = "gpt-4o") -> LLMService:
+        return SharedClientOpenAILLMService(client=self._get_openai_client(), model=model)
+
+    def create_stt(self) -> STTService:
+        return PrewarmedDeepgramSTTService(api_key=os.getenv("DEEPGRAM_API_KEY") or "")
+
+    def create_tts(self, voice_id: str) -> TTSService:
+        return PrewarmedCartesiaTTSService(
+            api_key=os.getenv("CARTESIA_API_KEY") or "",
+            voice_id=voice_id,
+        )
+
+    async def warm_llm(self):
+        """
+        Opens the first connection of the shared OpenAI client's pool, which its keep-alive connections then reuse.
+        """
+        client = self._get_openai_client()
+        if self._openai_client_warm:
+            return
+        self._openai_client_warm = True
+        try:
+            await client.models.list()
+        except Exception as e:
+            logger.warning(f"Failed to warm the OpenAI client: {e}")
+
+    def prewarm(self, call_sid: str, voice_id: str):
+        """
+        Starts creating and connecting a call's services in the background, e.g. while the call is ringing.
+        The call's bot picks them up with `claim_prewarmed`. If it doesn't within PREWARM_TTL seconds, they are closed.
+        Args:
+            call_sid: The call to pre-warm services for.
+            voice_id: The voice of the call's TTS service.
+        """
+        if call_sid in self._prewarmed:
+            return
+        self._prewarmed[call_sid] = asyncio.create_task(self._prewarm(voice_id))
+        asyncio.get_running_loop().call_later(PREWARM_TTL, self.discard_prewarmed, call_sid)
+
+    async def _prewarm(self, voice_id: str) -> PrewarmedServices:
+        services = PrewarmedServices(stt=self.create_stt(), tts=self.create_tts(voice_id))
+        await asyncio.gather(
+            *(service.prewarm() for service in (services.stt, services.tts) if hasattr(service, "prewarm")),
+            self.warm_llm(),
+        )
+        return services
+
+    async def claim_prewarmed(self, call_sid: str) -> Optional[PrewarmedServices]:
+        """
+        Returns the services pre-warmed for a call, waiting for them to finish connecting,
+        or None if there are none or pre-warming failed.
+        """
+        task = self._prewarmed.pop(call_sid, None)
+        if task is None:
+            return None
+        try:
+            return await task
+        except Exception as e:
+            logger.warning(f"Pre-warming services for call {call_sid} failed: {e}")
+            return None
+
+    def discard_prewarmed(self, call_sid: str):
+        """
+        Closes the services pre-warmed for a call that won't use them, e.g. because it wasn't answered.
+        """
+        task = self._prewarmed.pop(call_sid, None)
+        if task is None:
+            return
+
+        def close(task: asyncio.Task):
+            if task.cancelled() or task.exception() is not None:
+                return
+            services = task.result()
+            for service in (services.stt, services.tts):
+                asyncio.create_task(_close_service(service))
+
+        task.add_done_callback(close)
+
+_bot_service_factory = BotServiceFactory()
+
+def get_bot_service_factory() -> BotServiceFactory:
+    """Get the process-wide bot service factory."""
+    return _bot_service_factory
+
+def set_bot_service_factory(factory: BotServiceFactory):
+    """Replace the process-wide bot service factory."""
+    global _bot_service_factory
+    _bot_service_factory = factory
@@ -0,0 +1,157 @@
+import time
+from typing import Callable, Optional
+
+from pipecat.frames.frames import (
+    Frame,
+    OutputAudioRawFrame,
+    StartInterruptionFrame,
+    TextFrame,
+    TranscriptionFrame,
+    TTSAudioRawFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+)
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContextFrame
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from fixa import metrics
+from fixa.metrics import AgentTurnTiming, CallTimings, TurnTimings
+
+class FrameProbe(FrameProcessor):
+    """
+    Passes every frame through unchanged, calling `on_frame` with each one.
+    """
+    def __init__(self, on_frame: Callable[[Frame, FrameDirection], None], **kwargs):
+        super().__init__(**kwargs)
+        self._on_frame = on_frame
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        self._on_frame(frame, direction)
+        await self.push_frame(frame, direction)
+
+class TurnLatencyTracker:
+    """
+    Times each of the bot's turns from probes placed between the stages of its pipeline:
+
+        input, stt, [after_stt], user aggregator, [after_context], llm, [after_llm], tts, [after_tts], output
+
+    Each completed turn is appended to `timings.turns` and recorded in the server metrics.
+    """
+    def __init__(self, timings: CallTimings):
+        self.timings = timings
+        self._reset()
+
+    def _reset(self):
+        self._user_stopped_at: Optional[float] = None
+        self._transcribed_at: Optional[float] = None
+        self._llm_started_at: Optional[float] = None
+        self._llm_first_text_at: Optional[float] = None
+
+    def after_stt(self, frame: Frame, direction: FrameDirection):
+        if isinstance(frame, UserStartedSpeakingFrame):
+            self._reset()
+        elif isinstance(frame, UserStoppedSpeakingFrame):
+            self._user_stopped_at = time.monotonic()
+        elif isinstance(frame, TranscriptionFrame):
+            self._transcribed_at = time.monotonic()
+        elif isinstance(frame, StartInterruptionFrame):
+            self._llm_started_at = None
+            self._llm_first_text_at = None
+
+    def after_context(self, frame: Frame, direction: FrameDirection):
+        if isinstance(frame, OpenAILLMContextFrame) and self._llm_started_at is None:
+            self._llm_started_at = time.monotonic()
+
+    def after_llm(self, frame: Frame, direction: FrameDirection):
+        if (
+            isinstance(frame, TextFrame)
+            and not isinstance(frame, TranscriptionFrame)
+            and self._llm_started_at is not None
+            and self._llm_first_text_at is None
+        ):
+            self._llm_first_text_at = time.monotonic()
+
+    def after_tts(self, frame: Frame, direction: FrameDirection):
+        if isinstance(frame, TTSAudioRawFrame) and self._llm_first_text_at is not None:
+            self._finish_turn(time.monotonic())
+
+    def _finish_turn(self, first_audio_at: float):
+        assert self._llm_started_at is not None and self._llm_first_text_at is not None
+        turn = TurnTimings(
+            llm=self._llm_first_text_at - self._llm_started_at,
+            tts=first_audio_at - self._llm_first_text_at,
+        )
+        if self._user_stopped_at is not None:
+            # The transcription may arrive before the VAD decides the agent stopped speaking
+            transcribed_at = self._transcribed_at if self._transcribed_at is not None else self._user_stopped_at
+            turn.stt = max(0.0, transcribed_at - self._user_stopped_at)
+            turn.total = first_audio_at - self._user_stopped_at
+            metrics.stt_latency.observe(turn.stt)
+            metrics.turn_latency.observe(turn.total)
+        metrics.llm_time_to_first_token.observe(turn.llm)
+        metrics.tts_time_to_first_byte.observe(turn.tts)
+        self.timings.turns.append(turn)
+        self._reset()
+
+class AgentTurnTracker:
+    """
+    Times the turns of the agent under test from two probes: one right after the transport's input, which sees
+    the VAD's user (agent) speaking frames, and one right after the transport's output, which sees the bot's audio
+    as it is sent.
+
+    The output transport sends audio faster than real time, so when the agent hears the bot stop is estimated by
+    playing the sent audio back at real time. Each of the agent's turns is appended to `timings.agent_turns`,
+    in seconds since the tracker was created.
+    """
+    def __init__(self, timings: CallTimings, vad_start_secs: float = 0, vad_stop_secs: float = 0):
+        """
+        Args:
+            timings: Where the agent's turns are recorded.
+            vad_start_secs: How much speech the VAD waits for before reporting that the agent started speaking.
+            vad_stop_secs: How much silence the VAD waits for before reporting that the agent stopped speaking.
+        """
+        self.timings = timings
+        self.vad_start_secs = vad_start_secs
+        self.vad_stop_secs = vad_stop_secs
+        self._started_at = time.monotonic()
+        self._playback_end: Optional[float] = None  # when the audio sent so far finishes playing
+        self._bot_spoke = False  # whether the bot has spoken since the agent's last turn
+        self._playback_cleared = False
+        self._current: Optional[AgentTurnTiming] = None
+
+    def _now(self) -> float:
+        return time.monotonic() - self._started_at
+
+    def after_output(self, frame: Frame, direction: FrameDirection):
+        if isinstance(frame, OutputAudioRawFrame) and direction == FrameDirection.DOWNSTREAM:
+            now = self._now()
+            if self._playback_end is None or self._playback_cleared:
+                self._playback_end = now
+                self._playback_cleared = False
+            duration = len(frame.audio) / (2 * frame.sample_rate * frame.num_channels)
+            self._playback_end = max(self._playback_end, now) + duration
+            self._bot_spoke = True
+
+    def after_input(self, frame: Frame, direction: FrameDirection):
+        if isinstance(frame, UserStartedSpeakingFrame):
+            # The VAD reports speech once it has heard enough of it
+            agent_started = max(0.0, self._now() - self.vad_start_secs)
+            turn = AgentTurnTiming(agent_started=agent_started)
+            if self._bot_spoke and self._playback_end is not None:
+                turn.bot_stopped = self._playback_end
+                if agent_started < self._playback_end:
+                    turn.interrupted = True
+                    metrics.agent_interruptions.inc()
+                else:
+                    turn.response_latency = agent_started - self._playback_end
+                    metrics.agent_response_latency.observe(turn.response_latency)
+            self._bot_spoke = False
+            self._current = turn
+            self.timings.agent_turns.append(turn)
+        elif isinstance(frame, StartInterruptionFrame):
+            # The bot's queued audio is dropped and the far end is told to stop playing it
+            self._playback_cleared = True
+        elif isinstance(frame, UserStoppedSpeakingFrame) and self._current is not None:
+            self._current.agent_stopped = max(self._current.agent_started, self._now() - self.vad_stop_secs)
+            self._current = None
@@ -1,6 +1,7 @@
-from .evaluator import BaseEvaluator, EvaluationResult
+from .evaluator import BaseEvaluator, EvaluationRequest, EvaluationResult
 from .local import LocalEvaluator
 from .cloud import CloudEvaluator
+from .cache import CachedEvaluator, EvaluationCache, InMemoryEvaluationCache, SQLiteEvaluationCache
 
 
-__all__ = ['BaseEvaluator', 'LocalEvaluator', 'CloudEvaluator', 'EvaluationResult']
\ No newline at end of file
+__all__ = ['BaseEvaluator', 'LocalEvaluator', 'CloudEvaluator', 'EvaluationRequest', 'EvaluationResult', 'CachedEvaluator', 'EvaluationCache', 'InMemoryEvaluationCache', 'SQLiteEvaluationCache']
\ No newline at end of file
@@ -0,0 +1,226 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict
+import hashlib
+import json
+import os
+from pathlib import Path
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+import aiohttp
+from openai.types.chat import ChatCompletionMessageParam
+from fixa.evaluators.evaluator import BaseEvaluator, EvaluationRequest, EvaluationResponse
+from fixa.scenario import Scenario
+
+def _normalize_message(message: Any) -> Any:
+    if isinstance(message, dict):
+        return {k: _normalize_message(v) for k, v in sorted(message.items())}
+    if isinstance(message, list):
+        return [_normalize_message(m) for m in message]
+    if isinstance(message, str):
+        return " ".join(message.split())
+    return message
+
+def evaluation_cache_key(evaluator: BaseEvaluator, scenario: Scenario, transcript: List[ChatCompletionMessageParam], stereo_recording_url: str) -> str:
+    """
+    Hashes everything an evaluation depends on: the evaluator and its model, the evaluation prompts, the transcript
+    (with whitespace normalized) and, for evaluators that use it, the recording.
+    """
+    content = json.dumps({
+        "evaluator": evaluator.cache_identity(),
+        "evaluations": [asdict(e) for e in scenario.evaluations],
+        "transcript": _normalize_message(list(transcript)),
+        "recording": stereo_recording_url if evaluator.uses_recording else None,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+class EvaluationCache(ABC):
+    """
+    Storage for evaluation results, keyed by `evaluation_cache_key`.
+    """
+    hits: int = 0
+    misses: int = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[EvaluationResponse]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, response: EvaluationResponse):
+        raise NotImplementedError
+
+    def _record(self, response: Optional[EvaluationResponse]) -> Optional[EvaluationResponse]:
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+class InMemoryEvaluationCache(EvaluationCache):
+    """
+    An in-process LRU cache of evaluation results.
+    """
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        """
+        Args:
+            max_entries (int): Least recently used entries are evicted beyond this many
+            ttl (Optional[float]): Seconds an entry stays valid. Never expires if None.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Tuple[float, EvaluationResponse]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[EvaluationResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return self._record(None)
+        created, response = entry
+        if self.ttl is not None and time.time() - created > self.ttl:
+            del self._entries[key]
+            return self._record(None)
+        self._entries.move_to_end(key)
+        return self._record(response)
+
+    def set(self, key: str, response: EvaluationResponse):
+        self._entries[key] = (time.time(), response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+class SQLiteEvaluationCache(EvaluationCache):
+    """
+    An on-disk cache of evaluation results that persists between runs.
+
+    Hits are served without writing to the database: their access times are kept in memory and written
+    together with the next `set`, every `flush_every` hits, or on `flush`/`close`.
+    """
+    DEFAULT_PATH = str(Path.home() / '.cache' / 'fixa' / 'evaluations.sqlite3')
+
+    def __init__(self, path: str = DEFAULT_PATH, max_entries: Optional[int] = 100_000, ttl: Optional[float] = None, flush_every: int = 100):
+        """
+        Args:
+            path (str): Path of the SQLite database file
+            max_entries (Optional[int]): Least recently used entries are evicted beyond this many. Unbounded if None.
+            ttl (Optional[float]): Seconds an entry stays valid. Never expires if None.
+            flush_every (int): Number of hits whose access times are held in memory before they are written
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.flush_every = flush_every
+        self._accessed: Dict[str, float] = {}
+        self._expired: Set[str] = set()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS evaluations (key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS evaluations_accessed ON evaluations (accessed)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[EvaluationResponse]:
+        if key in self._expired:
+            return self._record(None)
+        row = self._db.execute("SELECT response, created FROM evaluations WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return self._record(None)
+        now = time.time()
+        if self.ttl is not None and now - row[1] > self.ttl:
+            self._accessed.pop(key, None)
+            self._expired.add(key)
+            return self._record(None)
+        self._accessed[key] = now
+        if len(self._accessed) >= self.flush_every:
+            self.flush()
+        return self._record(EvaluationResponse.model_validate_json(row[0]))
+
+    def set(self, key: str, response: EvaluationResponse):
+        self._write_pending()
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO evaluations (key, response, created, accessed) VALUES (?, ?, ?, ?)",
+            (key, response.model_dump_json(), now, now),
+        )
+        if self.max_entries is not None:
+            self._db.execute(
+                "DELETE FROM evaluations WHERE key IN (SELECT key FROM evaluations ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        self._db.commit()
+
+    def flush(self):
+        """Write the access times of hits and the removal of expired entries to the database."""
+        if self._write_pending():
+            self._db.commit()
+
+    def _write_pending(self) -> bool:
+        if not self._accessed and not self._expired:
+            return False
+        self._db.executemany("UPDATE evaluations SET accessed = ? WHERE key = ?", [(t, k) for k, t in self._accessed.items()])
+        self._db.executemany("DELETE FROM evaluations WHERE key = ?", [(k,) for k in self._expired])
+        self._accessed.clear()
+        self._expired.clear()
+        return True
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+class CachedEvaluator(BaseEvaluator):
+    """
+    Wraps an evaluator so that evaluating the same transcript against the same evaluations again
+    returns the stored result instead of calling the evaluator. Results of evaluators that use the
+    recording (`uses_recording`) are only reused for the same recording.
+    """
+    def __init__(self, evaluator: BaseEvaluator, cache: Optional[EvaluationCache] = None):
+        """
+        Args:
+            evaluator (BaseEvaluator): The evaluator to cache results for
+            cache (Optional[EvaluationCache]): Where results are stored. Defaults to an on-disk SQLiteEvaluationCache.
+        """
+        self.evaluator = evaluator
+        self.cache = cache if cache is not None else SQLiteEvaluationCache()
+        self.uses_recording = evaluator.uses_recording
+
+    @property
+    def hits(self) -> int:
+        return self.cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self.cache.misses
+
+    def cache_identity(self) -> str:
+        return self.evaluator.cache_identity()
+
+    def set_session(self, session: Optional[aiohttp.ClientSession]):
+        self.evaluator.set_session(session)
+
+    def set_callback_url(self, callback_url: Optional[str]):
+        self.evaluator.set_callback_url(callback_url)
+
+    async def evaluate(self, scenario: Scenario, transcript: List[ChatCompletionMessageParam], stereo_recording_url: str) -> Optional[EvaluationResponse]:
+        key = evaluation_cache_key(self.evaluator, scenario, transcript, stereo_recording_url)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = await self.evaluator.evaluate(scenario, transcript, stereo_recording_url)
+        if response is not None:
+            self.cache.set(key, response)
+        return response
+
+    async def evaluate_batch(self, requests: List[EvaluationRequest]) -> List[Optional[EvaluationResponse]]:
+        keys = [evaluation_cache_key(self.evaluator, r.scenario, r.transcript, r.stereo_recording_url) for r in requests]
+        responses: List[Optional[EvaluationResponse]] = [self.cache.get(key) for key in keys]
+
+        # Only evaluate the calls that were not cached
+        missing: Dict[int, EvaluationRequest] = {i: r for i, r in enumerate(requests) if responses[i] is None}
+        if missing:
+            evaluated = await self.evaluator.evaluate_batch(list(missing.values()))
+            for i, response in zip(missing.keys(), evaluated):
+                responses[i] = response
+                if response is not None:
+                    self.cache.set(keys[i], response)
+        return responses
@@ -0,0 +1,41 @@
+import asyncio
+from typing import Any, Dict
+
+class EvaluationCallbacks:
+    """
+    Hands evaluation results that arrive on the runner server to the evaluator waiting for them.
+
+    An evaluator registers a token with `expect` before submitting a call, and the server resolves it
+    with `resolve` when the evaluation backend posts the results for that token.
+    """
+    def __init__(self):
+        self._waiters: Dict[str, asyncio.Future[Dict[str, Any]]] = {}
+
+    def expect(self, token: str) -> asyncio.Future[Dict[str, Any]]:
+        """
+        Returns a future that completes with the payload posted for the token.
+        """
+        waiter: asyncio.Future[Dict[str, Any]] = asyncio.get_running_loop().create_future()
+        self._waiters[token] = waiter
+        return waiter
+
+    def resolve(self, token: str, payload: Dict[str, Any]) -> bool:
+        """
+        Completes the future for the token. Returns False if nothing is waiting for it.
+        """
+        waiter = self._waiters.pop(token, None)
+        if waiter is None or waiter.done():
+            return False
+        waiter.set_result(payload)
+        return True
+
+    def discard(self, token: str):
+        """
+        Stops waiting for the token.
+        """
+        waiter = self._waiters.pop(token, None)
+        if waiter is not None and not waiter.done():
+            waiter.cancel()
+
+# Shared by the evaluators and the runner server
+evaluation_callbacks = EvaluationCallbacks()
@@ -3,6 +3,7 @@ from dataclasses import asdict
 import uuid
 from typing import List, Optional
 from openai.types.chat import ChatCompletionMessageParam, ChatCompletionToolParam
+from fixa.evaluators.callbacks import evaluation_callbacks
 from fixa.evaluators.evaluator import BaseEvaluator, EvaluationResponse, EvaluationResult
 from fixa.scenario import Scenario
 import aiohttp
@@ -11,13 +12,28 @@ import json
 api_url = "https://api.fixa.dev/v1"
 
 class CloudEvaluator(BaseEvaluator):
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, deadline: float = 120, initial_poll_interval: float = 1, max_poll_interval: float = 15, api_url: str = api_url):
+        """
+        Args:
+            api_key (str): fixa-observe API key
+            deadline (float): Seconds to wait for the results of a call before giving up
+            initial_poll_interval (float): Seconds to wait before polling for results the first time
+            max_poll_interval (float): Upper bound for the exponentially growing poll interval
+            api_url (str): Base URL of the fixa-observe API, e.g. that of a local stub
+        """
         self.api_key = api_key
         if not api_key:
             raise ValueError("fixa-observe API key required for cloud evaluator")
+        self.deadline = deadline
+        self.initial_poll_interval = initial_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.api_url = api_url
     
     async def evaluate(self, scenario: Scenario, transcript: List[ChatCompletionMessageParam], stereo_recording_url: str) -> Optional[EvaluationResponse]:
         """Evaluate a call using fixa-observe.
+
+        If a callback URL is set, fixa-observe is asked to post the results to it, and polling
+        (with exponential backoff) only serves as a fallback until the deadline.
         Args:
             scenario (Scenario): Scenario to evaluate
             transcript (List[ChatCompletionMessageParam | ChatCompletionToolParam]): Transcript of the call
@@ -25,48 +41,77 @@ class CloudEvaluator(BaseEvaluator):
         Returns:
             bool: True if all evaluations passed, False otherwise
         """
+        if self.session is not None and not self.session.closed:
+            return await self._evaluate(self.session, scenario, transcript, stereo_recording_url)
         async with aiohttp.ClientSession() as session:
+            return await self._evaluate(session, scenario, transcript, stereo_recording_url)
+
+    async def _evaluate(self, session: aiohttp.ClientSession, scenario: Scenario, transcript: List[ChatCompletionMessageParam], stereo_recording_url: str) -> Optional[EvaluationResponse]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+
+        payload = {
+            "callId": str(uuid.uuid4()),
+            "agentId": "test",
+            "scenario": asdict(scenario),
+            "transcript": transcript,
+            "stereoRecordingUrl": stereo_recording_url,
+        }
+        callback_token = None
+        callback: Optional[asyncio.Future] = None
+        if self.callback_url is not None:
+            callback_token = str(uuid.uuid4())
+            callback = evaluation_callbacks.expect(callback_token)
+            payload["callbackUrl"] = f"{self.callback_url}/{callback_token}"
+
+        try:
             async with session.post(
-                f"{api_url}/upload-call",
-                json={
-                    "callId": str(uuid.uuid4()),
-                    "agentId": "test",
-                    "scenario": asdict(scenario),
-                    "transcript": transcript,
-                    "stereoRecordingUrl": stereo_recording_url,
-                },
+                f"{self.api_url}/upload-call",
+                json=payload,
                 headers={
                     "Authorization": f"Bearer {self.api_key}"
                 }
             ) as response:
+                response.raise_for_status()
                 data = await response.json()
                 if not data["success"]:
                     raise Exception(f"Failed to upload call: {data}")
                 call_id = data["callId"]
 
-            max_retries = 10
-            retries = 0
-            await asyncio.sleep(5)
-            while retries < max_retries:
+            poll_interval = self.initial_poll_interval
+            while loop.time() < deadline:
+                # Wait for the results to be posted back, or for the next poll
+                wait = min(poll_interval, max(deadline - loop.time(), 0))
+                if callback is not None:
+                    try:
+                        return self._parse_results(call_id, await asyncio.wait_for(asyncio.shield(callback), timeout=wait))
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await asyncio.sleep(wait)
+
                 async with session.get(
-                    f"{api_url}/calls/{call_id}",
+                    f"{self.api_url}/calls/{call_id}",
                     headers={
                         "Authorization": f"Bearer {self.api_key}"
                     }
                 ) as response:
                     if response.status == 200:
-                        results = await response.json()
-                        evaluation_results = results["call"]["evaluationResults"]
-                        return EvaluationResponse(
-                            evaluation_results=[EvaluationResult(name=r["evaluation"]["evaluationTemplate"]["name"], passed=r["success"], reason=r["details"]) for r in evaluation_results],
-                            extra_data={
-                               "fixa_observe_call_url": f"https://www.fixa.dev/observe/calls/{call_id}"
-                            }
-                        )
-                    
-                    # Wait a bit before polling again
-                    await asyncio.sleep(2)
-                    retries += 1
+                        return self._parse_results(call_id, await response.json())
+
+                poll_interval = min(poll_interval * 2, self.max_poll_interval)
+        finally:
+            if callback_token is not None:
+                evaluation_callbacks.discard(callback_token)
 
         # failed to get call results!
-        raise Exception("Failed to get call results")
\ No newline at end of file
+        raise Exception(f"Failed to get call results within {self.deadline} seconds")
+
+    def _parse_results(self, call_id: str, results: dict) -> EvaluationResponse:
+        evaluation_results = results["call"]["evaluationResults"]
+        return EvaluationResponse(
+            evaluation_results=[EvaluationResult(name=r["evaluation"]["evaluationTemplate"]["name"], passed=r["success"], reason=r["details"]) for r in evaluation_results],
+            extra_data={
+               "fixa_observe_call_url": f"https://www.fixa.dev/observe/calls/{call_id}"
+            }
+        )
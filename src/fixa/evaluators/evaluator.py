@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
+import asyncio
+from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
+import aiohttp
 from openai.types.chat import ChatCompletionMessageParam
 from pydantic import BaseModel
 
@@ -14,7 +17,64 @@ class EvaluationResponse(BaseModel):
     evaluation_results: List[EvaluationResult]
     extra_data: Dict[str, Any]
 
+@dataclass
+class EvaluationRequest:
+    """A single call to evaluate as part of a batch.
+
+    Attributes:
+        scenario (Scenario): Scenario to evaluate
+        transcript (List[ChatCompletionMessageParam]): Transcript of the call
+        stereo_recording_url (str): URL of the stereo recording of the call
+    """
+    scenario: Scenario
+    transcript: List[ChatCompletionMessageParam]
+    stereo_recording_url: str
+
 class BaseEvaluator(ABC):
+    session: Optional[aiohttp.ClientSession] = None
+    callback_url: Optional[str] = None
+    # whether results depend on the call's recording (and not just its transcript), so must not be shared between calls
+    uses_recording: bool = True
+
+    def set_session(self, session: Optional[aiohttp.ClientSession]):
+        """Share a pooled HTTP session with the evaluator.
+
+        Evaluators that make HTTP requests should use it instead of opening their own session.
+        Args:
+            session (Optional[aiohttp.ClientSession]): The session to use, or None to stop using a shared session
+        """
+        self.session = session
+
+    def set_callback_url(self, callback_url: Optional[str]):
+        """Tell the evaluator where the runner server accepts evaluation results.
+
+        Evaluators backed by a remote service can ask it to post results to this URL instead of polling for them.
+        Args:
+            callback_url (Optional[str]): Base URL of the runner's evaluation callback route, or None if there is none
+        """
+        self.callback_url = callback_url
+
+    def cache_identity(self) -> str:
+        """Identify this evaluator's configuration for result caching.
+
+        Evaluators whose results depend on settings (such as the model) should include them.
+        """
+        return type(self).__name__
+
     @abstractmethod
     async def evaluate(self, scenario: Scenario, transcript: List[ChatCompletionMessageParam], stereo_recording_url: str) -> Optional[EvaluationResponse]:
         raise NotImplementedError
+
+    async def evaluate_batch(self, requests: List[EvaluationRequest]) -> List[Optional[EvaluationResponse]]:
+        """Evaluate several calls at once.
+
+        Evaluators that can share work between calls should override this. By default each call is evaluated concurrently on its own.
+        Args:
+            requests (List[EvaluationRequest]): Calls to evaluate
+        Returns:
+            List[Optional[EvaluationResponse]]: Evaluation results for each request, in the same order
+        """
+        return list(await asyncio.gather(*(
+            self.evaluate(request.scenario, request.transcript, request.stereo_recording_url)
+            for request in requests
+        )))
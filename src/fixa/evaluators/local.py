@@ -1,23 +1,70 @@
+import asyncio
+import json
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletionMessageParam
 from pydantic import BaseModel
-from fixa.evaluators.evaluator import BaseEvaluator, EvaluationResponse, EvaluationResult
+from fixa.evaluators.evaluator import BaseEvaluator, EvaluationRequest, EvaluationResponse, EvaluationResult
 from fixa.scenario import Scenario
 from dotenv import load_dotenv
 
-load_dotenv(override=True)
-
 
 class EvaluationResults(BaseModel):
     results: List[EvaluationResult]
 
+class CallEvaluationResults(BaseModel):
+    call_index: int
+    results: List[EvaluationResult]
+
+class BatchEvaluationResults(BaseModel):
+    calls: List[CallEvaluationResults]
+
+BATCH_SYSTEM_PROMPT = (
+    "You will be given numbered sets of criteria, followed by several call transcripts that each name the set they are evaluated against. "
+    "Evaluate each transcript only against its own set of criteria. "
+    "Return one entry per call, using the call_index it was given, with one result per criterion."
+)
+# Room in the reply for one criterion's result, and for each call's entry around its results
+MAX_TOKENS_PER_EVALUATION = 80
+MAX_TOKENS_PER_CALL = 20
+
+def compact_transcript(transcript: List[ChatCompletionMessageParam]) -> str:
+    """
+    Writes a transcript as one `role: content` line per message, with tool calls and non-text content as compact JSON.
+    """
+    lines = []
+    for message in transcript:
+        content = message.get("content")
+        parts = [" ".join(content.split()) if isinstance(content, str) else json.dumps(content, separators=(",", ":"), default=str)] if content else []
+        tool_calls = message.get("tool_calls")
+        if tool_calls:
+            parts.append(json.dumps(tool_calls, separators=(",", ":"), default=str))
+        lines.append(f"{message['role']}: {' '.join(parts)}")
+    return "\n".join(lines)
+
+def _criteria_key(scenario: Scenario) -> Tuple[Tuple[str, str], ...]:
+    return tuple((e.name, e.prompt) for e in scenario.evaluations)
+
 class LocalEvaluator(BaseEvaluator):
-    def __init__(self, model: str = "gpt-4o"):
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY") or "")
+    uses_recording = False
+
+    def __init__(self, model: str = "gpt-4o", batch_size: int = 10, client: Optional[AsyncOpenAI] = None):
+        """
+        Args:
+            model (str): OpenAI model to evaluate with
+            batch_size (int): Maximum number of transcripts packed into a single request by `evaluate_batch`
+            client (Optional[AsyncOpenAI]): Client to use instead of the default OpenAI client, e.g. one pointed at a local stub
+        """
+        if client is None:
+            load_dotenv(override=True)
+        self.client = client or AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY") or "")
         self.model = model
-    
+        self.batch_size = batch_size
+
+    def cache_identity(self) -> str:
+        return f"{type(self).__name__}:{self.model}"
+
     async def evaluate(self, scenario: Scenario, transcript: List[ChatCompletionMessageParam], stereo_recording_url: str) -> Optional[EvaluationResponse]:
         """Evaluate a call locally.
         Args:
@@ -31,7 +78,7 @@ class LocalEvaluator(BaseEvaluator):
             {"role": "system", "content": f"Evaluate the following transcript against these criteria:\n{[e.__dict__ for e in scenario.evaluations]}"},
             {"role": "user", "content": f"Transcript:\n{str(transcript)}"}
         ]
-        
+
         response = await self.client.beta.chat.completions.parse(
             model=self.model,
             messages=messages,
@@ -47,3 +94,60 @@ class LocalEvaluator(BaseEvaluator):
             evaluation_results=parsed.results,
             extra_data={}
         )
+
+    async def evaluate_batch(self, requests: List[EvaluationRequest]) -> List[Optional[EvaluationResponse]]:
+        """Evaluate several calls, packing up to `batch_size` transcripts into each request.
+
+        Calls with the same evaluations are packed together, and each request sends their criteria once.
+        Args:
+            requests (List[EvaluationRequest]): Calls to evaluate
+        Returns:
+            List[Optional[EvaluationResponse]]: Evaluation results for each request, in the same order (None for calls the model left out)
+        """
+        groups: Dict[Tuple[Tuple[str, str], ...], List[int]] = {}
+        for i, request in enumerate(requests):
+            groups.setdefault(_criteria_key(request.scenario), []).append(i)
+        order = [i for indices in groups.values() for i in indices]
+
+        chunks = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+        chunk_results = await asyncio.gather(*(self._evaluate_chunk([requests[i] for i in chunk]) for chunk in chunks))
+        responses: List[Optional[EvaluationResponse]] = [None] * len(requests)
+        for chunk, results in zip(chunks, chunk_results):
+            for i, response in zip(chunk, results):
+                responses[i] = response
+        return responses
+
+    async def _evaluate_chunk(self, requests: List[EvaluationRequest]) -> List[Optional[EvaluationResponse]]:
+        # Each set of criteria is written once, and calls refer to it by number
+        criteria_sets: Dict[Tuple[Tuple[str, str], ...], int] = {}
+        criteria_sections: List[str] = []
+        call_sections: List[str] = []
+        for i, request in enumerate(requests):
+            key = _criteria_key(request.scenario)
+            if key not in criteria_sets:
+                criteria_sets[key] = len(criteria_sets)
+                criteria = "\n".join(f"- {name}: {prompt}" for name, prompt in key)
+                criteria_sections.append(f"Criteria {criteria_sets[key]}:\n{criteria}")
+            call_sections.append(f"Call {i} (criteria {criteria_sets[key]}):\n{compact_transcript(request.transcript)}")
+        messages: List[ChatCompletionMessageParam] = [
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": "\n\n".join(criteria_sections + call_sections)},
+        ]
+
+        evaluations = sum(len(request.scenario.evaluations) for request in requests)
+        response = await self.client.beta.chat.completions.parse(
+            model=self.model,
+            messages=messages,
+            temperature=0,
+            max_tokens=MAX_TOKENS_PER_EVALUATION * evaluations + MAX_TOKENS_PER_CALL * len(requests),
+            response_format=BatchEvaluationResults,
+        )
+
+        parsed = response.choices[0].message.parsed
+        if parsed is None:
+            return [None] * len(requests)
+        by_index: Dict[int, List[EvaluationResult]] = {call.call_index: call.results for call in parsed.calls}
+        return [
+            EvaluationResponse(evaluation_results=by_index[i], extra_data={}) if i in by_index else None
+            for i in range(len(requests))
+        ]
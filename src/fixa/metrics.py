@@ -0,0 +1,270 @@
+import asyncio
+from dataclasses import dataclass, field
+import math
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value))
+
+class Histogram:
+    """
+    A Prometheus-style histogram: cumulative bucket counts plus the sum and count of observations.
+    """
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+class Gauge:
+    """
+    A Prometheus-style gauge: a single value that can go up and down.
+    """
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge", f"{self.name} {_format_value(self.value)}"]
+
+class Counter:
+    """
+    A Prometheus-style counter: a value that only goes up.
+    """
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter", f"{self.name} {_format_value(self.value)}"]
+
+class MetricsRegistry:
+    """
+    Holds metrics and renders them in the Prometheus text exposition format.
+    """
+    def __init__(self):
+        self._metrics: Dict[str, Histogram | Gauge | Counter] = {}
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        histogram = Histogram(name, documentation, buckets)
+        self._metrics[name] = histogram
+        return histogram
+
+    def gauge(self, name: str, documentation: str) -> Gauge:
+        gauge = Gauge(name, documentation)
+        self._metrics[name] = gauge
+        return gauge
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        counter = Counter(name, documentation)
+        self._metrics[name] = counter
+        return counter
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics.values() for line in metric.render()) + "\n"
+
+registry = MetricsRegistry()
+
+event_loop_lag = registry.histogram("fixa_event_loop_lag_seconds", "How late the server's event loop ran a task scheduled to wake up.", LAG_BUCKETS)
+active_calls = registry.gauge("fixa_active_calls", "Calls with a bot running.")
+outbound_to_connect = registry.histogram("fixa_outbound_to_connect_seconds", "Time from placing a call (or answering it, for inbound calls) to its media stream connecting.")
+stt_latency = registry.histogram("fixa_stt_latency_seconds", "Time from the end of the agent's speech to its final transcription.")
+llm_time_to_first_token = registry.histogram("fixa_llm_time_to_first_token_seconds", "Time from the bot's LLM being prompted to its first text.")
+tts_time_to_first_byte = registry.histogram("fixa_tts_time_to_first_byte_seconds", "Time from the bot's LLM first text to its first TTS audio.")
+turn_latency = registry.histogram("fixa_turn_latency_seconds", "Time from the end of the agent's speech to the bot's first TTS audio.")
+agent_response_latency = registry.histogram("fixa_agent_response_latency_seconds", "Time from the bot finishing speaking to the agent under test starting to speak.")
+agent_interruptions = registry.counter("fixa_agent_interruptions_total", "Times the agent under test started speaking while the bot was speaking.")
+evaluation_duration = registry.histogram("fixa_evaluation_duration_seconds", "Time taken to evaluate a call.", (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120))
+
+def percentile(values: Sequence[float], p: float) -> Optional[float]:
+    """
+    Returns the p-th percentile (0-100) of values, by nearest rank, or None if there are no values.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))]
+
+@dataclass
+class TurnTimings:
+    """How long the bot took to answer one of the agent's turns, in seconds.
+
+    Attributes:
+        stt (Optional[float]): End of the agent's speech to its final transcription
+        llm (Optional[float]): LLM prompted to its first text
+        tts (Optional[float]): LLM first text to the first TTS audio
+        total (Optional[float]): End of the agent's speech to the first TTS audio
+    """
+    stt: Optional[float] = None
+    llm: Optional[float] = None
+    tts: Optional[float] = None
+    total: Optional[float] = None
+
+@dataclass
+class AgentTurnTiming:
+    """One turn of the agent under test, in seconds since the call connected.
+
+    Attributes:
+        agent_started (float): When the agent started speaking
+        agent_stopped (Optional[float]): When the agent stopped speaking, if it did before the call ended
+        bot_stopped (Optional[float]): When the bot's reply before this turn finished playing (or would have, if the agent interrupted), or None if the bot hadn't replied
+        response_latency (Optional[float]): Time the agent took to start speaking once the bot finished, or None if it interrupted or spoke first
+        interrupted (bool): Whether the agent started speaking while the bot was still speaking
+    """
+    agent_started: float
+    agent_stopped: Optional[float] = None
+    bot_stopped: Optional[float] = None
+    response_latency: Optional[float] = None
+    interrupted: bool = False
+
+@dataclass
+class CallTimings:
+    """Timings of a single test call, in seconds.
+
+    Attributes:
+        outbound_to_connect (Optional[float]): Time from placing the call (or answering it, for inbound calls) to the media stream connecting
+        turns (List[TurnTimings]): The bot's latency on each turn
+        agent_turns (List[AgentTurnTiming]): When the agent under test spoke, and how quickly it responded to the bot
+        evaluation_duration (Optional[float]): Time taken to evaluate the call
+    """
+    outbound_to_connect: Optional[float] = None
+    turns: List[TurnTimings] = field(default_factory=list)
+    agent_turns: List[AgentTurnTiming] = field(default_factory=list)
+    evaluation_duration: Optional[float] = None
+    outbound_at: Optional[float] = field(default=None, repr=False)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CallTimings":
+        """
+        Rebuilds timings from `dataclasses.asdict` output, e.g. after storing them as JSON.
+        """
+        return cls(
+            outbound_to_connect=data.get("outbound_to_connect"),
+            turns=[TurnTimings(**turn) for turn in data.get("turns", [])],
+            agent_turns=[AgentTurnTiming(**turn) for turn in data.get("agent_turns", [])],
+            evaluation_duration=data.get("evaluation_duration"),
+            outbound_at=data.get("outbound_at"),
+        )
+
+    @property
+    def response_latencies(self) -> List[float]:
+        """
+        The agent under test's response latency on each turn it responded to the bot.
+        """
+        return [turn.response_latency for turn in self.agent_turns if turn.response_latency is not None]
+
+    @property
+    def response_latency_p50(self) -> Optional[float]:
+        return percentile(self.response_latencies, 50)
+
+    @property
+    def response_latency_p95(self) -> Optional[float]:
+        return percentile(self.response_latencies, 95)
+
+    @property
+    def interruptions(self) -> int:
+        return sum(1 for turn in self.agent_turns if turn.interrupted)
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """
+        Summarizes the call's timings, with the p50 and p95 of each of the bot's turn stages
+        and of the agent under test's response latency.
+        """
+        summary: Dict[str, Optional[float]] = {
+            "outbound_to_connect": self.outbound_to_connect,
+            "evaluation_duration": self.evaluation_duration,
+            "turns": len(self.turns),
+        }
+        for stage in ("stt", "llm", "tts", "total"):
+            values = [getattr(turn, stage) for turn in self.turns if getattr(turn, stage) is not None]
+            summary[f"{stage}_p50"] = percentile(values, 50)
+            summary[f"{stage}_p95"] = percentile(values, 95)
+        summary["agent_turns"] = len(self.agent_turns)
+        summary["response_latency_p50"] = self.response_latency_p50
+        summary["response_latency_p95"] = self.response_latency_p95
+        summary["interruptions"] = self.interruptions
+        return summary
+
+class EventLoopLagMonitor:
+    """
+    Samples how late the event loop wakes up a task that sleeps at a fixed interval, into `event_loop_lag`.
+    Lag means something is blocking the loop, or it has more ready work than it can keep up with.
+
+    Run it with `start` and `stop`, or as an async context manager.
+    """
+    def __init__(self, interval: float = 0.1, keep_samples: bool = False):
+        """
+        Args:
+            interval: Seconds between samples.
+            keep_samples: Whether to keep every sample in `samples`, e.g. to summarize a benchmark run.
+        """
+        self.interval = interval
+        self.keep_samples = keep_samples
+        self.samples: List[float] = []
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "EventLoopLagMonitor":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, time.monotonic() - expected)
+            self.max_lag = max(self.max_lag, self.last_lag)
+            if self.keep_samples:
+                self.samples.append(self.last_lag)
+            event_loop_lag.observe(self.last_lag)
@@ -9,8 +9,6 @@ from posthog import Posthog
 from fixa.telemetry.views import BaseTelemetryEvent
 from fixa.utils import singleton
 
-load_dotenv()
-
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +33,7 @@ class ProductTelemetry:
 	_curr_user_id = None
 
 	def __init__(self) -> None:
+		load_dotenv()
 		telemetry_disabled = os.getenv('ANONYMIZED_TELEMETRY', 'true').lower() == 'false'
 		self.debug_logging = os.getenv('FIXA_LOGGING_LEVEL', 'info').lower() == 'debug'
 
@@ -0,0 +1,42 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from requests.adapters import HTTPAdapter
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+T = TypeVar("T")
+
+# Twilio's REST client is synchronous, so its requests run on a dedicated thread pool
+# to keep them from blocking the event loop (and every live media stream with it).
+TWILIO_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+_twilio_executor = ThreadPoolExecutor(max_workers=TWILIO_MAX_WORKERS, thread_name_prefix="fixa-twilio")
+
+def create_twilio_client(account_sid: Optional[str] = None, auth_token: Optional[str] = None) -> Client:
+    """
+    Creates a Twilio client whose connection pool has room for one connection per worker thread.
+    Args:
+        account_sid (optional): Twilio account SID. Defaults to TWILIO_ACCOUNT_SID.
+        auth_token (optional): Twilio auth token. Defaults to TWILIO_AUTH_TOKEN.
+    """
+    http_client = TwilioHttpClient(pool_connections=True)
+    assert http_client.session is not None
+    http_client.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=TWILIO_MAX_WORKERS))
+    return Client(
+        account_sid or os.getenv("TWILIO_ACCOUNT_SID"),
+        auth_token or os.getenv("TWILIO_AUTH_TOKEN"),
+        http_client=http_client,
+    )
+
+async def run_twilio_request(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Runs a blocking Twilio REST call on the Twilio thread pool.
+    Args:
+        fn: The Twilio client method to call, e.g. `client.calls.create`.
+        *args, **kwargs: Arguments for fn.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_twilio_executor, functools.partial(fn, *args, **kwargs))
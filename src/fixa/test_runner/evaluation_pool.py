@@ -0,0 +1,168 @@
+import asyncio
+from dataclasses import dataclass
+import random
+from typing import Awaitable, Callable, List, Optional
+import aiohttp
+import openai
+
+@dataclass
+class EvaluationPoolMetrics:
+    """Counters describing the evaluation pool.
+
+    Attributes:
+        queue_depth (int): Calls waiting for a worker
+        max_queue_depth (int): Highest queue depth seen
+        in_flight (int): Calls being evaluated right now
+        completed (int): Calls evaluated successfully
+        failed (int): Calls whose evaluation failed for good
+        retries (int): Evaluation attempts that were retried
+    """
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    in_flight: int = 0
+    completed: int = 0
+    failed: int = 0
+    retries: int = 0
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether an evaluation error is worth retrying: rate limits, server errors and connection problems.
+    """
+    if isinstance(error, (openai.APIConnectionError, aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+class EvaluationPool:
+    """
+    Evaluates completed calls on a fixed number of workers, so a burst of completed calls
+    queues up instead of turning into a burst of evaluation requests.
+
+    With a `batch_size` above 1, a worker takes up to that many queued calls at once and evaluates them together.
+    """
+    def __init__(
+        self,
+        evaluate: Callable[[str], Awaitable[None]],
+        workers: int = 4,
+        max_retries: int = 5,
+        base_delay: float = 1,
+        max_delay: float = 30,
+        on_start: Optional[Callable[[str], None]] = None,
+        on_done: Optional[Callable[[str], None]] = None,
+        log: Callable[[str], None] = print,
+        evaluate_batch: Optional[Callable[[List[str]], Awaitable[None]]] = None,
+        batch_size: int = 1,
+    ):
+        """
+        Args:
+            evaluate: Evaluates the call with the given ID. Errors it raises are retried if they are retryable.
+            workers: The number of calls evaluated at once.
+            max_retries: How many times a retryable error is retried before the call is given up on.
+            base_delay: Upper bound, in seconds, of the delay before the first retry. It doubles with each retry.
+            max_delay: Upper bound, in seconds, of the delay before any retry.
+            on_start: Called with the call's ID when a worker starts evaluating it.
+            on_done: Called with the call's ID once the pool is done with it, whether or not its evaluation succeeded.
+            log: Shows messages about retries and failed evaluations.
+            evaluate_batch: Evaluates the calls with the given IDs together. Errors it raises are retried for the whole batch.
+            batch_size: The most calls a worker takes from the queue at once. Needs evaluate_batch if above 1.
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if batch_size > 1 and evaluate_batch is None:
+            raise ValueError("evaluate_batch is required to evaluate calls in batches")
+        self.evaluate = evaluate
+        self.workers = workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_start = on_start
+        self.on_done = on_done
+        self.log = log
+        self.evaluate_batch = evaluate_batch
+        self.batch_size = batch_size
+        self.metrics = EvaluationPoolMetrics()
+
+        self._queue: Optional[asyncio.Queue[str]] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """
+        Starts the workers, with fresh metrics, so that a runner reused across runs reports each run on its own.
+        """
+        self.metrics = EvaluationPoolMetrics()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, call_id: str):
+        """
+        Queues a call for evaluation.
+        """
+        assert self._queue is not None, "Evaluation pool not started"
+        self._queue.put_nowait(call_id)
+        self.metrics.queue_depth = self._queue.qsize()
+        self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, self.metrics.queue_depth)
+
+    async def join(self):
+        """
+        Waits for every queued call to be evaluated, then stops the workers.
+        """
+        if self._queue is not None:
+            await self._queue.join()
+        await self.stop()
+
+    async def stop(self):
+        """
+        Stops the workers, abandoning any queued calls.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        assert self._queue is not None
+        while True:
+            call_ids = [await self._queue.get()]
+            # Take whatever else is already waiting, up to a batch
+            while len(call_ids) < self.batch_size and not self._queue.empty():
+                call_ids.append(self._queue.get_nowait())
+            self.metrics.queue_depth = self._queue.qsize()
+            self.metrics.in_flight += len(call_ids)
+            if self.on_start is not None:
+                for call_id in call_ids:
+                    self.on_start(call_id)
+            try:
+                await self._evaluate_with_retries(call_ids)
+            finally:
+                self.metrics.in_flight -= len(call_ids)
+                for call_id in call_ids:
+                    self._queue.task_done()
+                    if self.on_done is not None:
+                        self.on_done(call_id)
+
+    async def _evaluate_with_retries(self, call_ids: List[str]):
+        name = f"call {call_ids[0]}" if len(call_ids) == 1 else f"calls {', '.join(call_ids)}"
+        attempt = 0
+        while True:
+            try:
+                if len(call_ids) == 1:
+                    await self.evaluate(call_ids[0])
+                else:
+                    assert self.evaluate_batch is not None
+                    await self.evaluate_batch(call_ids)
+                self.metrics.completed += len(call_ids)
+                return
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self.metrics.failed += len(call_ids)
+                    self.log(f"❌ Failed to evaluate {name}: {str(e)}")
+                    return
+
+                # Full jitter, so retries from many workers don't line up
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                attempt += 1
+                self.metrics.retries += 1
+                self.log(f"Retrying evaluation of {name} in {delay:.1f}s ({str(e)})")
+                await asyncio.sleep(delay)
@@ -0,0 +1,69 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Optional, Set
+
+from fixa.test_runner.views import CallStatus
+
+@dataclass
+class CallStatusEvent:
+    """A change to the status of a single call.
+
+    Attributes:
+        call_id (str): The call SID the status belongs to
+        status (CallStatus): A snapshot of the call's status after the change
+    """
+    call_id: str
+    status: CallStatus
+
+class CallStatusChannel:
+    """
+    In-process pub/sub channel for call status changes.
+
+    The server publishes to it whenever a call's status changes, and every subscriber
+    receives each event on its own queue, so consumers never have to poll.
+
+    Publishing never waits on subscribers: one that falls `max_pending_events` behind, e.g. because
+    it stopped reading, is dropped. Its pending events are replaced by a single None, which ends its stream.
+    """
+    def __init__(self, max_pending_events: int = 1000):
+        """
+        Args:
+            max_pending_events: How many events a subscriber can have waiting before it is dropped.
+        """
+        self.max_pending_events = max_pending_events
+        self._subscribers: Set[asyncio.Queue[Optional[CallStatusEvent]]] = set()
+
+    def subscribe(self) -> asyncio.Queue[Optional[CallStatusEvent]]:
+        """
+        Returns a queue that receives every status change published after this call, until it gets None.
+        """
+        queue: asyncio.Queue[Optional[CallStatusEvent]] = asyncio.Queue(maxsize=self.max_pending_events)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[Optional[CallStatusEvent]]):
+        """
+        Stops delivering events to a queue returned by `subscribe`.
+        """
+        self._subscribers.discard(queue)
+
+    def is_subscribed(self, queue: asyncio.Queue[Optional[CallStatusEvent]]) -> bool:
+        """
+        Whether a queue returned by `subscribe` still receives events, i.e. it wasn't unsubscribed or dropped.
+        """
+        return queue in self._subscribers
+
+    def publish(self, call_id: str, status: CallStatus):
+        """
+        Delivers a snapshot of the status to every subscriber, dropping the ones that fell too far behind.
+        """
+        event = CallStatusEvent(call_id=call_id, status=CallStatus(**status))
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Replace the events it hasn't read with the None that tells it it was dropped
+                self._subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
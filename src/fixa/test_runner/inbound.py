@@ -0,0 +1,73 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, Optional
+from fixa.agent import Agent
+from fixa.scenario import Scenario
+
+@dataclass
+class PendingInboundCall:
+    """An inbound test waiting for the agent under test to call its number.
+
+    Attributes:
+        to (str): The number the agent should call
+        from_ (Optional[str]): The number the agent calls from, or None to accept a call from any number
+        scenario (Scenario): The scenario the bot plays on the call
+        agent (Agent): The bot that answers the call
+        run_id (str): The run the test belongs to
+        call_sid (asyncio.Future[str]): Completes with the call's SID once the call arrives
+    """
+    to: str
+    from_: Optional[str]
+    scenario: Scenario
+    agent: Agent
+    run_id: str
+    call_sid: asyncio.Future[str]
+
+class InboundCallRegistry:
+    """
+    Matches incoming calls to the inbound tests waiting for them.
+
+    A runner registers a test on one of its listening numbers with `expect`, and the server's voice webhook
+    hands the next call to that number to the test with `match`. Each number has at most one test waiting
+    on it, so a call is always matched by the number it was made to.
+    """
+    def __init__(self):
+        self._pending: Dict[str, PendingInboundCall] = {}
+
+    def expect(self, to: str, from_: Optional[str], scenario: Scenario, agent: Agent, run_id: str) -> PendingInboundCall:
+        """
+        Registers a test waiting for a call to `to`.
+        """
+        if to in self._pending:
+            raise ValueError(f"A test is already waiting for a call to {to}")
+        pending = PendingInboundCall(
+            to=to,
+            from_=from_,
+            scenario=scenario,
+            agent=agent,
+            run_id=run_id,
+            call_sid=asyncio.get_running_loop().create_future(),
+        )
+        self._pending[to] = pending
+        return pending
+
+    def match(self, to: str, from_: str) -> Optional[PendingInboundCall]:
+        """
+        Returns the test waiting for a call from `from_` to `to`, no longer waiting, or None if there is none.
+        """
+        pending = self._pending.get(to)
+        if pending is None or pending.call_sid.done():
+            return None
+        if pending.from_ is not None and pending.from_ != from_:
+            return None
+        del self._pending[to]
+        return pending
+
+    def discard(self, pending: PendingInboundCall):
+        """
+        Stops waiting for a test's call.
+        """
+        if self._pending.get(pending.to) is pending:
+            del self._pending[pending.to]
+        if not pending.call_sid.done():
+            pending.call_sid.cancel()
@@ -0,0 +1,280 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+import math
+import time
+from typing import Callable, Collection, Deque, Dict, List, Literal, Optional, Tuple
+
+# Twilio error codes for a call refused because of the number it was placed from: a caller ID that isn't verified
+# on the account, or that Twilio won't accept as a caller ID
+NUMBER_ERROR_CODES = {21210, 21212}
+
+def is_number_error(error: BaseException) -> bool:
+    """
+    Whether a failure to place a call is down to the number it was placed from, so that placing it from another number may work.
+    Other failures, e.g. an invalid number to call, would fail from every number.
+    """
+    return getattr(error, "code", None) in NUMBER_ERROR_CODES
+
+def split_limit(limit: int, parts: int) -> List[int]:
+    """
+    Splits a limit into `parts` shares that add up to it, as evenly as possible, e.g. 5 into 3 is [2, 2, 1].
+    """
+    return [limit // parts + (1 if i < limit % parts else 0) for i in range(parts)]
+
+@dataclass
+class PhoneNumberHealth:
+    """How a number in a PhoneNumberPool has been doing.
+
+    Attributes:
+        number (str): The phone number
+        active (int): Calls from the number in flight
+        calls (int): Calls placed from the number
+        failures (int): Calls from the number that failed before connecting, e.g. busy, unanswered or rejected by Twilio
+        consecutive_failures (int): Failures since the number's last call that connected
+        disabled_until (Optional[float]): time.monotonic() when the number goes back into rotation, or None if it is in rotation
+    """
+    number: str
+    active: int = 0
+    calls: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    disabled_until: Optional[float] = None
+    _tokens: float = field(default=1.0, repr=False)
+    _last_refill: float = field(default_factory=time.monotonic, repr=False)
+
+class PhoneNumberPool:
+    """
+    Spreads outbound test calls across several "from" numbers, so that a suite isn't held to the call rate
+    and concurrency one number is allowed, and carriers don't see a burst of calls from a single number.
+
+    Each number has its own concurrency and rate budget. A number whose calls keep failing before they
+    connect (e.g. because carriers flagged it as spam) is taken out of rotation for a cooldown period.
+    The last number in rotation is never taken out of it, so that calls keep being placed.
+    """
+    def __init__(
+        self,
+        numbers: List[str],
+        strategy: Literal["least_loaded", "round_robin"] = "least_loaded",
+        max_concurrent_calls_per_number: Optional[int] = None,
+        calls_per_second_per_number: Optional[float] = None,
+        max_consecutive_failures: int = 3,
+        cooldown_seconds: float = 300,
+    ):
+        """
+        Args:
+            numbers: The phone numbers to place calls from.
+            strategy (optional): How to pick a number for each call. "least_loaded" picks the number with the fewest calls
+                in flight, and "round_robin" takes turns.
+            max_concurrent_calls_per_number (optional): The maximum number of calls in flight from each number. Unlimited if None.
+            calls_per_second_per_number (optional): The maximum rate at which calls are placed from each number. Unlimited if None.
+            max_consecutive_failures (optional): Failures in a row after which a number is taken out of rotation.
+            cooldown_seconds (optional): How long a number is kept out of rotation.
+        """
+        if not numbers:
+            raise ValueError("At least one phone number is required")
+        if len(set(numbers)) != len(numbers):
+            raise ValueError("Phone numbers must be unique")
+        if strategy not in ("least_loaded", "round_robin"):
+            raise ValueError(f"Invalid strategy: {strategy}. Must be least_loaded or round_robin.")
+        if max_concurrent_calls_per_number is not None and max_concurrent_calls_per_number < 1:
+            raise ValueError("max_concurrent_calls_per_number must be at least 1")
+        if calls_per_second_per_number is not None and calls_per_second_per_number <= 0:
+            raise ValueError("calls_per_second_per_number must be positive")
+        if max_consecutive_failures < 1:
+            raise ValueError("max_consecutive_failures must be at least 1")
+
+        self.numbers = list(numbers)
+        self.strategy = strategy
+        self.max_concurrent_calls_per_number = max_concurrent_calls_per_number
+        self.calls_per_second_per_number = calls_per_second_per_number
+        self.max_consecutive_failures = max_consecutive_failures
+        self.cooldown_seconds = cooldown_seconds
+        self.log: Callable[[str], None] = print
+
+        self._health: Dict[str, PhoneNumberHealth] = {number: PhoneNumberHealth(number) for number in numbers}
+        self._next = 0
+        self._waiters: Deque[Tuple[asyncio.Future[str], Collection[str]]] = deque()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    def __getstate__(self):
+        # Waiters and timers belong to the event loop of the process the pool is used in
+        state = self.__dict__.copy()
+        state["_waiters"] = deque()
+        state["_wakeup"] = None
+        state["log"] = print
+        return state
+
+    @property
+    def health(self) -> List[PhoneNumberHealth]:
+        """How each number has been doing, in the order the numbers were given."""
+        return [self._health[number] for number in self.numbers]
+
+    @property
+    def available(self) -> List[str]:
+        """The numbers in rotation."""
+        now = time.monotonic()
+        return [number for number in self.numbers if not self._is_disabled(self._health[number], now)]
+
+    async def acquire(self, exclude: Collection[str] = ()) -> str:
+        """
+        Waits until a number may place a call, and returns it. Every successful acquire must be paired with a `release`.
+        Args:
+            exclude (optional): Numbers not to use, e.g. ones the call already failed from.
+        """
+        waiter: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._waiters.append((waiter, exclude))
+        self._dispatch()
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The number was granted just before cancellation, so hand it back
+                self.release(waiter.result())
+            raise
+
+    def release(self, number: str, failed: Optional[bool] = None):
+        """
+        Frees a number's slot once its call has finished.
+        Args:
+            number: The number the call was placed from.
+            failed (optional): Whether the call failed before connecting, or None if the call says nothing about the number,
+                e.g. because it was never placed.
+        """
+        health = self._health[number]
+        health.active -= 1
+        if failed:
+            health.failures += 1
+            health.consecutive_failures += 1
+            if (
+                health.consecutive_failures >= self.max_consecutive_failures
+                and health.disabled_until is None
+                and len(self.available) > 1
+            ):
+                health.disabled_until = time.monotonic() + self.cooldown_seconds
+                self.log(f"📵 Taking {number} out of rotation for {self.cooldown_seconds:g}s after {health.consecutive_failures} failed calls in a row")
+        elif failed is not None:
+            health.consecutive_failures = 0
+        self._dispatch()
+
+    def split(self, parts: int) -> List["PhoneNumberPool"]:
+        """
+        Splits the pool into pools for up to `parts` runners that place calls at the same time, e.g. the shards of a ShardedTestRunner.
+        With at least as many numbers as parts, each part gets its own numbers. Otherwise every part shares every number,
+        with a share of each number's budget, and the shares add up to the budget. As each part may place at least one call
+        from each number at a time, there are no more parts than max_concurrent_calls_per_number allows.
+        """
+        if parts < 1:
+            raise ValueError("parts must be at least 1")
+        if len(self.numbers) >= parts:
+            return [self._copy(self.numbers[i::parts]) for i in range(parts)]
+        if self.max_concurrent_calls_per_number is not None:
+            parts = min(parts, self.max_concurrent_calls_per_number)
+            concurrency: List[Optional[int]] = list(split_limit(self.max_concurrent_calls_per_number, parts))
+        else:
+            concurrency = [None] * parts
+        return [
+            self._copy(
+                self.numbers,
+                max_concurrent_calls_per_number=concurrency[i],
+                calls_per_second_per_number=self.calls_per_second_per_number / parts if self.calls_per_second_per_number is not None else None,
+            )
+            for i in range(parts)
+        ]
+
+    def _copy(self, numbers: List[str], **overrides) -> "PhoneNumberPool":
+        options = dict(
+            strategy=self.strategy,
+            max_concurrent_calls_per_number=self.max_concurrent_calls_per_number,
+            calls_per_second_per_number=self.calls_per_second_per_number,
+            max_consecutive_failures=self.max_consecutive_failures,
+            cooldown_seconds=self.cooldown_seconds,
+        )
+        options.update(overrides)
+        return PhoneNumberPool(numbers, **options)
+
+    def _is_disabled(self, health: PhoneNumberHealth, now: float) -> bool:
+        if health.disabled_until is None:
+            return False
+        if now < health.disabled_until:
+            return True
+        # The cooldown is over, so the number gets another chance
+        health.disabled_until = None
+        health.consecutive_failures = 0
+        return False
+
+    def _refill(self, health: PhoneNumberHealth, now: float):
+        if self.calls_per_second_per_number is None:
+            return
+        health._tokens = min(1.0, health._tokens + (now - health._last_refill) * self.calls_per_second_per_number)
+        health._last_refill = now
+
+    def _pick(self, now: float, exclude: Collection[str]) -> Tuple[Optional[str], Optional[float]]:
+        """
+        Returns the number to place the next call from, or None and how long to wait until one may be available.
+        """
+        candidates: List[str] = []
+        wait = math.inf
+        for number in self.numbers:
+            if number in exclude:
+                continue
+            health = self._health[number]
+            if self._is_disabled(health, now):
+                assert health.disabled_until is not None
+                wait = min(wait, health.disabled_until - now)
+                continue
+            if self.max_concurrent_calls_per_number is not None and health.active >= self.max_concurrent_calls_per_number:
+                continue
+            self._refill(health, now)
+            if self.calls_per_second_per_number is not None and health._tokens < 1:
+                wait = min(wait, (1 - health._tokens) / self.calls_per_second_per_number)
+                continue
+            candidates.append(number)
+
+        if not candidates:
+            # Numbers at their concurrency limit free up on release, which dispatches again
+            return None, wait if wait != math.inf else None
+        if self.strategy == "least_loaded":
+            return min(candidates, key=lambda number: self._health[number].active), None
+        # Take the first available number at or after the one after the last pick
+        order = {number: i for i, number in enumerate(self.numbers)}
+        number = min(candidates, key=lambda number: (order[number] - self._next) % len(self.numbers))
+        self._next = order[number] + 1
+        return number, None
+
+    def _dispatch(self):
+        """
+        Grants numbers to waiting calls while any number has budget left.
+        """
+        while self._waiters:
+            waiter, exclude = self._waiters[0]
+            if waiter.done():
+                self._waiters.popleft()
+                continue
+            picked, wait = self._pick(time.monotonic(), exclude)
+            if picked is None:
+                if wait is not None:
+                    self._schedule_wakeup(wait)
+                return
+
+            self._waiters.popleft()
+            health = self._health[picked]
+            health.active += 1
+            health.calls += 1
+            if self.calls_per_second_per_number is not None:
+                health._tokens -= 1
+            waiter.set_result(picked)
+
+    def _schedule_wakeup(self, delay: float):
+        loop = asyncio.get_running_loop()
+        if self._wakeup is not None and not self._wakeup.cancelled():
+            # A rate limit may free up a number sooner than a cooldown ends
+            if self._wakeup.when() <= loop.time() + delay:
+                return
+            self._wakeup.cancel()
+
+        def wakeup():
+            self._wakeup = None
+            self._dispatch()
+
+        self._wakeup = loop.call_later(delay, wakeup)
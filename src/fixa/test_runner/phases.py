@@ -0,0 +1,91 @@
+import time
+from typing import Dict, List, Literal, Optional, Tuple
+from fixa.test_runner.views import CallDeadlines, CallStatus
+
+CallPhase = Literal["ringing", "connected", "ended", "queued", "evaluating", "done"]
+
+# Phases in the order a call goes through them
+PHASES: Tuple[CallPhase, ...] = ("ringing", "connected", "ended", "queued", "evaluating", "done")
+
+def phase_of(status: CallStatus) -> CallPhase:
+    """
+    Returns the phase a call is in according to its status on the server.
+    The runner moves calls on from "queued" itself, as it evaluates them.
+    """
+    if status["status"] == "error":
+        return "done"
+    if status["status"] == "completed":
+        if status["transcript"] is not None and status["stereo_recording_url"] is not None:
+            return "queued"
+        return "ended"
+    if status["stereo_recording_url"] is not None:
+        # The recording only arrives once the call is over
+        return "ended"
+    return "connected" if status["connected"] else "ringing"
+
+class CallPhaseTracker:
+    """
+    Follows each call of a run through its phases:
+
+        ringing -> connected -> ended -> queued -> evaluating -> done
+
+    and finds the calls that have spent longer in a phase than its deadline. Calls only ever move forward,
+    so a late status update can't bring a call back once it's done.
+    """
+    def __init__(self, deadlines: CallDeadlines):
+        self.deadlines = deadlines
+        self._phases: Dict[str, CallPhase] = {}
+        self._entered_at: Dict[str, float] = {}
+
+    def phase(self, call_id: str) -> Optional[CallPhase]:
+        return self._phases.get(call_id)
+
+    def advance(self, call_id: str, phase: CallPhase) -> bool:
+        """
+        Moves a call to a later phase. Returns whether the call's phase changed.
+        """
+        current = self._phases.get(call_id)
+        if current is not None and PHASES.index(phase) <= PHASES.index(current):
+            return False
+        self._phases[call_id] = phase
+        self._entered_at[call_id] = time.monotonic()
+        return True
+
+    def deadline(self, phase: CallPhase) -> Optional[float]:
+        """
+        Returns how long a call may spend in a phase, or None if there is no limit.
+        """
+        return {
+            "ringing": self.deadlines.ringing,
+            "connected": self.deadlines.connected,
+            "ended": self.deadlines.recording,
+            "evaluating": self.deadlines.evaluation,
+        }.get(phase)
+
+    def overdue(self) -> List[Tuple[str, CallPhase]]:
+        """
+        Returns the calls that have been in their phase for longer than its deadline, with that phase.
+        """
+        now = time.monotonic()
+        overdue = []
+        for call_id, phase in self._phases.items():
+            deadline = self.deadline(phase)
+            if deadline is not None and now - self._entered_at[call_id] > deadline:
+                overdue.append((call_id, phase))
+        return overdue
+
+    def counts(self) -> Dict[CallPhase, int]:
+        """
+        Returns the number of calls in each phase, in phase order.
+        """
+        counts: Dict[CallPhase, int] = {phase: 0 for phase in PHASES}
+        for phase in self._phases.values():
+            counts[phase] += 1
+        return counts
+
+    @property
+    def done(self) -> int:
+        """
+        The number of calls that are done.
+        """
+        return sum(1 for phase in self._phases.values() if phase == "done")
@@ -0,0 +1,209 @@
+from abc import ABC, abstractmethod
+import asyncio
+from dataclasses import asdict, dataclass
+import json
+import sys
+import time
+from typing import Callable, Dict, Optional, TextIO, Tuple
+
+@dataclass
+class StatusSnapshot:
+    """Progress of a run at one point in time.
+
+    Attributes:
+        elapsed (float): Seconds since the run started
+        total (int): Number of tests in the run
+        phases (Dict[str, int]): Number of calls in each phase, with tests whose call hasn't been placed yet as "pending"
+        done (int): Calls that are done, including failed ones
+        failed (int): Calls that failed or were given up on
+        calls_per_minute (Optional[float]): Rate at which calls have been finishing, or None before the first one
+        eta_seconds (Optional[float]): Estimated seconds until every call is done, or None before the first one finishes
+    """
+    elapsed: float
+    total: int
+    phases: Dict[str, int]
+    done: int
+    failed: int
+    calls_per_minute: Optional[float]
+    eta_seconds: Optional[float]
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s" if minutes else f"{seconds}s"
+
+class StatusRenderer(ABC):
+    """
+    Shows the progress of a run.
+
+    The runner only updates counters. The renderer reads them on its own task every `interval` seconds,
+    so the cost of writing output doesn't grow with the number of calls or slow down the runner.
+    """
+    def __init__(self, interval: float, stream: Optional[TextIO] = None):
+        """
+        Args:
+            interval: Seconds between updates.
+            stream (optional): Where to write. Defaults to stdout.
+        """
+        self.interval = interval
+        self.stream = stream
+        self._task: Optional[asyncio.Task] = None
+        self._counts: Optional[Callable[[], Tuple[Dict[str, int], int]]] = None
+        self._total = 0
+        self._started_at = 0.0
+
+    @property
+    def _out(self) -> TextIO:
+        return self.stream or sys.stdout
+
+    def start(self, total: int, counts: Callable[[], Tuple[Dict[str, int], int]]):
+        """
+        Starts rendering a run.
+        Args:
+            total: Number of tests in the run.
+            counts: Returns the number of calls in each phase and the number of failed calls.
+        """
+        self._total = total
+        self._counts = counts
+        self._started_at = time.monotonic()
+        self.on_start(total)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stops rendering, after rendering the final progress.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.render(self.snapshot(), final=True)
+
+    def snapshot(self) -> StatusSnapshot:
+        assert self._counts is not None, "Renderer not started"
+        phases, failed = self._counts()
+        phases = {"pending": max(0, self._total - sum(phases.values())), **phases}
+        done = phases.get("done", 0)
+        elapsed = time.monotonic() - self._started_at
+        calls_per_minute = done / elapsed * 60 if done and elapsed > 0 else None
+        eta_seconds = (self._total - done) / calls_per_minute * 60 if calls_per_minute else None
+        return StatusSnapshot(
+            elapsed=elapsed,
+            total=self._total,
+            phases=phases,
+            done=done,
+            failed=failed,
+            calls_per_minute=calls_per_minute,
+            eta_seconds=eta_seconds,
+        )
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.render(self.snapshot(), final=False)
+
+    def on_start(self, total: int):
+        pass
+
+    @abstractmethod
+    def render(self, snapshot: StatusSnapshot, final: bool):
+        raise NotImplementedError
+
+    @abstractmethod
+    def log(self, message: str):
+        """
+        Shows a one-off message, such as a call being given up on.
+        """
+        raise NotImplementedError
+
+class TtyStatusRenderer(StatusRenderer):
+    """
+    Keeps a single summary line up to date in a terminal.
+    """
+    def __init__(self, interval: float = 0.5, stream: Optional[TextIO] = None):
+        super().__init__(interval, stream)
+
+    def on_start(self, total: int):
+        self._out.write(f"\n🔄 Running {total} tests...\n\n")
+        self._out.flush()
+
+    def render(self, snapshot: StatusSnapshot, final: bool):
+        phases = " · ".join(f"{phase} {count}" for phase, count in snapshot.phases.items() if count and phase != "done")
+        line = f"📞 {snapshot.done}/{snapshot.total} done ({snapshot.failed} failed)"
+        if phases:
+            line += f" | {phases}"
+        if snapshot.calls_per_minute is not None:
+            line += f" | {snapshot.calls_per_minute:.1f} calls/min"
+        if snapshot.eta_seconds is not None and not final:
+            line += f" | ETA {_format_duration(snapshot.eta_seconds)}"
+        line += f" | {_format_duration(snapshot.elapsed)}"
+        self._out.write("\r\033[K" + line + ("\n" if final else ""))
+        self._out.flush()
+
+    def log(self, message: str):
+        # The summary line is redrawn below the message on the next update
+        self._out.write("\r\033[K" + message + "\n")
+        self._out.flush()
+
+class JsonLinesStatusRenderer(StatusRenderer):
+    """
+    Writes progress as JSON lines, for CI logs and other output that isn't a terminal.
+    Progress is only written when it changed since the last line.
+    """
+    def __init__(self, interval: float = 5, stream: Optional[TextIO] = None, name: Optional[str] = None):
+        """
+        Args:
+            interval: Seconds between updates.
+            stream (optional): Where to write. Defaults to stdout.
+            name (optional): Added to every line, to tell apart runs writing to the same output.
+        """
+        super().__init__(interval, stream)
+        self.name = name
+        self._last: Optional[Tuple] = None
+
+    def _write(self, record: Dict):
+        if self.name is not None:
+            record = {"name": self.name, **record}
+        self._out.write(json.dumps(record) + "\n")
+        self._out.flush()
+
+    def on_start(self, total: int):
+        self._last = None
+        self._write({"event": "start", "total": total})
+
+    def render(self, snapshot: StatusSnapshot, final: bool):
+        state = (tuple(snapshot.phases.items()), snapshot.failed)
+        if state == self._last and not final:
+            return
+        self._last = state
+        record = asdict(snapshot)
+        record["elapsed"] = round(snapshot.elapsed, 3)
+        for key in ("calls_per_minute", "eta_seconds"):
+            if record[key] is not None:
+                record[key] = round(record[key], 3)
+        self._write({"event": "finish" if final else "progress", **record})
+
+    def log(self, message: str):
+        self._write({"event": "log", "message": message})
+
+class QuietStatusRenderer(StatusRenderer):
+    """
+    Shows nothing while tests run.
+    """
+    def __init__(self):
+        super().__init__(interval=3600)
+
+    def render(self, snapshot: StatusSnapshot, final: bool):
+        pass
+
+    def log(self, message: str):
+        pass
+
+def default_status_renderer() -> StatusRenderer:
+    """
+    Returns a renderer for stdout: a live summary line in a terminal, and JSON lines otherwise.
+    """
+    return TtyStatusRenderer() if sys.stdout.isatty() else JsonLinesStatusRenderer()
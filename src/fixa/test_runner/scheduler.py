@@ -0,0 +1,110 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import List, Optional, Tuple
+
+class CallScheduler:
+    """
+    Decides when queued outbound test calls may be placed.
+
+    A call may start once a concurrency slot is free and the token bucket has a token.
+    Waiting calls are started in priority order (higher first), and in FIFO order within a priority.
+    """
+    def __init__(self, max_concurrent_calls: Optional[int] = None, calls_per_second: Optional[float] = None, burst: int = 1):
+        """
+        Args:
+            max_concurrent_calls (optional): The maximum number of calls in flight at once. Unlimited if None.
+            calls_per_second (optional): The rate at which calls may be placed. Unlimited if None.
+            burst (optional): How many calls may be placed back to back before calls_per_second applies.
+        """
+        if max_concurrent_calls is not None and max_concurrent_calls < 1:
+            raise ValueError("max_concurrent_calls must be at least 1")
+        if calls_per_second is not None and calls_per_second <= 0:
+            raise ValueError("calls_per_second must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.max_concurrent_calls = max_concurrent_calls
+        self.calls_per_second = calls_per_second
+        self.burst = burst
+
+        self._active = 0
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def active(self) -> int:
+        """The number of calls currently holding a slot."""
+        return self._active
+
+    @property
+    def pending(self) -> int:
+        """The number of calls waiting for a slot."""
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    async def acquire(self, priority: int = 0):
+        """
+        Waits until a call may be placed. Every successful acquire must be paired with a `release`.
+        Args:
+            priority (optional): Calls with a higher priority are placed first.
+        """
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._counter), waiter))
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just before cancellation, so hand it back
+                self.release()
+            raise
+
+    def release(self):
+        """
+        Frees the slot held by a call that has finished.
+        """
+        self._active -= 1
+        self._dispatch()
+
+    def _refill(self):
+        if self.calls_per_second is None:
+            return
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._last_refill) * self.calls_per_second)
+        self._last_refill = now
+
+    def _dispatch(self):
+        """
+        Grants slots to waiting calls while both the concurrency and rate limits allow it.
+        """
+        self._refill()
+        while self._waiters:
+            _, _, waiter = self._waiters[0]
+            if waiter.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self.max_concurrent_calls is not None and self._active >= self.max_concurrent_calls:
+                return
+            if self.calls_per_second is not None and self._tokens < 1:
+                self._schedule_wakeup((1 - self._tokens) / self.calls_per_second)
+                return
+
+            heapq.heappop(self._waiters)
+            self._active += 1
+            if self.calls_per_second is not None:
+                self._tokens -= 1
+            waiter.set_result(None)
+
+    def _schedule_wakeup(self, delay: float):
+        if self._wakeup is not None and not self._wakeup.cancelled():
+            return
+
+        def wakeup():
+            self._wakeup = None
+            self._dispatch()
+
+        self._wakeup = asyncio.get_running_loop().call_later(delay, wakeup)
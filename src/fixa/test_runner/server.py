@@ -1,18 +1,30 @@
+import asyncio
+from contextlib import asynccontextmanager
 import json
 import logging
+import time
 import uvicorn
 from fixa.bot import run_bot
+from fixa.bot_services import get_bot_service_factory
+from fixa.evaluators.callbacks import evaluation_callbacks
+from fixa import metrics
+from fixa.metrics import CallTimings, EventLoopLagMonitor
 from fixa.scenario import Scenario
 from fixa.agent import Agent
-from fastapi import FastAPI, WebSocket, Form
+from fixa.telephony import run_twilio_request
+from fastapi import Body, FastAPI, HTTPException, Request, WebSocket, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from twilio.rest import Client
 import os 
 from pydantic import BaseModel, Field
 import argparse
-from typing import Dict, Tuple, List, Literal, Optional
-from typing_extensions import TypedDict
+from typing import Any, Dict, Literal, Tuple, List, Optional
 from openai.types.chat import ChatCompletionMessageParam
+from fixa.test_runner.events import CallStatusChannel
+from fixa.test_runner.inbound import InboundCallRegistry, PendingInboundCall
+from fixa.test_runner.state import DEFAULT_RUN_ID, CallStateStore, InMemoryCallStateStore, SQLiteCallStateStore
+from fixa.test_runner.views import CallStatus
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -34,19 +46,78 @@ def set_twilio_client(client: Client):
     global twilio_client
     twilio_client = client
 
-# Store scenarios and agents by call_sid
-active_pairs: Dict[str, Tuple[Scenario, Agent]] = {}
+# Holds each call's scenario and agent, status and timings
+state_store: CallStateStore = InMemoryCallStateStore()
 
-class CallStatus(TypedDict):
-    status: Literal["in_progress", "completed", "error"]
-    transcript: Optional[List[ChatCompletionMessageParam]]
-    stereo_recording_url: Optional[str]
-    error: Optional[str]
+def get_state_store() -> CallStateStore:
+    """Get the server's call state store."""
+    return state_store
 
-# Mapping from call_sid to status
-call_status: Dict[str, CallStatus] = {}
+def set_state_store(store: CallStateStore):
+    """Replace the server's call state store."""
+    global state_store
+    state_store = store
 
-app = FastAPI()
+# Receives every change to a call's status made by this process
+status_channel = CallStatusChannel()
+
+# Seconds between evictions of stale finished calls from the state store
+EVICTION_INTERVAL = 60
+
+# Call progress events Twilio posts to /call-status
+CALL_STATUS_EVENTS = ["initiated", "ringing", "answered", "completed"]
+
+# Final Twilio call statuses of calls that were never answered
+UNANSWERED_CALL_STATUSES = ("busy", "no-answer", "failed", "canceled")
+
+# Progress of calls Twilio reported before the server registered them, with when it arrived
+early_call_progress: Dict[str, Tuple[str, float]] = {}
+
+# Inbound tests waiting for their call, and inbound calls whose recording starts once their media stream connects
+inbound_calls = InboundCallRegistry()
+inbound_calls_to_record: set[str] = set()
+
+# Webhook settings of the numbers pointed at the server for inbound tests, as they were before, by number SID
+INBOUND_WEBHOOK_FIELDS = ("voice_url", "voice_method", "status_callback", "status_callback_method")
+previous_inbound_webhooks: Dict[str, Dict[str, Any]] = {}
+
+def set_call_status(
+    call_sid: str,
+    status: Literal["in_progress", "completed", "error"],
+    transcript: Optional[List[ChatCompletionMessageParam]] = None,
+    stereo_recording_url: Optional[str] = None,
+    error: Optional[str] = None,
+    connected: bool = False,
+):
+    """Set the status of a call under a new version and notify status subscribers."""
+    current = state_store.set_status(call_sid, status, transcript=transcript, stereo_recording_url=stereo_recording_url, error=error, connected=connected)
+    status_channel.publish(call_sid, current)
+
+async def evict_stale_calls():
+    """Periodically drops finished calls that no runner collected, so that a long-lived server's memory stays flat."""
+    while True:
+        await asyncio.sleep(EVICTION_INTERVAL)
+        state_store.evict_stale()
+        # Progress of calls this server never registered, e.g. ones placed by another server
+        now = time.monotonic()
+        for call_sid, (_, received_at) in list(early_call_progress.items()):
+            if now - received_at > EVICTION_INTERVAL:
+                del early_call_progress[call_sid]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sample event loop lag for as long as the server runs
+    lag_monitor = EventLoopLagMonitor()
+    lag_monitor.start()
+    eviction_task = asyncio.create_task(evict_stale_calls())
+    try:
+        yield
+    finally:
+        eviction_task.cancel()
+        await lag_monitor.stop()
+        await restore_inbound_numbers()
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allow all origins for testing
@@ -69,6 +140,7 @@ class OutboundCallRequest(BaseModel):
     scenario_prompt: str
     agent_prompt: str
     agent_voice_id: str = "79a125e8-cd45-4c13-8a67-188112f4dd22"  # Default to British Lady
+    run_id: str = DEFAULT_RUN_ID
 
 class TranscriptRequest(BaseModel):
     call_sid: str
@@ -79,20 +151,85 @@ class RecordingRequest(BaseModel):
     CallSid: str
 
 @app.get("/status")
-async def status():
-    return call_status
+async def status(since: Optional[int] = None, include_transcript: bool = False, run_id: Optional[str] = None):
+    """
+    Returns the status of every call, or of the calls in a run if `run_id` is given.
 
-@app.post("/outbound")
-async def outbound_call(request: OutboundCallRequest):
+    If `since` is given, only the calls that changed after that cursor are returned, as
+    `{"cursor": ..., "calls": {...}}`. Pass the returned cursor as `since` on the next request.
+    Transcripts are left out of these incremental responses unless `include_transcript` is set.
+    """
+    if since is None:
+        return state_store.statuses(run_id)
+
+    cursor, changed = state_store.changes(since, run_id)
+    calls: Dict[str, Dict[str, Any]] = {}
+    for call_sid, current in changed.items():
+        if include_transcript:
+            calls[call_sid] = dict(current)
+        else:
+            calls[call_sid] = {k: v for k, v in current.items() if k != "transcript"}
+    return {"cursor": cursor, "calls": calls}
+
+def format_status_event(call_sid: str, status: CallStatus) -> str:
+    """
+    Formats a status change as a server-sent event.
+    """
+    return f"data: {json.dumps({'call_id': call_sid, 'status': status})}\n\n"
+
+@app.get("/status/stream")
+async def status_stream(request: Request):
+    """
+    Streams status changes as server-sent events, starting with the current status of every call.
+    """
+    async def event_generator():
+        queue = status_channel.subscribe()
+        try:
+            for call_sid, current in state_store.statuses().items():
+                yield format_status_event(call_sid, current)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    # Dropped for falling behind; the client reconnects to get a fresh snapshot
+                    break
+                yield format_status_event(event.call_id, event.status)
+        finally:
+            status_channel.unsubscribe(queue)
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+async def place_outbound_call(
+    to: str,
+    from_: str,
+    scenario_prompt: str,
+    agent_prompt: str,
+    agent_voice_id: str = "79a125e8-cd45-4c13-8a67-188112f4dd22",
+    run_id: str = DEFAULT_RUN_ID,
+) -> str:
+    """
+    Places an outbound test call through Twilio and registers it with the server. Returns the call SID.
+
+    The test runner calls this directly when the server runs in its process, so that its own requests
+    don't go out through the public URL, which is only needed for Twilio's webhooks and media stream.
+    """
     assert twilio_client is not None, "Twilio client not initialized"
     assert ngrok_url is not None, "ngrok URL not set"
     
-    call = twilio_client.calls.create(
+    outbound_at = time.monotonic()
+    call = await run_twilio_request(
+        twilio_client.calls.create,
         record=True,
         recording_channels="dual",
         recording_status_callback=f"{ngrok_url}/recording",
-        to=request.to,
-        from_=request.from_,
+        status_callback=f"{ngrok_url}/call-status",
+        status_callback_event=CALL_STATUS_EVENTS,
+        status_callback_method="POST",
+        to=to,
+        from_=from_,
         twiml=get_stream_twiml(),
     )
     call_sid = call.sid
@@ -100,22 +237,173 @@ async def outbound_call(request: OutboundCallRequest):
         raise ValueError("Call SID is None")
         
     # Create scenario and agent
-    scenario = Scenario(name="outbound_call", prompt=request.scenario_prompt)
-    agent = Agent(name="agent", prompt=request.agent_prompt, voice_id=request.agent_voice_id)
+    scenario = Scenario(name="outbound_call", prompt=scenario_prompt)
+    agent = Agent(name="agent", prompt=agent_prompt, voice_id=agent_voice_id)
     
     # Store them for this call
-    active_pairs[call_sid] = (scenario, agent)
+    state_store.add_call(call_sid, scenario, agent, run_id=run_id)
+    state_store.set_timings(call_sid, CallTimings(outbound_at=outbound_at))
 
     # Set the status to in_progress
-    call_status[call_sid] = {
-        "status": "in_progress",
-        "transcript": None,
-        "stereo_recording_url": None,
-        "error": None
-    }
-    logger.info(f"OUTBOUND CALL {call_sid} to {request.to}")
+    set_call_status(call_sid, "in_progress")
+    logger.info(f"OUTBOUND CALL {call_sid} to {to}")
+
+    # Catch up on progress Twilio reported while the call was being created
+    early = early_call_progress.pop(call_sid, None)
+    if early is not None:
+        update_call_progress(call_sid, early[0])
+    return call_sid
+
+def expect_inbound_call(
+    to: str,
+    from_: Optional[str],
+    scenario_prompt: str,
+    agent_prompt: str,
+    agent_voice_id: str = "79a125e8-cd45-4c13-8a67-188112f4dd22",
+    run_id: str = DEFAULT_RUN_ID,
+) -> PendingInboundCall:
+    """
+    Registers an inbound test call on one of the server's listening numbers. The returned call's `call_sid`
+    completes once the agent under test calls `to` (from `from_`, unless it is None) and the server answers.
+    """
+    scenario = Scenario(name="inbound_call", prompt=scenario_prompt)
+    agent = Agent(name="agent", prompt=agent_prompt, voice_id=agent_voice_id)
+    return inbound_calls.expect(to, from_, scenario, agent, run_id)
+
+async def configure_inbound_numbers(numbers: List[str]):
+    """
+    Points the voice webhook of each of the Twilio account's numbers at the server, so that calls to them reach /inbound.
+    Each number's previous webhook settings are kept, and put back by `restore_inbound_numbers`.
+    """
+    assert twilio_client is not None, "Twilio client not initialized"
+    assert ngrok_url is not None, "ngrok URL not set"
+
+    async def configure(number: str):
+        matches = await run_twilio_request(twilio_client.incoming_phone_numbers.list, phone_number=number, limit=1)
+        if not matches:
+            raise ValueError(f"{number} is not a phone number of this Twilio account")
+        # Keep the settings from before the first time the number was pointed at a server
+        previous_inbound_webhooks.setdefault(matches[0].sid, {field: getattr(matches[0], field, None) for field in INBOUND_WEBHOOK_FIELDS})
+        await run_twilio_request(
+            twilio_client.incoming_phone_numbers(matches[0].sid).update,
+            voice_url=f"{ngrok_url}/inbound",
+            voice_method="POST",
+            status_callback=f"{ngrok_url}/call-status",
+            status_callback_method="POST",
+        )
+
+    await asyncio.gather(*(configure(number) for number in numbers))
+
+async def restore_inbound_numbers():
+    """
+    Puts back the webhook settings that `configure_inbound_numbers` replaced, so the numbers don't keep pointing at
+    the server once it's gone.
+    """
+    if not previous_inbound_webhooks:
+        return
+    assert twilio_client is not None, "Twilio client not initialized"
+    webhooks = dict(previous_inbound_webhooks)
+    previous_inbound_webhooks.clear()
+
+    async def restore(sid: str, settings: Dict[str, Any]):
+        # An empty URL clears a webhook that wasn't set
+        update = {"voice_url": settings["voice_url"] or "", "status_callback": settings["status_callback"] or ""}
+        for field in ("voice_method", "status_callback_method"):
+            if settings[field] is not None:
+                update[field] = settings[field]
+        try:
+            await run_twilio_request(twilio_client.incoming_phone_numbers(sid).update, **update)
+        except Exception as e:
+            logger.error(f"Failed to restore the webhooks of phone number {sid}: {e}")
+
+    await asyncio.gather(*(restore(sid, settings) for sid, settings in webhooks.items()))
+
+@app.post("/inbound")
+async def inbound_call(CallSid: str = Form(), From: str = Form(), To: str = Form()):
+    """
+    Twilio's voice webhook for the listening numbers. Answers a call with the media stream if a test is waiting for it,
+    and rejects it otherwise.
+    """
+    pending = inbound_calls.match(To, From)
+    if pending is None:
+        logger.info(f"INBOUND CALL {CallSid} from {From} to {To} rejected: no test is waiting for it")
+        return Response("<Response><Reject/></Response>", media_type="application/xml")
+
+    state_store.add_call(CallSid, pending.scenario, pending.agent, run_id=pending.run_id)
+    state_store.set_timings(CallSid, CallTimings(outbound_at=time.monotonic()))
+    set_call_status(CallSid, "in_progress")
+    inbound_calls_to_record.add(CallSid)
+    # The call is ringing until the webhook answers it
+    get_bot_service_factory().prewarm(CallSid, pending.agent.voice_id)
+    pending.call_sid.set_result(CallSid)
+    logger.info(f"INBOUND CALL {CallSid} from {From} to {To}")
+    return Response(get_stream_twiml(), media_type="application/xml")
+
+async def start_recording(call_sid: str):
+    """
+    Starts a dual-channel recording of a call in progress, for inbound calls, which Twilio doesn't record on its own.
+    """
+    assert twilio_client is not None, "Twilio client not initialized"
+    try:
+        await run_twilio_request(
+            twilio_client.calls(call_sid).recordings.create,
+            recording_channels="dual",
+            recording_status_callback=f"{ngrok_url}/recording",
+        )
+    except Exception as e:
+        logger.error(f"Failed to start recording call {call_sid}: {str(e)}")
+
+@app.post("/outbound")
+async def outbound_call(request: OutboundCallRequest):
+    call_sid = await place_outbound_call(
+        to=request.to,
+        from_=request.from_,
+        scenario_prompt=request.scenario_prompt,
+        agent_prompt=request.agent_prompt,
+        agent_voice_id=request.agent_voice_id,
+        run_id=request.run_id,
+    )
     return {"success": True, "call_id": call_sid}
 
+def update_call_progress(call_sid: str, call_status: str):
+    """
+    Applies a Twilio call progress event to a call that hasn't connected its media stream yet.
+    A ringing or answered call gets its bot's services pre-warmed, and a call that ended without connecting fails right away.
+    """
+    current = state_store.get_status(call_sid)
+    if current is None or current["status"] != "in_progress" or current["connected"]:
+        # The media stream reports on calls from the moment it connects
+        return
+
+    services = get_bot_service_factory()
+    if call_status in ("ringing", "in-progress"):
+        # Pre-warm on answer too, in case the call was answered without a ringing event
+        pair = state_store.get_pair(call_sid)
+        if pair is not None:
+            services.prewarm(call_sid, pair[1].voice_id)
+    elif call_status in UNANSWERED_CALL_STATUSES or call_status == "completed":
+        error = f"call {call_status.replace('-', ' ')}" if call_status != "completed" else "call ended before the agent connected"
+        logger.info(f"CALL {call_sid} failed: {error}")
+        set_call_status(call_sid, "error", error=error)
+        state_store.remove_pair(call_sid)
+        services.discard_prewarmed(call_sid)
+        inbound_calls_to_record.discard(call_sid)
+
+@app.post("/call-status")
+async def call_status(CallSid: str = Form(), CallStatus: str = Form()):
+    """
+    Receives Twilio's call progress events (initiated, ringing, answered and completed).
+    """
+    logger.info(f"Call SID: {CallSid}, Call Status: {CallStatus}")
+    if CallStatus in ("queued", "initiated"):
+        return {"success": True}
+    if state_store.get_status(CallSid) is None:
+        # The event arrived before the call was registered, so it is applied once it is
+        early_call_progress[CallSid] = (CallStatus, time.monotonic())
+    else:
+        update_call_progress(CallSid, CallStatus)
+    return {"success": True}
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
@@ -127,55 +415,88 @@ async def websocket_endpoint(websocket: WebSocket):
     logger.info(f"WebSocket connection accepted for call {call_sid}")
     
     # Get the scenario and agent for this call
-    pair = active_pairs.get(call_sid)
+    pair = state_store.get_pair(call_sid)
     if not pair:
         logger.error(f"No scenario/agent pair found for call {call_sid}")
         return
         
     scenario, agent = pair
+    set_call_status(call_sid, "in_progress", connected=True)
+    recording_task = None
+    if call_sid in inbound_calls_to_record:
+        inbound_calls_to_record.discard(call_sid)
+        # Record alongside the bot starting, rather than holding it up
+        recording_task = asyncio.create_task(start_recording(call_sid))
+    timings = state_store.get_timings(call_sid) or CallTimings()
+    if timings.outbound_at is not None:
+        timings.outbound_to_connect = time.monotonic() - timings.outbound_at
+        metrics.outbound_to_connect.observe(timings.outbound_to_connect)
     try:
-        transcript = await run_bot(agent, scenario, websocket, stream_sid, call_sid)
-        call_status[call_sid] = {
-            "status": "completed",
-            "transcript": transcript,
-            "stereo_recording_url": None,
-            "error": None
-        }
+        transcript = await run_bot(agent, scenario, websocket, stream_sid, call_sid, timings)
+        state_store.set_timings(call_sid, timings)
+        # The recording may have arrived while the bot was shutting down
+        current = state_store.get_status(call_sid)
+        stereo_recording_url = current["stereo_recording_url"] if current is not None else None
+        set_call_status(call_sid, "completed", transcript=transcript, stereo_recording_url=stereo_recording_url, connected=True)
     except Exception as e:
         logger.error(f"Bot failed for call {call_sid}: {str(e)}")
-        call_status[call_sid] = {
-            "status": "error",
-            "transcript": None,
-            "stereo_recording_url": None,
-            "error": str(e)
-        }
+        state_store.set_timings(call_sid, timings)
+        set_call_status(call_sid, "error", error=str(e), connected=True)
     finally:
-        del active_pairs[call_sid]
+        state_store.remove_pair(call_sid)
+        if recording_task is not None:
+            await recording_task
 
 @app.post("/recording")
 async def recording(RecordingSid: str = Form(), RecordingUrl: str = Form(), CallSid: str = Form()):
     logger.info(f"Recording SID: {RecordingSid}, Recording URL: {RecordingUrl}, Call SID: {CallSid}")
-    if CallSid in call_status:
+    current = state_store.get_status(CallSid)
+    if current is not None:
         # Format the recording URL with authentication credentials
         account_sid = os.getenv("TWILIO_ACCOUNT_SID")
         auth_token = os.getenv("TWILIO_AUTH_TOKEN")
         base_url = RecordingUrl.replace("https://", "")
         authenticated_url = f"https://{account_sid}:{auth_token}@{base_url}"
-        call_status[CallSid]["stereo_recording_url"] = authenticated_url
-        if call_status[CallSid]["status"] != "completed":
-            # If recording is received before call is completed, mark as error
-            call_status[CallSid]["status"] = "error"
-            call_status[CallSid]["error"] = "agent failed to start"
+        if current["status"] == "in_progress" and current["connected"]:
+            # The call ended but its bot is still shutting down, which will complete the call
+            set_call_status(CallSid, "in_progress", stereo_recording_url=authenticated_url, connected=True)
+        elif current["status"] != "completed":
+            # If recording is received before the agent connected, mark as error
+            error = current["error"] if current["status"] == "error" and current["error"] else "agent failed to start"
+            set_call_status(CallSid, "error", transcript=current["transcript"], stereo_recording_url=authenticated_url, error=error, connected=current["connected"])
+        else:
+            set_call_status(CallSid, "completed", transcript=current["transcript"], stereo_recording_url=authenticated_url, error=current["error"], connected=current["connected"])
+    return {"success": True}
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Returns the server's metrics in the Prometheus text exposition format.
+    """
+    metrics.active_calls.set(state_store.active_calls())
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/evaluation-callback/{token}")
+async def evaluation_callback(token: str, payload: Dict[str, Any] = Body(...)):
+    """
+    Receives the results of an evaluation that an evaluator is waiting for.
+    """
+    if not evaluation_callbacks.resolve(token, payload):
+        raise HTTPException(status_code=404, detail="No evaluation is waiting for this token")
     return {"success": True}
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--port", type=int, required=True)
     parser.add_argument("--ngrok_url", type=str, required=True)
+    parser.add_argument("--state_db", type=str, help="SQLite database to keep call state in, shared by every server process using it")
     parsed_args = parser.parse_args()
     
     set_args(parsed_args.port, parsed_args.ngrok_url)
-    set_twilio_client(Client(os.getenv("TWILIO_ACCOUNT_SID"), os.getenv("TWILIO_AUTH_TOKEN")))
+    if parsed_args.state_db is not None:
+        set_state_store(SQLiteCallStateStore(parsed_args.state_db))
+    set_twilio_client(get_bot_service_factory().twilio_client)
+    get_bot_service_factory().preload()
     
     assert port is not None, "Port not set"
     uvicorn.run(app, host="0.0.0.0", port=port)
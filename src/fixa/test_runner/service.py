@@ -1,36 +1,99 @@
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
 import os
 from dotenv import load_dotenv
-from twilio.rest import Client
 import asyncio
-import sys
+import time
+import uuid
 import aiohttp
 import uvicorn
 from fixa import Test
+from fixa.bot_services import get_bot_service_factory
 from fixa.evaluators import BaseEvaluator
-from fixa.evaluators.evaluator import EvaluationResponse
+from fixa.evaluators.evaluator import EvaluationRequest, EvaluationResponse
+from fixa import metrics
 from fixa.telemetry.service import ProductTelemetry
 from fixa.telemetry.views import RunTestTelemetryEvent, TestResultsTelemetryEvent
-from fixa.test_runner.server import CallStatus, app, set_args, set_twilio_client
-from fixa.test_runner.views import TestResult
+from fixa.test_runner.evaluation_pool import EvaluationPool
+from fixa.test_runner.numbers import PhoneNumberPool, is_number_error
+from fixa.test_runner.scheduler import CallScheduler
+from fixa.test_runner.server import (
+    app,
+    configure_inbound_numbers,
+    expect_inbound_call,
+    get_state_store,
+    inbound_calls,
+    place_outbound_call,
+    restore_inbound_numbers,
+    set_args,
+    set_state_store,
+    set_twilio_client,
+    status_channel,
+)
+from fixa.test_runner.state import CallStateStore
+from fixa.test_runner.phases import CallPhase, CallPhaseTracker, phase_of
+from fixa.test_runner.renderer import StatusRenderer, default_status_renderer
+from fixa.test_runner.views import CallDeadlines, CallStatus, HttpPoolConfig, TestResult
 
-load_dotenv(override=True)
 REQUIRED_ENV_VARS = ["OPENAI_API_KEY", "DEEPGRAM_API_KEY", "CARTESIA_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "NGROK_AUTH_TOKEN"]
 
 class TestRunner:
     """
     A TestRunner is responsible for running tests.
+
+    By default each `run_tests` call starts the server and stops it again when the tests are done.
+    To keep the server and shared resources alive across several runs, use the runner as an async
+    context manager (or call `start` and `stop`):
+
+        async with TestRunner(port=8765, ngrok_url=ngrok_url, twilio_phone_number="+15554443333") as test_runner:
+            test_runner.add_test(test)
+            await test_runner.run_tests(phone_number="+15554443333")
+            test_runner.clear_tests()
+            ...
     """
     INBOUND = "inbound"
     OUTBOUND = "outbound"
 
-    def __init__(self, port: int, ngrok_url: str, twilio_phone_number: str, evaluator: BaseEvaluator | None = None):
+    def __init__(
+        self,
+        port: int,
+        ngrok_url: str,
+        twilio_phone_number: str | PhoneNumberPool,
+        evaluator: BaseEvaluator | None = None,
+        max_concurrent_calls: int | None = None,
+        calls_per_second: float | None = None,
+        http_pool: HttpPoolConfig | None = None,
+        max_concurrent_evaluations: int = 4,
+        evaluation_batch_size: int = 1,
+        state_store: CallStateStore | None = None,
+        deadlines: CallDeadlines | None = None,
+        status_renderer: StatusRenderer | None = None,
+        inbound_numbers: List[str] | None = None,
+        inbound_trigger: Callable[[Test, str], Awaitable[None]] | None = None,
+    ):
         """
         Args:
             port: The port to run the server on.
             ngrok_url: The URL to use for ngrok.
-            twilio_phone_number: The phone number to use as the "from" number for outbound test calls.
+            twilio_phone_number: The phone number to use as the "from" number for outbound test calls,
+                or a PhoneNumberPool to spread the calls across several numbers.
+            evaluator (optional): The evaluator to evaluate completed calls with.
+            max_concurrent_calls (optional): The maximum number of test calls in flight at once. Unlimited if None.
+            calls_per_second (optional): The maximum rate at which test calls are placed. Unlimited if None.
+            http_pool (optional): Connection pool settings for the HTTP session shared by the runner and evaluator.
+            max_concurrent_evaluations (optional): The number of calls evaluated at once. Further completed calls wait in a queue.
+            evaluation_batch_size (optional): The most queued calls sent to the evaluator's `evaluate_batch` together,
+                e.g. so that LocalEvaluator packs them into one request. Calls are evaluated one at a time if 1.
+            state_store (optional): Where the server keeps call state. Defaults to the server's in-memory store.
+            deadlines (optional): How long a call may spend in each phase before it is reported with an error.
+            status_renderer (optional): Shows progress while tests run. Defaults to a live summary line in a terminal, and JSON lines otherwise.
+            inbound_numbers (optional): The Twilio numbers the agent under test calls for inbound tests. Each has one test waiting
+                on it at a time, so this many inbound tests ring at once. Defaults to the numbers of twilio_phone_number.
+            inbound_trigger (optional): Called with each inbound test and the number reserved for it, to make the agent under test
+                call that number. If None, the runner waits for the calls to be made some other way.
         """
+        # Load the .env file here rather than on import, so that importing fixa has no side effects
+        load_dotenv(override=True)
+
         # Check that all required environment variables are set
         for env_var in REQUIRED_ENV_VARS:
             if env_var not in os.environ:
@@ -40,154 +103,409 @@ class TestRunner:
         self.port = port
         self.ngrok_url = ngrok_url
         self.twilio_phone_number = twilio_phone_number
+        self.phone_numbers = twilio_phone_number if isinstance(twilio_phone_number, PhoneNumberPool) else PhoneNumberPool([twilio_phone_number])
         self.evaluator = evaluator
         self.tests: list[Test] = []
+        self.scheduler = CallScheduler(max_concurrent_calls=max_concurrent_calls, calls_per_second=calls_per_second)
+        self.http_pool = http_pool or HttpPoolConfig()
+        self.evaluation_pool = EvaluationPool(
+            self._evaluate_call,
+            workers=max_concurrent_evaluations,
+            on_start=self._start_evaluating,
+            on_done=self._finish_call,
+            evaluate_batch=self._evaluate_calls,
+            batch_size=evaluation_batch_size,
+        )
+        self.state_store = state_store
+        self.deadlines = deadlines or CallDeadlines()
+        self.status_renderer = status_renderer or default_status_renderer()
+        self.evaluation_pool.log = self.status_renderer.log
+        self.phone_numbers.log = self.status_renderer.log
+        self.inbound_trigger = inbound_trigger
+        # Listening numbers are held from a test being registered on them until its call arrives
+        self.inbound_numbers = PhoneNumberPool(
+            inbound_numbers or self.phone_numbers.numbers,
+            max_concurrent_calls_per_number=1,
+            max_consecutive_failures=self.phone_numbers.max_consecutive_failures,
+            cooldown_seconds=self.phone_numbers.cooldown_seconds,
+        )
+        self.inbound_numbers.log = self.status_renderer.log
 
-        self._twilio_client = Client(os.getenv("TWILIO_ACCOUNT_SID"), os.getenv("TWILIO_AUTH_TOKEN"))
+        self._twilio_client = get_bot_service_factory().twilio_client
         self._telemetry = ProductTelemetry()
         self._status: Dict[str, CallStatus] = {}
         self._call_id_to_test: Dict[str, Test] = {}
         self._evaluation_results: Dict[str, EvaluationResponse] = {}
+        self._priorities: Dict[int, int] = {}
+        self._calls_holding_slot: set[str] = set()
+        self._call_numbers: Dict[str, str] = {}
+        self._finished_calls: set[str] = set()
+        self._reported_calls: set[str] = set()
+        self._results_ready: asyncio.Queue[Optional[str]] = asyncio.Queue()
+        self._phases = CallPhaseTracker(self.deadlines)
+        self._timeouts: Dict[str, str] = {}
+        self._failed_calls: set[str] = set()
+        self._call_finished = asyncio.Event()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._run_id: Optional[str] = None
+        self._started = False
+        self._inbound_numbers_configured = False
+        self._run_lock = asyncio.Lock()
 
-    def add_test(self, test: Test):
+    def add_test(self, test: Test, priority: int = 0):
         """
         Adds a test to the test runner.
+        Args:
+            test: The test to add.
+            priority (optional): Tests with a higher priority are called first when calls are rate limited.
         """
         self.tests.append(test)
+        self._priorities[id(test)] = priority
+
+    def clear_tests(self):
+        """
+        Removes every test that was added, e.g. to run a different set of tests on a started runner.
+        """
+        self.tests = []
+        self._priorities = {}
+
+    async def start(self):
+        """
+        Starts the server and the resources shared by every run, so that later `run_tests` calls reuse them.
+        """
+        if self._started:
+            return
+        await self._start_server()
+
+        # Share one pooled HTTP session with the evaluator, for as long as the runner is started
+        self._session = self._create_session()
+        if self.evaluator is not None:
+            self.evaluator.set_session(self._session)
+            self.evaluator.set_callback_url(f"{self.ngrok_url}/evaluation-callback")
+        self._started = True
+
+    async def stop(self):
+        """
+        Stops the server and releases the resources started by `start`.
+        """
+        if not self._started:
+            return
+        self._started = False
+        # Point the numbers used for inbound tests back where they were
+        await restore_inbound_numbers()
+        self._inbound_numbers_configured = False
+        if self.evaluator is not None:
+            self.evaluator.set_session(None)
+            self.evaluator.set_callback_url(None)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        await self._stop_server()
+
+    async def __aenter__(self) -> "TestRunner":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
 
     async def run_tests(self, phone_number: str, type: str=OUTBOUND) -> List[TestResult]:
         """
         Runs all the tests that were added to the test runner.
+        If the runner wasn't started, the server is started for this run and stopped after it.
         Args:
-            phone_number: The phone number to call (for outbound tests).
+            phone_number: The phone number to call (for outbound tests), or the number the agent under test calls from
+                (for inbound tests, where an empty string accepts calls from any number).
             type (optional): The type of test to run. Can be TestRunner.INBOUND or TestRunner.OUTBOUND.
+        Returns:
+            The results of every test, in the order the tests were added.
         """
-        await self._start_server()
+        positions: Dict[int, int] = {}
+        for i, test in enumerate(self.tests):
+            positions.setdefault(id(test), i)
+        # Results arrive as their calls finish, so put them back in the order the tests were added
+        test_results = sorted(
+            [result async for result in self._stream_tests(phone_number, type)],
+            key=lambda result: positions.get(id(result.test), len(positions)),
+        )
 
-        # Initialize test status display
-        print("\n🔄 Running Tests:\n")
-        for i, test in enumerate(self.tests, 1):
-            print(f"{i}. {test.scenario.name} ⏳ Pending...")
-            self._telemetry.capture(RunTestTelemetryEvent(test=test))
-
-        async with asyncio.TaskGroup() as tg, aiohttp.ClientSession() as session:
-            for i, test in enumerate(self.tests, 1):
-                if type == self.INBOUND:
-                    tg.create_task(self._run_inbound_test(test, phone_number))
-                elif type == self.OUTBOUND:
-                    tg.create_task(self._run_outbound_test(test, phone_number))
-                    # Move cursor up and update status
-                    sys.stdout.write(f"\033[{len(self.tests) - i + 1}A")
-                    print(f"{i}. {test.scenario.name} 📞 Calling...", " " * 20)
-                    sys.stdout.write(f"\033[{len(self.tests) - i + 1}B")
-                else:
-                    raise ValueError(f"Invalid test type: {type}. Must be TestRunner.INBOUND or TestRunner.OUTBOUND.")
-
-            completed_calls = set()
-            all_completed_iterations = 0 # keeps track of how many iterations have been done since all calls were completed
-
-            while len(completed_calls) < len(self.tests):
-                async with session.get(f"{self.ngrok_url}/status") as response:
-                    self._status = await response.json()
-
-                # Print status with simplified transcript info and recording URL
-                for call_id, status in self._status.items():
-                    transcript_status = "exists" if status["transcript"] is not None else "None"
-                    recording_url = status["stereo_recording_url"] or "None"
-                    status_str = status["status"]
-                    error = status["error"] or "None"
-                    print(f"Call {call_id}: status={status_str}, transcript={transcript_status}, recording={recording_url}, error={error}")
-
-                # Check for completed calls to evaluate
-                for call_id, status in self._status.items():
-                    if (
-                        call_id not in completed_calls
-                        and status["status"] != "in_progress"
-                    ):
-                        if status["status"] == "error":
-                            completed_calls.add(call_id)
-                        elif (
-                            status["status"] == "completed"
-                            and status["transcript"] is not None
-                            and status["stereo_recording_url"] is not None
-                        ):
-                            completed_calls.add(call_id)
-                            tg.create_task(self._evaluate_call(call_id))
-
-                # Check if all calls are completed
-                all_completed = True
-                for status in self._status.values():
-                    if status["status"] == "in_progress":
-                        all_completed = False
-                        break
-                if all_completed:
-                    all_completed_iterations += 1
-                    print(f"All calls complete! Waiting for evaluations to finish...{all_completed_iterations} second{all_completed_iterations != 1 and 's' or ''} (60s timeout)")
-                else:
-                    all_completed_iterations = 0
-
-                # Break if all calls are completed for more than 60 seconds (60 iterations)
-                # This catches the case where transcript or stereo_recording_url is never set on a call
-                if all_completed_iterations > 60:
-                    break
-
-                await asyncio.sleep(1)
-
-
-        # All tests are complete, stop the server
-        await self._stop_server()
-        
         print("\n✨ All tests completed!\n")
-        
+        if self.evaluator is not None:
+            pool_metrics = self.evaluation_pool.metrics
+            print(f"📈 Evaluations: {pool_metrics.completed} completed, {pool_metrics.failed} failed, {pool_metrics.retries} retried, max queue depth {pool_metrics.max_queue_depth}\n")
+
         # Display final results
         print("📊 Test Results:")
         print("=" * 50)
-        for call_id, status in self._status.items():
-            test = self._call_id_to_test[call_id]
-            if status["status"] == "error":
-                print(f"\n🎯 {test.scenario.name} ({test.agent.name})")
-                print(f"❌ Error: {status['error']}")
-            else:
-                recording_url = status["stereo_recording_url"]
-                print(f"\n🎯 {test.scenario.name} ({test.agent.name})")
-                print(f"🔊 Recording URL: {recording_url}")
-                if call_id in self._evaluation_results:
-                    if 'fixa_observe_call_url' in self._evaluation_results[call_id].extra_data:
-                        print(f"🔗 fixa-observe call analysis: {self._evaluation_results[call_id].extra_data['fixa_observe_call_url']}")
-                    for result in self._evaluation_results[call_id].evaluation_results:
-                        status = "✅" if result.passed else "❌"
-                        print(f"-- {status} {result.name}: {result.reason}")
+        for result in test_results:
+            self._print_result(result)
         print("\n" + "=" * 50)
 
-        test_results = []
-        for call_id, status in self._status.items():
-            test = self._call_id_to_test[call_id]
-            if status["status"] == "error":
-                test_results.append(
-                    TestResult(
-                        test=test,
-                        evaluation_results=None,
-                        transcript=[],
-                        stereo_recording_url="",
-                        error=status["error"]
-                    )
-                )
-            else:
-                test_results.append(
-                    TestResult(
-                        test=test, 
-                        evaluation_results=self._evaluation_results.get(call_id),
-                        transcript=status["transcript"] or [], 
-                        stereo_recording_url=status["stereo_recording_url"] or "",
-                        error=None
-                    )
-                )
         self._telemetry.capture(TestResultsTelemetryEvent(test_results=test_results))
         return test_results
 
-    async def _evaluate_call(self, call_id: str) -> Optional[EvaluationResponse]:
+    async def stream_tests(self, phone_number: str, type: str=OUTBOUND) -> AsyncIterator[TestResult]:
+        """
+        Runs all the tests that were added to the test runner, yielding each test's result as soon as
+        its call has finished and been evaluated, instead of once every call is done:
+
+            async for result in test_runner.stream_tests(phone_number="+15554443333"):
+                ...
+
+        If the runner wasn't started, the server is started for this run and stopped after it.
+        Args:
+            phone_number: The phone number to call (for outbound tests), or the number the agent under test calls from
+                (for inbound tests, where an empty string accepts calls from any number).
+            type (optional): The type of test to run. Can be TestRunner.INBOUND or TestRunner.OUTBOUND.
+        """
+        async for result in self._stream_tests(phone_number, type):
+            self._telemetry.capture(TestResultsTelemetryEvent(test_results=[result]))
+            yield result
+
+    async def _stream_tests(self, phone_number: str, type: str) -> AsyncIterator[TestResult]:
+        # Runs on one runner share its server and bookkeeping, so they take turns
+        async with self._run_lock:
+            started_for_run = not self._started
+            await self.start()
+            try:
+                async for result in self._stream_results(phone_number, type):
+                    yield result
+            finally:
+                if started_for_run:
+                    await self.stop()
+
+    async def _stream_results(self, phone_number: str, type: str) -> AsyncIterator[TestResult]:
+        # Scope this run's calls in the state store, so that the calls of other runs are never mixed in
+        self._run_id = uuid.uuid4().hex
+        state_store = get_state_store()
+        self._status = {}
+        self._call_id_to_test = {}
+        self._evaluation_results = {}
+        self._calls_holding_slot = set()
+        self._call_numbers = {}
+        self._finished_calls = set()
+        self._reported_calls = set()
+        self._results_ready = asyncio.Queue()
+        self._phases = CallPhaseTracker(self.deadlines)
+        self._timeouts = {}
+        self._failed_calls = set()
+
+        for test in self.tests:
+            self._telemetry.capture(RunTestTelemetryEvent(test=test))
+
+        if type == self.INBOUND and not self._inbound_numbers_configured:
+            await configure_inbound_numbers(self.inbound_numbers.numbers)
+            self._inbound_numbers_configured = True
+
+        calls = asyncio.create_task(self._run_calls(phone_number, type))
+        try:
+            while (call_id := await self._results_ready.get()) is not None:
+                result = self._build_result(call_id)
+                # Only the result holds on to the call's transcript and evaluation from here on
+                self._evaluation_results.pop(call_id, None)
+                self._status[call_id] = {**self._status[call_id], "transcript": None}
+                yield result
+            await calls
+        finally:
+            if not calls.done():
+                calls.cancel()
+            await asyncio.gather(calls, return_exceptions=True)
+            # The results hold everything the runner needs, so the run's state can be dropped
+            state_store.end_run(self._run_id)
+
+    async def _run_calls(self, phone_number: str, type: str):
         """
-        Evaluates a call.
+        Places the calls, follows their status and evaluates them, queueing each call on `_results_ready` once it's done.
+        """
+        state_store = get_state_store()
+
+        # Evaluate completed calls on their own bounded set of workers
+        self.evaluation_pool.start()
+
+        # Subscribe before placing any calls so that no status change is missed
+        status_updates = status_channel.subscribe()
+        cursor = state_store.cursor
+        # Show progress on its own task, from counters the loop below keeps up to date
+        self.status_renderer.start(len(self.tests), lambda: (self._phases.counts(), len(self._failed_calls)))
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for test in self.tests:
+                    if type == self.INBOUND:
+                        tg.create_task(self._run_inbound_test(test, phone_number))
+                    elif type == self.OUTBOUND:
+                        tg.create_task(self._run_outbound_test(test, phone_number))
+                    else:
+                        raise ValueError(f"Invalid test type: {type}. Must be TestRunner.INBOUND or TestRunner.OUTBOUND.")
+
+                # Follow every call until it's done
+                while self._phases.done < len(self.tests):
+                    # React as soon as the server publishes a status change or a call's evaluation finishes
+                    status_changed = asyncio.ensure_future(status_updates.get())
+                    call_finished = asyncio.ensure_future(self._call_finished.wait())
+                    await asyncio.wait([status_changed, call_finished], timeout=1, return_when=asyncio.FIRST_COMPLETED)
+                    status_changed.cancel()
+                    call_finished.cancel()
+                    self._call_finished.clear()
+                    while not status_updates.empty():
+                        status_updates.get_nowait()
+                    # The changes themselves come from the state store, so a subscription dropped for falling behind is just renewed
+                    if not status_channel.is_subscribed(status_updates):
+                        status_updates = status_channel.subscribe()
+
+                    # Read the changes from the state store, which also has those made by other server processes sharing it
+                    cursor, changes = state_store.changes(cursor, run_id=self._run_id)
+                    for call_id, status in changes.items():
+                        self._status[call_id] = status
+
+                        # Free the call's scheduler slot and number once the call itself is over
+                        if status["status"] != "in_progress":
+                            self._release_slot(call_id)
+
+                        # Move the call on, evaluating it once it has its transcript and recording
+                        phase = phase_of(status)
+                        if phase == "done":
+                            if self._phases.phase(call_id) != "done":
+                                self._failed_calls.add(call_id)
+                            self._finish_call(call_id)
+                        elif self._phases.advance(call_id, phase) and phase == "queued":
+                            self.evaluation_pool.submit(call_id)
+
+                    # Give up on the calls that are stuck
+                    for call_id, phase in self._phases.overdue():
+                        self._time_out_call(call_id, phase)
+
+        finally:
+            status_channel.unsubscribe(status_updates)
+            await self.evaluation_pool.stop()
+            await self.status_renderer.stop()
+            # Report the calls that never finished too, e.g. because their recording never arrived
+            for call_id in list(self._status):
+                self._finish_call(call_id)
+            self._results_ready.put_nowait(None)
+
+    def _time_out_call(self, call_id: str, phase: CallPhase):
+        """
+        Gives up on a call that spent too long in a phase, reporting it with an error.
+        """
+        deadline = self._phases.deadline(phase)
+        message = {
+            "ringing": f"Call did not connect within {deadline:g}s",
+            "connected": f"Call did not end within {deadline:g}s of connecting",
+            "ended": f"Transcript and recording did not arrive within {deadline:g}s of the call ending",
+            "evaluating": f"Evaluation did not finish within {deadline:g}s",
+        }[phase]
+        self.status_renderer.log(f"⏰ Call {call_id}: {message}")
+        self._timeouts[call_id] = message
+        self._failed_calls.add(call_id)
+        self._release_slot(call_id, failed=phase == "ringing")
+        self._finish_call(call_id)
+
+    def _release_slot(self, call_id: str, failed: Optional[bool] = None):
+        """
+        Frees the scheduler slot and "from" number a call held, once the call is over.
+        Args:
+            call_id: The call.
+            failed (optional): Whether the call failed before connecting. Taken from the call's status if None.
+        """
+        if call_id not in self._calls_holding_slot:
+            return
+        self._calls_holding_slot.remove(call_id)
+        self.scheduler.release()
+        if call_id not in self._call_numbers:
+            # Inbound calls give their listening number back as soon as they arrive
+            return
+        if failed is None:
+            status = self._status.get(call_id)
+            failed = status is not None and status["status"] == "error" and not status["connected"]
+        self.phone_numbers.release(self._call_numbers[call_id], failed=failed)
+
+    def _fail_unplaced_test(self, test: Test, error: str):
+        """
+        Reports a test whose call never took place, under a call ID of its own.
+        """
+        call_id = f"unplaced-{uuid.uuid4().hex}"
+        self._call_id_to_test[call_id] = test
+        self._status[call_id] = {
+            "status": "error",
+            "transcript": None,
+            "stereo_recording_url": None,
+            "error": error,
+            "connected": False,
+            "version": 0,
+        }
+        self._failed_calls.add(call_id)
+        self._finish_call(call_id)
+
+    def _start_evaluating(self, call_id: str):
+        self._phases.advance(call_id, "evaluating")
+
+    def _finish_call(self, call_id: str):
+        """
+        Marks a call as done, queueing its result once the test it belongs to is known.
+        """
+        self._phases.advance(call_id, "done")
+        self._call_finished.set()
+        self._finished_calls.add(call_id)
+        if call_id in self._call_id_to_test and call_id not in self._reported_calls:
+            self._reported_calls.add(call_id)
+            self._results_ready.put_nowait(call_id)
+
+    def _build_result(self, call_id: str) -> TestResult:
+        status = self._status[call_id]
+        test = self._call_id_to_test[call_id]
+        timings = get_state_store().get_timings(call_id)
+        if call_id in self._timeouts:
+            # Keep whatever the call got before it was given up on
+            return TestResult(
+                test=test,
+                evaluation_results=None,
+                transcript=status["transcript"] or [],
+                stereo_recording_url=status["stereo_recording_url"] or "",
+                error=self._timeouts[call_id],
+                timings=timings,
+                from_number=self._call_numbers.get(call_id),
+            )
+        if status["status"] == "error":
+            return TestResult(
+                test=test,
+                evaluation_results=None,
+                transcript=[],
+                stereo_recording_url="",
+                error=status["error"],
+                timings=timings,
+                from_number=self._call_numbers.get(call_id),
+            )
+        return TestResult(
+            test=test,
+            evaluation_results=self._evaluation_results.get(call_id),
+            transcript=status["transcript"] or [],
+            stereo_recording_url=status["stereo_recording_url"] or "",
+            error=None,
+            timings=timings,
+            from_number=self._call_numbers.get(call_id),
+        )
+
+    def _print_result(self, result: TestResult):
+        print(f"\n🎯 {result.test.scenario.name} ({result.test.agent.name})")
+        if result.error is not None:
+            print(f"❌ Error: {result.error}")
+            return
+        print(f"🔊 Recording URL: {result.stereo_recording_url}")
+        summary = result.timings.summary() if result.timings is not None else None
+        if summary is not None and summary["total_p50"] is not None:
+            print(f"⏱️ Bot turn latency: p50 {summary['total_p50']:.2f}s, p95 {summary['total_p95']:.2f}s over {summary['turns']} turns")
+        if summary is not None and summary["response_latency_p50"] is not None:
+            print(f"⏱️ Agent response latency: p50 {summary['response_latency_p50']:.2f}s, p95 {summary['response_latency_p95']:.2f}s, {summary['interruptions']} interruptions")
+        if result.evaluation_results is not None:
+            if 'fixa_observe_call_url' in result.evaluation_results.extra_data:
+                print(f"🔗 fixa-observe call analysis: {result.evaluation_results.extra_data['fixa_observe_call_url']}")
+            for evaluation_result in result.evaluation_results.evaluation_results:
+                status = "✅" if evaluation_result.passed else "❌"
+                print(f"-- {status} {evaluation_result.name}: {evaluation_result.reason}")
+
+    def _evaluation_request(self, call_id: str) -> Optional[EvaluationRequest]:
+        """
+        Builds the request to evaluate a call with, or None if it has nothing to evaluate.
         """
         call_status = self._status[call_id]
         test = self._call_id_to_test[call_id]
@@ -197,19 +515,60 @@ class TestRunner:
             or test is None
             or self.evaluator is None
         ):
+            return None
+        return EvaluationRequest(test.scenario, call_status["transcript"], call_status["stereo_recording_url"])
+
+    def _record_evaluation(self, call_id: str, evaluation_results: Optional[EvaluationResponse], duration: float):
+        metrics.evaluation_duration.observe(duration)
+        timings = get_state_store().get_timings(call_id)
+        if timings is not None:
+            timings.evaluation_duration = duration
+            get_state_store().set_timings(call_id, timings)
+        if evaluation_results is not None:
+            self._evaluation_results[call_id] = evaluation_results
+
+    async def _evaluate_call(self, call_id: str) -> Optional[EvaluationResponse]:
+        """
+        Evaluates a call. Errors are raised so that the evaluation pool can retry them.
+        """
+        request = self._evaluation_request(call_id)
+        if request is None or self.evaluator is None:
+            return None
+
+        start = time.monotonic()
+        evaluation_results = await self.evaluator.evaluate(request.scenario, request.transcript, request.stereo_recording_url)
+        self._record_evaluation(call_id, evaluation_results, time.monotonic() - start)
+        return evaluation_results
+
+    async def _evaluate_calls(self, call_ids: List[str]):
+        """
+        Evaluates several calls with one `evaluate_batch`. Errors are raised so that the evaluation pool can retry them.
+        """
+        requests: Dict[str, EvaluationRequest] = {}
+        for call_id in call_ids:
+            request = self._evaluation_request(call_id)
+            if request is not None:
+                requests[call_id] = request
+        if not requests or self.evaluator is None:
             return
 
-        try:
-            print(f"Evaluating call {call_id}...")
-            evaluation_results = await self.evaluator.evaluate(test.scenario, call_status["transcript"], call_status["stereo_recording_url"])
-            print(f"Evaluated call {call_id}!")
-            if evaluation_results is not None:
-                self._evaluation_results[call_id] = evaluation_results
-                return evaluation_results
-        except Exception as e:
-            print(f"❌ Failed to evaluate call {call_id}: {str(e)}")
+        start = time.monotonic()
+        responses = await self.evaluator.evaluate_batch(list(requests.values()))
+        duration = time.monotonic() - start
+        for call_id, evaluation_results in zip(requests, responses):
+            self._record_evaluation(call_id, evaluation_results, duration)
 
-        return None
+    def _create_session(self) -> aiohttp.ClientSession:
+        """
+        Creates the pooled HTTP session shared by the runner and evaluator.
+        """
+        connector = aiohttp.TCPConnector(
+            limit=self.http_pool.limit,
+            limit_per_host=self.http_pool.limit_per_host,
+            keepalive_timeout=self.http_pool.keepalive_timeout,
+            ttl_dns_cache=self.http_pool.dns_cache_ttl,
+        )
+        return aiohttp.ClientSession(connector=connector)
 
     async def _start_server(self):
         """
@@ -218,6 +577,11 @@ class TestRunner:
         # Initialize the server's global variables
         set_args(self.port, self.ngrok_url)
         set_twilio_client(self._twilio_client)
+        if self.state_store is not None:
+            set_state_store(self.state_store)
+
+        # Load the VAD model before the first call connects
+        await asyncio.to_thread(get_bot_service_factory().preload)
         
         # Configure uvicorn with shutdown timeout
         config = uvicorn.Config(app, host="0.0.0.0", port=self.port, log_level="info", timeout_keep_alive=5)
@@ -228,7 +592,9 @@ class TestRunner:
         
         # Wait for server to start
         while not self.server.started:
-            await asyncio.sleep(0.1)
+            if self.server_task.done():
+                raise Exception(f"Server failed to start on port {self.port}")
+            await asyncio.sleep(0.01)
         
         print("Server started...", flush=True)
 
@@ -256,28 +622,111 @@ class TestRunner:
             test: The test to run.
             phone_number: The phone number to call.
         """
+        # Wait for the scheduler to allow another call
+        await self.scheduler.acquire(self._priorities.get(id(test), 0))
+
         # print(f"\nRunning test: {test.scenario.name}")
-        async with aiohttp.ClientSession() as session:
+        tried: set[str] = set()
+        while True:
             try:
-                async with session.post(f"{self.ngrok_url}/outbound", json={
-                    "to": phone_number,
-                    "from": self.twilio_phone_number,
-                    "scenario_prompt": test.scenario.prompt,
-                    "agent_prompt": test.agent.prompt,
-                    "agent_voice_id": test.agent.voice_id,
-                }) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        raise Exception(f"Server error ({response.status}): {error_text}")
-                    
-                    response_json = await response.json()
-                    self._call_id_to_test[response_json["call_id"]] = test
-            except aiohttp.ClientError as e:
-                print(f"❌ Failed to make outbound call: {str(e)}")
+                # Wait for a number to place the call from
+                from_number = await self.phone_numbers.acquire(exclude=tried)
+            except BaseException:
+                self.scheduler.release()
                 raise
+            try:
+                # The server runs in this process, so place the call directly rather than through the public URL
+                assert self._run_id is not None, "Run not started"
+                call_id = await place_outbound_call(
+                    to=phone_number,
+                    from_=from_number,
+                    scenario_prompt=test.scenario.prompt,
+                    agent_prompt=test.agent.prompt,
+                    agent_voice_id=test.agent.voice_id,
+                    run_id=self._run_id,
+                )
+                break
+            except Exception as e:
+                # Only a call Twilio refused because of its number counts against the number, and is tried from another one
+                number_error = is_number_error(e)
+                self.phone_numbers.release(from_number, failed=True if number_error else None)
+                self.status_renderer.log(f"❌ Failed to make outbound call from {from_number}: {str(e)}")
+                tried.add(from_number)
+                if not number_error or not set(self.phone_numbers.available) - tried:
+                    self.scheduler.release()
+                    self._fail_unplaced_test(test, f"Failed to make outbound call: {str(e)}")
+                    return
+            except BaseException:
+                self.phone_numbers.release(from_number)
+                self.scheduler.release()
+                raise
+
+        self._call_numbers[call_id] = from_number
+        self._track_call(call_id, test)
 
-    def _run_inbound_test(self, test: Test, phone_number: str):
+    def _track_call(self, call_id: str, test: Test):
         """
-        Runs an inbound test.
+        Follows a call that has been placed, or has arrived, for a test.
         """
-        raise NotImplementedError("Inbound tests are not implemented yet")
\ No newline at end of file
+        self._call_id_to_test[call_id] = test
+        self._calls_holding_slot.add(call_id)
+        if call_id in self._finished_calls:
+            # The call's result was held back until its test was known
+            self._finish_call(call_id)
+        if call_id in self._status and self._status[call_id]["status"] != "in_progress":
+            # The call already finished before the runner saw it placed
+            self._release_slot(call_id)
+
+    async def _run_inbound_test(self, test: Test, phone_number: str):
+        """
+        Runs an inbound test: reserves a listening number, has the agent under test call it, and follows the call once it arrives.
+        Args:
+            test: The test to run.
+            phone_number: The number the agent calls from, or an empty string to accept a call from any number.
+        """
+        # Wait for the scheduler to allow another call, and for a number with no test waiting on it
+        await self.scheduler.acquire(self._priorities.get(id(test), 0))
+        try:
+            number = await self.inbound_numbers.acquire()
+        except BaseException:
+            self.scheduler.release()
+            raise
+
+        assert self._run_id is not None, "Run not started"
+        pending = expect_inbound_call(
+            to=number,
+            from_=phone_number or None,
+            scenario_prompt=test.scenario.prompt,
+            agent_prompt=test.agent.prompt,
+            agent_voice_id=test.agent.voice_id,
+            run_id=self._run_id,
+        )
+        error = None
+        try:
+            if self.inbound_trigger is not None:
+                await self.inbound_trigger(test, number)
+            else:
+                self.status_renderer.log(f"📲 Waiting for a call to {number} for {test.scenario.name} ({test.agent.name})")
+            await asyncio.wait([pending.call_sid], timeout=self.deadlines.ringing)
+            if not pending.call_sid.done():
+                error = f"No call to {number} arrived within {self.deadlines.ringing:g}s"
+        except Exception as e:
+            error = f"Failed to trigger a call to {number}: {str(e)}"
+        except BaseException:
+            inbound_calls.discard(pending)
+            self.inbound_numbers.release(number)
+            self.scheduler.release()
+            raise
+
+        if error is not None and not pending.call_sid.done():
+            # A number whose calls never arrive, e.g. because its webhook points elsewhere, is taken out of rotation
+            inbound_calls.discard(pending)
+            self.inbound_numbers.release(number, failed=True)
+            self.scheduler.release()
+            self.status_renderer.log(f"❌ {error}")
+            self._fail_unplaced_test(test, error)
+            return
+
+        # The number can take the next test's call while this one goes on
+        self.inbound_numbers.release(number, failed=False)
+        self._track_call(pending.call_sid.result(), test)
\ No newline at end of file
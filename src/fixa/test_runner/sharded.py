@@ -0,0 +1,269 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+import multiprocessing
+from typing import AsyncContextManager, Awaitable, Callable, Dict, List, Optional, Tuple
+from fixa import Test
+from fixa.evaluators import BaseEvaluator
+from fixa.test_runner.numbers import PhoneNumberPool, split_limit
+from fixa.test_runner.renderer import JsonLinesStatusRenderer
+from fixa.test_runner.service import TestRunner
+from fixa.test_runner.views import CallDeadlines, HttpPoolConfig, TestResult
+
+@dataclass
+class Shard:
+    """A worker process of a ShardedTestRunner, with its own server.
+
+    Attributes:
+        port (int): The port the shard's server runs on
+        ngrok_url (str): The public URL that reaches the shard's server, e.g. its own ngrok tunnel,
+            or a path on a shared ingress that forwards to the port
+    """
+    port: int
+    ngrok_url: str
+
+def split_tests(tests: List[Tuple[Test, int]], shards: int) -> List[List[int]]:
+    """
+    Splits (test, priority) pairs across shards round robin, highest priority first,
+    so that every shard gets a similar number of tests and a similar share of the high priority ones.
+    Returns the indices of each shard's tests in `tests`, in the order they were added.
+    """
+    ordered = sorted(range(len(tests)), key=lambda i: -tests[i][1])
+    split: List[List[int]] = [[] for _ in range(shards)]
+    for i, index in enumerate(ordered):
+        split[i % shards].append(index)
+    return [sorted(shard) for shard in split]
+
+@dataclass
+class _ShardConfig:
+    shard: Shard
+    twilio_phone_number: str | PhoneNumberPool
+    evaluator_factory: Optional[Callable[[], BaseEvaluator]]
+    max_concurrent_calls: Optional[int]
+    calls_per_second: Optional[float]
+    http_pool: Optional[HttpPoolConfig]
+    max_concurrent_evaluations: int
+    evaluation_batch_size: int
+    deadlines: Optional[CallDeadlines]
+    shard_context: Optional[Callable[[Shard], AsyncContextManager]]
+    inbound_numbers: Optional[List[str]]
+    inbound_trigger: Optional[Callable[[Test, str], Awaitable[None]]]
+
+async def _run_shard_async(config: _ShardConfig, tests: List[Tuple[Test, int]], phone_number: str, type: str) -> List[Tuple[int, TestResult]]:
+    context = config.shard_context(config.shard) if config.shard_context is not None else nullcontext()
+    async with context:
+        test_runner = TestRunner(
+            port=config.shard.port,
+            ngrok_url=config.shard.ngrok_url,
+            twilio_phone_number=config.twilio_phone_number,
+            evaluator=config.evaluator_factory() if config.evaluator_factory is not None else None,
+            max_concurrent_calls=config.max_concurrent_calls,
+            calls_per_second=config.calls_per_second,
+            http_pool=config.http_pool,
+            max_concurrent_evaluations=config.max_concurrent_evaluations,
+            evaluation_batch_size=config.evaluation_batch_size,
+            deadlines=config.deadlines,
+            inbound_numbers=config.inbound_numbers,
+            inbound_trigger=config.inbound_trigger,
+            # Shards share the coordinator's output, so each writes whole labelled lines instead of redrawing one
+            status_renderer=JsonLinesStatusRenderer(name=f"shard:{config.shard.port}"),
+        )
+        for test, priority in tests:
+            test_runner.add_test(test, priority)
+        test_results = await test_runner.run_tests(phone_number=phone_number, type=type)
+
+    # Tell the coordinator which of its tests each result is for, as the tests were copied into this process
+    index = {id(test): i for i, (test, _) in enumerate(tests)}
+    return [(index[id(result.test)], result) for result in test_results]
+
+def _run_shard(config: _ShardConfig, tests: List[Tuple[Test, int]], phone_number: str, type: str) -> List[Tuple[int, TestResult]]:
+    """
+    Runs a shard's tests in a worker process.
+    """
+    return asyncio.run(_run_shard_async(config, tests, phone_number, type))
+
+class ShardedTestRunner:
+    """
+    Runs tests across several worker processes, each with its own TestRunner, event loop and server,
+    so that the CPU-bound work of hosting media streams (VAD, resampling, audio serialization) scales with cores.
+
+    Tests are split across the shards and their results merged back together. Everything passed to a shard
+    is sent to its process, so tests must be picklable, and the evaluator is created in each process by
+    `evaluator_factory` (e.g. `LocalEvaluator` or `functools.partial(CloudEvaluator, api_key=...)`).
+    """
+    def __init__(
+        self,
+        shards: List[Shard],
+        twilio_phone_number: str | PhoneNumberPool,
+        evaluator_factory: Callable[[], BaseEvaluator] | None = None,
+        max_concurrent_calls: int | None = None,
+        calls_per_second: float | None = None,
+        http_pool: HttpPoolConfig | None = None,
+        max_concurrent_evaluations: int = 4,
+        evaluation_batch_size: int = 1,
+        deadlines: CallDeadlines | None = None,
+        shard_context: Callable[[Shard], AsyncContextManager] | None = None,
+        inbound_numbers: List[str] | None = None,
+        inbound_trigger: Callable[[Test, str], Awaitable[None]] | None = None,
+    ):
+        """
+        Args:
+            shards: The worker processes to run tests on.
+            twilio_phone_number: The phone number to use as the "from" number for outbound test calls,
+                or a PhoneNumberPool to spread the calls across several numbers. A pool is split between the shards.
+            evaluator_factory (optional): Creates the evaluator to evaluate completed calls with, in each shard's process.
+            max_concurrent_calls (optional): The maximum number of test calls in flight at once, across all shards. Unlimited if None.
+                Each shard places at least one call at a time, so with fewer than there are shards, only that many shards run.
+            calls_per_second (optional): The maximum rate at which test calls are placed, across all shards. Unlimited if None.
+            http_pool (optional): Connection pool settings for each shard's shared HTTP session.
+            max_concurrent_evaluations (optional): The number of calls each shard evaluates at once.
+            evaluation_batch_size (optional): The most queued calls each shard sends to the evaluator's `evaluate_batch` together.
+            deadlines (optional): How long a call may spend in each phase before it is reported with an error.
+            shard_context (optional): Creates an async context manager that each shard's process runs its tests in,
+                e.g. to set up per-process services with `set_bot_service_factory`.
+            inbound_numbers (optional): The Twilio numbers the agent under test calls for inbound tests. Defaults to the numbers
+                of twilio_phone_number. Each shard's server answers its own share of the numbers, so there are no more shards
+                running inbound tests than there are numbers.
+            inbound_trigger (optional): Called in each shard's process with each inbound test and the number reserved for it,
+                to make the agent under test call that number. It is sent to the shard's process, so it must be picklable.
+        """
+        if not shards:
+            raise ValueError("At least one shard is required")
+        if len({shard.port for shard in shards}) != len(shards):
+            raise ValueError("Each shard needs its own port")
+        if max_concurrent_calls is not None and max_concurrent_calls < 1:
+            raise ValueError("max_concurrent_calls must be at least 1")
+
+        self.shards = shards
+        self.twilio_phone_number = twilio_phone_number
+        self.evaluator_factory = evaluator_factory
+        self.max_concurrent_calls = max_concurrent_calls
+        self.calls_per_second = calls_per_second
+        self.http_pool = http_pool
+        self.max_concurrent_evaluations = max_concurrent_evaluations
+        self.evaluation_batch_size = evaluation_batch_size
+        self.deadlines = deadlines
+        self.shard_context = shard_context
+        self.inbound_numbers = inbound_numbers
+        self.inbound_trigger = inbound_trigger
+        self.tests: list[Test] = []
+        self._priorities: Dict[int, int] = {}
+
+    def add_test(self, test: Test, priority: int = 0):
+        """
+        Adds a test to the test runner.
+        Args:
+            test: The test to add.
+            priority (optional): Tests with a higher priority are called first when calls are rate limited.
+        """
+        self.tests.append(test)
+        self._priorities[id(test)] = priority
+
+    def _shard_config(
+        self,
+        shard: Shard,
+        max_concurrent_calls: Optional[int],
+        calls_per_second: Optional[float],
+        twilio_phone_number: str | PhoneNumberPool,
+        inbound_numbers: Optional[List[str]],
+    ) -> _ShardConfig:
+        return _ShardConfig(
+            shard=shard,
+            twilio_phone_number=twilio_phone_number,
+            evaluator_factory=self.evaluator_factory,
+            max_concurrent_calls=max_concurrent_calls,
+            calls_per_second=calls_per_second,
+            http_pool=self.http_pool,
+            max_concurrent_evaluations=self.max_concurrent_evaluations,
+            evaluation_batch_size=self.evaluation_batch_size,
+            deadlines=self.deadlines,
+            shard_context=self.shard_context,
+            inbound_numbers=inbound_numbers,
+            inbound_trigger=self.inbound_trigger,
+        )
+
+    def _split(self, tests: List[Tuple[Test, int]], type: str = TestRunner.OUTBOUND) -> List[Tuple[_ShardConfig, List[int]]]:
+        """
+        Picks the shards to run (test, priority) pairs on, with each shard's share of the call limits and numbers,
+        and the indices of its tests.
+        """
+        # Each shard places at least one call at a time, so no more shards run than there are tests or than the call limits allow
+        shard_count = min(len(self.shards), len(tests))
+        if self.max_concurrent_calls is not None:
+            shard_count = min(shard_count, self.max_concurrent_calls)
+        # Each listening number's webhook points at one server, so shards running inbound tests each need numbers of their own
+        if isinstance(self.twilio_phone_number, PhoneNumberPool):
+            listening_numbers = self.inbound_numbers or self.twilio_phone_number.numbers
+        else:
+            listening_numbers = self.inbound_numbers or [self.twilio_phone_number]
+        if type == TestRunner.INBOUND:
+            shard_count = min(shard_count, len(listening_numbers))
+        # Each shard places calls from its own share of the numbers, or of each number's budget
+        phone_numbers: List[str | PhoneNumberPool]
+        if isinstance(self.twilio_phone_number, PhoneNumberPool) and shard_count > 0:
+            phone_numbers = list(self.twilio_phone_number.split(shard_count))
+            shard_count = len(phone_numbers)
+        else:
+            phone_numbers = [self.twilio_phone_number] * shard_count
+
+        # The call limits apply across all shards, so each shard gets a share of them, and the shares add up to the limits
+        concurrency: List[Optional[int]] = (
+            list(split_limit(self.max_concurrent_calls, shard_count)) if self.max_concurrent_calls is not None else [None] * shard_count
+        )
+        rate = self.calls_per_second / shard_count if self.calls_per_second is not None and shard_count > 0 else None
+        configs = [
+            self._shard_config(shard, max_concurrent_calls, rate, numbers, listening_numbers[i::shard_count])
+            for i, (shard, max_concurrent_calls, numbers) in enumerate(zip(self.shards, concurrency, phone_numbers))
+        ]
+        return list(zip(configs, split_tests(tests, shard_count)))
+
+    async def run_tests(self, phone_number: str, type: str = TestRunner.OUTBOUND) -> List[TestResult]:
+        """
+        Runs all the tests that were added to the test runner, split across the shards.
+        Args:
+            phone_number: The phone number to call (for outbound tests), or the number the agent under test calls from
+                (for inbound tests, where an empty string accepts calls from any number).
+            type (optional): The type of test to run. Can be TestRunner.INBOUND or TestRunner.OUTBOUND.
+        Returns:
+            The results of every test, in the order the tests were added. If a shard fails, each of its tests has a result
+            with the shard's error.
+        """
+        tests = [(test, self._priorities.get(id(test), 0)) for test in self.tests]
+        split = self._split(tests, type)
+
+        print(f"\n🔀 Running {len(tests)} tests across {len(split)} shards\n")
+        outcomes: List[List[Tuple[int, TestResult]] | BaseException] = []
+        if split:
+            loop = asyncio.get_running_loop()
+            # Start worker processes from scratch instead of forking this process and its event loop
+            with ProcessPoolExecutor(max_workers=len(split), mp_context=multiprocessing.get_context("spawn")) as executor:
+                futures = [
+                    loop.run_in_executor(executor, _run_shard, config, [tests[i] for i in indices], phone_number, type)
+                    for config, indices in split
+                ]
+                outcomes = await asyncio.gather(*futures, return_exceptions=True)
+
+        # Each result is kept with the index of its test, so the results can be returned in the order the tests were added
+        indexed_results: List[Tuple[int, TestResult]] = []
+        for (config, indices), outcome in zip(split, outcomes):
+            shard = config.shard
+            if isinstance(outcome, BaseException):
+                print(f"❌ Shard on port {shard.port} failed: {outcome}")
+                for index in indices:
+                    indexed_results.append((index, TestResult(
+                        test=tests[index][0],
+                        evaluation_results=None,
+                        transcript=[],
+                        stereo_recording_url="",
+                        error=f"Shard on port {shard.port} failed: {outcome}",
+                    )))
+                continue
+            for i, result in outcome:
+                # Hand back the test that was added, not the worker process's copy of it
+                result.test = tests[indices[i]][0]
+                indexed_results.append((indices[i], result))
+        test_results = [result for _, result in sorted(indexed_results, key=lambda item: item[0])]
+
+        print(f"\n✨ All shards completed! {sum(1 for result in test_results if result.error is None)}/{len(test_results)} tests ran without errors\n")
+        return test_results
@@ -0,0 +1,404 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import asdict
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Literal, Optional, Tuple
+from openai.types.chat import ChatCompletionMessageParam
+from fixa.agent import Agent
+from fixa.evaluation import Evaluation
+from fixa.metrics import CallTimings
+from fixa.scenario import Scenario
+from fixa.test_runner.views import CallStatus
+
+DEFAULT_RUN_ID = "default"
+
+class CallStateStore(ABC):
+    """
+    Holds the server's per-call state: the scenario and agent of each active call, each call's status and timings.
+
+    Every call belongs to a run (the runner that placed it), so a runner only sees its own calls, and all of a run's
+    state is dropped with `end_run` once the runner has its results. Finished calls of runs that were never ended
+    (e.g. because the runner crashed) are dropped by `evict_stale` after `finished_call_ttl` seconds.
+
+    Status changes are numbered with a version that increases across the whole store, which serves as the cursor
+    for incremental status reads.
+    """
+    def __init__(self, finished_call_ttl: float = 3600):
+        """
+        Args:
+            finished_call_ttl (optional): Seconds after their last change that finished calls are evicted by `evict_stale`.
+        """
+        self.finished_call_ttl = finished_call_ttl
+
+    @abstractmethod
+    def add_call(self, call_sid: str, scenario: Scenario, agent: Agent, run_id: str = DEFAULT_RUN_ID):
+        """
+        Registers a new call in a run, with the scenario and agent its bot runs.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_pair(self, call_sid: str) -> Optional[Tuple[Scenario, Agent]]:
+        """
+        Returns the scenario and agent of an active call, or None if the call isn't active.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove_pair(self, call_sid: str):
+        """
+        Marks a call as no longer active, once its bot has finished.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def active_calls(self) -> int:
+        """
+        Returns the number of calls that were added and whose bot hasn't finished.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_status(
+        self,
+        call_sid: str,
+        status: Literal["in_progress", "completed", "error"],
+        transcript: Optional[List[ChatCompletionMessageParam]] = None,
+        stereo_recording_url: Optional[str] = None,
+        error: Optional[str] = None,
+        connected: bool = False,
+    ) -> CallStatus:
+        """
+        Sets the status of a call under a new version and returns it.
+        Calls that weren't added belong to the default run.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_status(self, call_sid: str) -> Optional[CallStatus]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def statuses(self, run_id: Optional[str] = None) -> Dict[str, CallStatus]:
+        """
+        Returns the status of every call (in a run, if given), ordered from least to most recently changed.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def changes(self, since: int, run_id: Optional[str] = None) -> Tuple[int, Dict[str, CallStatus]]:
+        """
+        Returns the current cursor and the calls (in a run, if given) that changed after the `since` cursor,
+        ordered from least to most recently changed.
+        """
+        raise NotImplementedError
+
+    @property
+    @abstractmethod
+    def cursor(self) -> int:
+        """
+        The version of the most recent status change.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_timings(self, call_sid: str) -> Optional[CallTimings]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_timings(self, call_sid: str, timings: CallTimings):
+        raise NotImplementedError
+
+    @abstractmethod
+    def end_run(self, run_id: str):
+        """
+        Drops all the state of a run's calls.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def evict_stale(self):
+        """
+        Drops the state of finished calls that haven't changed in `finished_call_ttl` seconds.
+        """
+        raise NotImplementedError
+
+class InMemoryCallStateStore(CallStateStore):
+    """
+    Keeps call state in this process's memory.
+    """
+    def __init__(self, finished_call_ttl: float = 3600):
+        super().__init__(finished_call_ttl)
+        self._runs: Dict[str, str] = {}
+        self._pairs: Dict[str, Tuple[Scenario, Agent]] = {}
+        # Ordered from least to most recently changed
+        self._status: Dict[str, CallStatus] = {}
+        self._timings: Dict[str, CallTimings] = {}
+        self._updated_at: Dict[str, float] = {}
+        self._version = 0
+
+    def add_call(self, call_sid: str, scenario: Scenario, agent: Agent, run_id: str = DEFAULT_RUN_ID):
+        self._runs[call_sid] = run_id
+        self._pairs[call_sid] = (scenario, agent)
+
+    def get_pair(self, call_sid: str) -> Optional[Tuple[Scenario, Agent]]:
+        return self._pairs.get(call_sid)
+
+    def remove_pair(self, call_sid: str):
+        self._pairs.pop(call_sid, None)
+
+    def active_calls(self) -> int:
+        return len(self._pairs)
+
+    def set_status(
+        self,
+        call_sid: str,
+        status: Literal["in_progress", "completed", "error"],
+        transcript: Optional[List[ChatCompletionMessageParam]] = None,
+        stereo_recording_url: Optional[str] = None,
+        error: Optional[str] = None,
+        connected: bool = False,
+    ) -> CallStatus:
+        self._version += 1
+        self._runs.setdefault(call_sid, DEFAULT_RUN_ID)
+        # Re-insert so that the statuses stay ordered by version
+        self._status.pop(call_sid, None)
+        self._status[call_sid] = {
+            "status": status,
+            "transcript": transcript,
+            "stereo_recording_url": stereo_recording_url,
+            "error": error,
+            "connected": connected,
+            "version": self._version,
+        }
+        self._updated_at[call_sid] = time.time()
+        return self._status[call_sid]
+
+    def get_status(self, call_sid: str) -> Optional[CallStatus]:
+        return self._status.get(call_sid)
+
+    def statuses(self, run_id: Optional[str] = None) -> Dict[str, CallStatus]:
+        if run_id is None:
+            return dict(self._status)
+        return {call_sid: status for call_sid, status in self._status.items() if self._runs.get(call_sid) == run_id}
+
+    def changes(self, since: int, run_id: Optional[str] = None) -> Tuple[int, Dict[str, CallStatus]]:
+        changed: Dict[str, CallStatus] = {}
+        for call_sid in reversed(self._status):
+            current = self._status[call_sid]
+            if current["version"] <= since:
+                break
+            if run_id is None or self._runs.get(call_sid) == run_id:
+                changed[call_sid] = current
+        return self._version, dict(reversed(changed.items()))
+
+    @property
+    def cursor(self) -> int:
+        return self._version
+
+    def get_timings(self, call_sid: str) -> Optional[CallTimings]:
+        return self._timings.get(call_sid)
+
+    def set_timings(self, call_sid: str, timings: CallTimings):
+        self._runs.setdefault(call_sid, DEFAULT_RUN_ID)
+        self._timings[call_sid] = timings
+
+    def _drop(self, call_sid: str):
+        for state in (self._runs, self._pairs, self._status, self._timings, self._updated_at):
+            state.pop(call_sid, None)
+
+    def end_run(self, run_id: str):
+        for call_sid in [call_sid for call_sid, run in self._runs.items() if run == run_id]:
+            self._drop(call_sid)
+
+    def evict_stale(self):
+        cutoff = time.time() - self.finished_call_ttl
+        for call_sid, status in list(self._status.items()):
+            if status["status"] != "in_progress" and call_sid not in self._pairs and self._updated_at[call_sid] < cutoff:
+                self._drop(call_sid)
+
+def _scenario_from_dict(data: dict) -> Scenario:
+    return Scenario(name=data["name"], prompt=data["prompt"], evaluations=[Evaluation(**e) for e in data["evaluations"]])
+
+class SQLiteCallStateStore(CallStateStore):
+    """
+    Keeps call state in a SQLite database, which several server processes on one host can share.
+
+    The database runs in WAL mode, so readers don't block the writer. Statuses and timings read from it are copies:
+    changes to them must be written back with `set_status` or `set_timings`.
+    """
+    def __init__(self, path: str, finished_call_ttl: float = 3600):
+        """
+        Args:
+            path: Path of the database file, created if it doesn't exist.
+            finished_call_ttl (optional): Seconds after their last change that finished calls are evicted by `evict_stale`.
+        """
+        super().__init__(finished_call_ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._transaction():
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS calls (
+                    call_sid TEXT PRIMARY KEY,
+                    run_id TEXT NOT NULL,
+                    pair TEXT,
+                    status TEXT,
+                    transcript TEXT,
+                    stereo_recording_url TEXT,
+                    error TEXT,
+                    connected INTEGER NOT NULL DEFAULT 0,
+                    version INTEGER,
+                    timings TEXT,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._db.execute("CREATE INDEX IF NOT EXISTS calls_version ON calls (version)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS calls_run_id ON calls (run_id)")
+            # The version counter lives on its own so that it never goes back when calls are evicted
+            self._db.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._db.execute("INSERT OR IGNORE INTO counters (name, value) VALUES ('status_version', 0)")
+
+    def close(self):
+        self._db.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            # Take the write lock up front, so that concurrent processes can't interleave versions
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _row_to_status(row: tuple) -> CallStatus:
+        status, transcript, stereo_recording_url, error, connected, version = row
+        return {
+            "status": status,
+            "transcript": json.loads(transcript) if transcript is not None else None,
+            "stereo_recording_url": stereo_recording_url,
+            "error": error,
+            "connected": bool(connected),
+            "version": version,
+        }
+
+    def add_call(self, call_sid: str, scenario: Scenario, agent: Agent, run_id: str = DEFAULT_RUN_ID):
+        pair = json.dumps({"scenario": asdict(scenario), "agent": asdict(agent)})
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO calls (call_sid, run_id, pair, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (call_sid) DO UPDATE SET run_id = excluded.run_id, pair = excluded.pair, updated_at = excluded.updated_at",
+                (call_sid, run_id, pair, time.time()),
+            )
+
+    def get_pair(self, call_sid: str) -> Optional[Tuple[Scenario, Agent]]:
+        rows = self._query("SELECT pair FROM calls WHERE call_sid = ?", (call_sid,))
+        if not rows or rows[0][0] is None:
+            return None
+        pair = json.loads(rows[0][0])
+        return _scenario_from_dict(pair["scenario"]), Agent(**pair["agent"])
+
+    def remove_pair(self, call_sid: str):
+        with self._transaction() as db:
+            db.execute("UPDATE calls SET pair = NULL WHERE call_sid = ?", (call_sid,))
+
+    def active_calls(self) -> int:
+        return self._query("SELECT COUNT(*) FROM calls WHERE pair IS NOT NULL")[0][0]
+
+    def set_status(
+        self,
+        call_sid: str,
+        status: Literal["in_progress", "completed", "error"],
+        transcript: Optional[List[ChatCompletionMessageParam]] = None,
+        stereo_recording_url: Optional[str] = None,
+        error: Optional[str] = None,
+        connected: bool = False,
+    ) -> CallStatus:
+        encoded_transcript = json.dumps(transcript) if transcript is not None else None
+        with self._transaction() as db:
+            db.execute("UPDATE counters SET value = value + 1 WHERE name = 'status_version'")
+            version = db.execute("SELECT value FROM counters WHERE name = 'status_version'").fetchone()[0]
+            db.execute(
+                "INSERT INTO calls (call_sid, run_id, status, transcript, stereo_recording_url, error, connected, version, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (call_sid) DO UPDATE SET status = excluded.status, transcript = excluded.transcript, "
+                "stereo_recording_url = excluded.stereo_recording_url, error = excluded.error, connected = excluded.connected, "
+                "version = excluded.version, updated_at = excluded.updated_at",
+                (call_sid, DEFAULT_RUN_ID, status, encoded_transcript, stereo_recording_url, error, int(connected), version, time.time()),
+            )
+        return {
+            "status": status,
+            "transcript": transcript,
+            "stereo_recording_url": stereo_recording_url,
+            "error": error,
+            "connected": connected,
+            "version": version,
+        }
+
+    def get_status(self, call_sid: str) -> Optional[CallStatus]:
+        rows = self._query(
+            "SELECT status, transcript, stereo_recording_url, error, connected, version FROM calls WHERE call_sid = ? AND version IS NOT NULL",
+            (call_sid,),
+        )
+        return self._row_to_status(rows[0]) if rows else None
+
+    def _select_statuses(self, where: str, params: tuple) -> Dict[str, CallStatus]:
+        rows = self._query(
+            f"SELECT call_sid, status, transcript, stereo_recording_url, error, connected, version FROM calls WHERE {where} ORDER BY version",
+            params,
+        )
+        return {row[0]: self._row_to_status(row[1:]) for row in rows}
+
+    def statuses(self, run_id: Optional[str] = None) -> Dict[str, CallStatus]:
+        if run_id is None:
+            return self._select_statuses("version IS NOT NULL", ())
+        return self._select_statuses("version IS NOT NULL AND run_id = ?", (run_id,))
+
+    def changes(self, since: int, run_id: Optional[str] = None) -> Tuple[int, Dict[str, CallStatus]]:
+        # Read the cursor first, so that a change made in between is returned again rather than skipped
+        cursor = self.cursor
+        if run_id is None:
+            return cursor, self._select_statuses("version > ?", (since,))
+        return cursor, self._select_statuses("version > ? AND run_id = ?", (since, run_id))
+
+    @property
+    def cursor(self) -> int:
+        return self._query("SELECT value FROM counters WHERE name = 'status_version'")[0][0]
+
+    def get_timings(self, call_sid: str) -> Optional[CallTimings]:
+        rows = self._query("SELECT timings FROM calls WHERE call_sid = ?", (call_sid,))
+        if not rows or rows[0][0] is None:
+            return None
+        return CallTimings.from_dict(json.loads(rows[0][0]))
+
+    def set_timings(self, call_sid: str, timings: CallTimings):
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO calls (call_sid, run_id, timings, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (call_sid) DO UPDATE SET timings = excluded.timings",
+                (call_sid, DEFAULT_RUN_ID, json.dumps(asdict(timings)), time.time()),
+            )
+
+    def end_run(self, run_id: str):
+        with self._transaction() as db:
+            db.execute("DELETE FROM calls WHERE run_id = ?", (run_id,))
+
+    def evict_stale(self):
+        with self._transaction() as db:
+            db.execute(
+                "DELETE FROM calls WHERE status IS NOT NULL AND status != 'in_progress' AND pair IS NULL AND updated_at < ?",
+                (time.time() - self.finished_call_ttl,),
+            )
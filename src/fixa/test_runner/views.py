@@ -1,9 +1,49 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Literal, Optional
+from typing_extensions import TypedDict
 from fixa.test import Test
 from fixa.evaluators.evaluator import EvaluationResponse
+from fixa.metrics import CallTimings
 from openai.types.chat import ChatCompletionMessageParam
 
+@dataclass
+class HttpPoolConfig:
+    """Connection pool settings for the HTTP session shared by the test runner and its evaluator.
+
+    Attributes:
+        limit (int): Maximum number of simultaneous connections (0 for no limit)
+        limit_per_host (int): Maximum number of simultaneous connections to a single host (0 for no limit)
+        keepalive_timeout (float): Seconds an idle connection is kept open for reuse
+        dns_cache_ttl (int): Seconds resolved host names are cached for
+    """
+    limit: int = 100
+    limit_per_host: int = 0
+    keepalive_timeout: float = 30
+    dns_cache_ttl: int = 300
+
+@dataclass
+class CallDeadlines:
+    """How long a test call may spend in each phase before it is given up on, in seconds.
+
+    Attributes:
+        ringing (float): From placing the call to its media stream connecting
+        connected (float): From the media stream connecting to the call ending
+        recording (float): From the call ending to its transcript and recording arriving
+        evaluation (float): From a worker starting to evaluate the call to its evaluation finishing, including retries
+    """
+    ringing: float = 60
+    connected: float = 1800
+    recording: float = 60
+    evaluation: float = 600
+
+class CallStatus(TypedDict):
+    status: Literal["in_progress", "completed", "error"]
+    transcript: Optional[List[ChatCompletionMessageParam]]
+    stereo_recording_url: Optional[str]
+    error: Optional[str]
+    connected: bool
+    version: int
+
 @dataclass
 class TestResult():
     """Result of a test.
@@ -14,9 +54,13 @@ class TestResult():
         transcript (List[ChatCompletionMessageParam]): The transcript of the test
         stereo_recording_url (str): The URL of the stereo recording of the test
         error (str | None): The error that occurred during the test
+        timings (Optional[CallTimings]): How long the call took to connect, the bot's latency on each turn and how long evaluation took
+        from_number (Optional[str]): The number the call was placed from
     """
     test: Test
     evaluation_results: Optional[EvaluationResponse]
     transcript: List[ChatCompletionMessageParam]
     stereo_recording_url: str
-    error: str | None = None
\ No newline at end of file
+    error: str | None = None
+    timings: Optional[CallTimings] = None
+    from_number: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,9 @@
+"""
+Local stand-ins for the external services fixa talks to, for tests and benchmarks.
+"""
+from .carrier import SimulatedCall, SimulatedCallScript, SimulatedCarrier
+from .observe_stub import FixaObserveStub
+from .openai_stub import create_openai_stub_app, create_openai_stub_client
+from .services import StubBotServiceFactory
+
+__all__ = ['SimulatedCall', 'SimulatedCallScript', 'SimulatedCarrier', 'create_openai_stub_app', 'create_openai_stub_client', 'FixaObserveStub', 'StubBotServiceFactory']
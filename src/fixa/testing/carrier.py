@@ -0,0 +1,459 @@
+import asyncio
+import base64
+from dataclasses import dataclass, field
+import json
+import math
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Set
+from urllib.parse import urlparse
+import uuid
+
+import aiohttp
+import numpy as np
+
+from pipecat.audio.utils import pcm_to_ulaw
+
+TWILIO_SAMPLE_RATE = 8000
+FRAME_SECONDS = 0.02
+# Bot audio that starts this long after the previous audio finished playing starts a new turn,
+# and the bot counts as done speaking once its audio has been quiet for this long
+BOT_QUIET_SECONDS = 0.25
+
+def _ulaw_frame(amplitude: int, frequency: float = 440) -> bytes:
+    """
+    Encodes one 20 ms media frame of a sine tone (or silence, for amplitude 0) as 8 kHz μ-law.
+    """
+    t = np.arange(int(TWILIO_SAMPLE_RATE * FRAME_SECONDS)) / TWILIO_SAMPLE_RATE
+    pcm = (amplitude * np.sin(2 * math.pi * frequency * t)).astype(np.int16).tobytes()
+    return pcm_to_ulaw(pcm, TWILIO_SAMPLE_RATE, TWILIO_SAMPLE_RATE)
+
+SPEECH_PAYLOAD = base64.b64encode(_ulaw_frame(8000)).decode("utf-8")
+SILENCE_PAYLOAD = base64.b64encode(_ulaw_frame(0)).decode("utf-8")
+
+@dataclass
+class SimulatedCallScript:
+    """How the simulated agent on the other end of each call behaves.
+
+    Attributes:
+        ring_seconds (float): Time between the call being created and answered
+        turns (int): Number of times the simulated agent speaks before hanging up
+        speech_seconds (float): Length of each of the simulated agent's turns
+        silence_seconds (float): Time the simulated agent listens after each turn
+        recording_delay_seconds (float): Time between the call ending and the recording callback, as recordings take Twilio a moment to process
+        response_delay_seconds (Optional[float]): If set, after each turn the simulated agent waits for the bot to reply (up to
+            silence_seconds) and starts speaking again this long after the reply finished playing, instead of listening for exactly
+            silence_seconds. Delays shorter than 0.25 s come out as 0.25 s, as that is how long the bot must be quiet to count as done.
+        unanswered_status (Optional[str]): If set, calls are never answered and end after ring_seconds with this Twilio status
+            (busy, no-answer, failed or canceled), without a recording
+    """
+    ring_seconds: float = 0.1
+    turns: int = 3
+    speech_seconds: float = 1.0
+    silence_seconds: float = 2.0
+    recording_delay_seconds: float = 1.0
+    response_delay_seconds: Optional[float] = None
+    unanswered_status: Optional[str] = None
+
+@dataclass
+class SimulatedCall:
+    """A call placed through the simulated carrier.
+
+    Attributes:
+        sid (str): The call SID
+        to (str): The number called
+        from_ (str): The number calling
+        status (str): Twilio call status (queued, ringing, in-progress, completed, or how an unanswered call ended)
+        created_at (float): time.monotonic() when the call was created
+        answered_at (Optional[float]): time.monotonic() when the media stream connected
+        first_media_at (Optional[float]): time.monotonic() when the first audio from the bot arrived
+        last_media_at (Optional[float]): time.monotonic() when the latest audio from the bot arrived
+        bot_audio_until (Optional[float]): time.monotonic() when the bot's audio received so far finishes playing
+        bot_turns (int): Number of times the bot started speaking
+        ended_at (Optional[float]): time.monotonic() when the call ended
+        media_frames_sent (int): Media messages sent to the server
+        media_frames_received (int): Media messages received from the server
+        hung_up_by_bot (bool): Whether the bot ended the call
+        error (Optional[str]): Why the call failed, if it did
+        status_callbacks (List[str]): Call statuses posted to the call's status callback, in order
+        direction (str): "outbound-api" for calls placed through `calls.create`, "inbound" for calls placed with `dial`
+    """
+    sid: str
+    to: str
+    from_: str
+    status: str = "queued"
+    direction: str = "outbound-api"
+    created_at: float = field(default_factory=time.monotonic)
+    answered_at: Optional[float] = None
+    first_media_at: Optional[float] = None
+    last_media_at: Optional[float] = None
+    bot_audio_until: Optional[float] = None
+    bot_turns: int = 0
+    ended_at: Optional[float] = None
+    media_frames_sent: int = 0
+    media_frames_received: int = 0
+    hung_up_by_bot: bool = False
+    error: Optional[str] = None
+    status_callbacks: List[str] = field(default_factory=list)
+    params: Dict[str, Any] = field(default_factory=dict, repr=False)
+    hangup: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+class _SimulatedRecordings:
+    def __init__(self, carrier: "SimulatedCarrier", sid: str):
+        self._carrier = carrier
+        self._sid = sid
+
+    def create(self, **kwargs):
+        # The recording is posted to its callback when the call ends
+        call = self._carrier.calls_by_sid[self._sid]
+        call.params["recording_status_callback"] = kwargs.get("recording_status_callback")
+        return SimpleNamespace(sid=f"RE{uuid.uuid4().hex}", call_sid=self._sid)
+
+class _SimulatedCallContext:
+    def __init__(self, carrier: "SimulatedCarrier", sid: str):
+        self._carrier = carrier
+        self._sid = sid
+        self.recordings = _SimulatedRecordings(carrier, sid)
+
+    def update(self, **kwargs):
+        call = self._carrier.calls_by_sid[self._sid]
+        twiml = kwargs.get("twiml") or ""
+        if "<Hangup" in twiml or kwargs.get("status") in ("completed", "canceled"):
+            call.hung_up_by_bot = True
+            self._carrier._call_soon(call.hangup.set)
+        return SimpleNamespace(sid=self._sid)
+
+class _SimulatedCalls:
+    def __init__(self, carrier: "SimulatedCarrier"):
+        self._carrier = carrier
+
+    def __call__(self, sid: str) -> _SimulatedCallContext:
+        return _SimulatedCallContext(self._carrier, sid)
+
+    def create(self, to: str, from_: str, **kwargs):
+        return SimpleNamespace(sid=self._carrier._create_call(to, from_, kwargs).sid)
+
+class _SimulatedIncomingPhoneNumberContext:
+    def __init__(self, carrier: "SimulatedCarrier", sid: str):
+        self._carrier = carrier
+        self._sid = sid
+
+    def update(self, **kwargs):
+        number = self._carrier._number_sids[self._sid]
+        self._carrier.numbers[number].update(kwargs)
+        return SimpleNamespace(sid=self._sid, phone_number=number)
+
+class _SimulatedIncomingPhoneNumbers:
+    def __init__(self, carrier: "SimulatedCarrier"):
+        self._carrier = carrier
+
+    def __call__(self, sid: str) -> _SimulatedIncomingPhoneNumberContext:
+        return _SimulatedIncomingPhoneNumberContext(self._carrier, sid)
+
+    def list(self, phone_number: Optional[str] = None, **kwargs):
+        # Every number belongs to the simulated account, so asking for one adds it
+        if phone_number is not None:
+            self._carrier.numbers.setdefault(phone_number, {})
+        return [
+            SimpleNamespace(
+                sid=self._carrier._number_sid(number),
+                phone_number=number,
+                voice_url=config.get("voice_url"),
+                voice_method=config.get("voice_method"),
+                status_callback=config.get("status_callback"),
+                status_callback_method=config.get("status_callback_method"),
+            )
+            for number, config in self._carrier.numbers.items()
+            if phone_number is None or number == phone_number
+        ]
+
+class SimulatedCarrier:
+    """
+    A local stand-in for Twilio, for load tests and benchmarks.
+
+    It can be used in place of the Twilio client: `calls.create` answers each call by connecting to the
+    runner server's /ws route and speaking the Twilio Media Streams protocol, with the simulated agent
+    alternating tone bursts and silence. It posts the call's progress to its status callback, for the events
+    it asked for, and when the call ends, it posts the recording callback. `calls(sid).update` hangs up the call.
+
+    `dial` places an inbound call instead, as the agent under test would: the carrier fetches the TwiML from the
+    voice webhook configured on the called number with `incoming_phone_numbers(sid).update`, and connects the
+    media stream unless the webhook rejects the call.
+
+    Use it as an async context manager, so it can schedule calls on the running event loop:
+
+        async with SimulatedCarrier("http://127.0.0.1:8765") as carrier:
+            set_bot_service_factory(StubBotServiceFactory(twilio_client=carrier))
+            ...
+    """
+    def __init__(self, server_url: str, script: Optional[SimulatedCallScript] = None, account_sid: str = "ACsimulated"):
+        """
+        Args:
+            server_url: Local URL of the runner server, e.g. http://127.0.0.1:8765.
+            script (optional): How the simulated agent behaves on each call.
+            account_sid (optional): Account SID reported in media stream messages.
+        """
+        self.server_url = server_url.rstrip("/")
+        self.script = script or SimulatedCallScript()
+        self.account_sid = account_sid
+        self.calls = _SimulatedCalls(self)
+        self.calls_by_sid: Dict[str, SimulatedCall] = {}
+        self.incoming_phone_numbers = _SimulatedIncomingPhoneNumbers(self)
+        self.numbers: Dict[str, Dict[str, Any]] = {}
+        self._number_sids: Dict[str, str] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "SimulatedCarrier":
+        self._loop = asyncio.get_running_loop()
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0))
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.wait_idle()
+        if self._session is not None:
+            await self._session.close()
+
+    @property
+    def port(self) -> Optional[int]:
+        """The port of the runner server the carrier calls."""
+        return urlparse(self.server_url).port
+
+    @property
+    def completed_calls(self) -> List[SimulatedCall]:
+        return [call for call in self.calls_by_sid.values() if call.status == "completed"]
+
+    async def wait_idle(self):
+        """
+        Waits for every call in progress to end.
+        """
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def _call_soon(self, callback, *args):
+        assert self._loop is not None, "SimulatedCarrier must be entered before placing calls"
+        self._loop.call_soon_threadsafe(callback, *args)
+
+    def _number_sid(self, number: str) -> str:
+        sid = next((sid for sid, known in self._number_sids.items() if known == number), None)
+        if sid is None:
+            sid = f"PN{uuid.uuid4().hex}"
+            self._number_sids[sid] = number
+        return sid
+
+    def dial(self, from_: str, to: str) -> SimulatedCall:
+        """
+        Places an inbound call from `from_` to one of the account's numbers, as the agent under test would.
+        """
+        config = self.numbers.get(to, {})
+        call = SimulatedCall(sid=f"CA{uuid.uuid4().hex}", to=to, from_=from_, direction="inbound", params={
+            # A number's status callback only hears when its calls complete
+            "status_callback": config.get("status_callback"),
+            "voice_url": config.get("voice_url"),
+        })
+        self.calls_by_sid[call.sid] = call
+        self._call_soon(self._start_call, call)
+        return call
+
+    def _create_call(self, to: str, from_: str, params: Dict[str, Any]) -> SimulatedCall:
+        # May be called from the Twilio thread pool, so the call itself is started on the event loop
+        call = SimulatedCall(sid=f"CA{uuid.uuid4().hex}", to=to, from_=from_, params=params)
+        self.calls_by_sid[call.sid] = call
+        self._call_soon(self._start_call, call)
+        return call
+
+    def _start_call(self, call: SimulatedCall):
+        self._spawn(self._run_call(call))
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _local_url(self, url: str) -> str:
+        """
+        Points a webhook URL at the local server, whatever public host it was registered with.
+        """
+        return self.server_url + urlparse(url).path
+
+    def _stream_message(self, stream_sid: str, event: str, **data) -> Dict[str, Any]:
+        return {"event": event, "streamSid": stream_sid, **data}
+
+    async def _run_call(self, call: SimulatedCall):
+        assert self._session is not None
+        stream_sid = f"MZ{uuid.uuid4().hex}"
+        self._post_call_status(call, "initiated", "initiated")
+        call.status = "ringing"
+        self._post_call_status(call, "ringing", "ringing")
+        await asyncio.sleep(self.script.ring_seconds)
+        if call.direction == "inbound" and not await self._fetch_twiml(call):
+            call.status = "busy"
+            call.ended_at = time.monotonic()
+            self._post_call_status(call, "completed", call.status)
+            return
+        if call.direction != "inbound" and self.script.unanswered_status is not None:
+            call.status = self.script.unanswered_status
+            call.ended_at = time.monotonic()
+            self._post_call_status(call, "completed", call.status)
+            return
+
+        self._post_call_status(call, "answered", "in-progress")
+        try:
+            ws_url = self.server_url.replace("http", "ws", 1) + "/ws"
+            async with self._session.ws_connect(ws_url) as ws:
+                call.status = "in-progress"
+                call.answered_at = time.monotonic()
+                await ws.send_json({"event": "connected", "protocol": "Call", "version": "1.0.0"})
+                await ws.send_json(self._stream_message(stream_sid, "start", start={
+                    "accountSid": self.account_sid,
+                    "streamSid": stream_sid,
+                    "callSid": call.sid,
+                    "tracks": ["inbound"],
+                    "customParameters": {},
+                    "mediaFormat": {"encoding": "audio/x-mulaw", "sampleRate": TWILIO_SAMPLE_RATE, "channels": 1},
+                }))
+
+                receiver = asyncio.create_task(self._receive(ws, call))
+                try:
+                    for _ in range(self.script.turns):
+                        if call.hangup.is_set():
+                            break
+                        await self._stream(ws, call, stream_sid, SPEECH_PAYLOAD, self.script.speech_seconds)
+                        if self.script.response_delay_seconds is None:
+                            await self._stream(ws, call, stream_sid, SILENCE_PAYLOAD, self.script.silence_seconds)
+                        else:
+                            await self._respond(ws, call, stream_sid, self.script.response_delay_seconds)
+                    if not ws.closed:
+                        await ws.send_json(self._stream_message(stream_sid, "stop", stop={
+                            "accountSid": self.account_sid,
+                            "callSid": call.sid,
+                        }))
+                finally:
+                    receiver.cancel()
+        except Exception as e:
+            call.error = str(e)
+        finally:
+            call.status = "completed"
+            call.ended_at = time.monotonic()
+
+        self._post_call_status(call, "completed", "completed")
+        await self._post_recording(call)
+
+    async def _stream(self, ws: aiohttp.ClientWebSocketResponse, call: SimulatedCall, stream_sid: str, payload: str, seconds: float, until: Optional[Callable[[], bool]] = None):
+        """
+        Sends media in real time, one 20 ms frame at a time, stopping early if `until` returns True.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for i in range(int(seconds / FRAME_SECONDS)):
+            if call.hangup.is_set() or ws.closed or (until is not None and until()):
+                return
+            call.media_frames_sent += 1
+            await ws.send_json(self._stream_message(stream_sid, "media", media={
+                "track": "inbound",
+                "chunk": str(call.media_frames_sent),
+                "timestamp": str(int(call.media_frames_sent * FRAME_SECONDS * 1000)),
+                "payload": payload,
+            }))
+            await asyncio.sleep(max(0, start + (i + 1) * FRAME_SECONDS - loop.time()))
+
+    async def _respond(self, ws: aiohttp.ClientWebSocketResponse, call: SimulatedCall, stream_sid: str, delay: float):
+        """
+        Listens until the bot has replied and its reply has finished playing, then for `delay` after that.
+        """
+        turns_before = call.bot_turns
+        def bot_finished() -> bool:
+            return (
+                call.bot_turns > turns_before
+                and call.bot_audio_until is not None
+                and time.monotonic() >= call.bot_audio_until + BOT_QUIET_SECONDS
+            )
+        await self._stream(ws, call, stream_sid, SILENCE_PAYLOAD, self.script.silence_seconds, until=bot_finished)
+        if call.bot_turns > turns_before and call.bot_audio_until is not None:
+            delay = call.bot_audio_until + delay - time.monotonic()
+        await self._stream(ws, call, stream_sid, SILENCE_PAYLOAD, max(0, delay))
+
+    async def _receive(self, ws: aiohttp.ClientWebSocketResponse, call: SimulatedCall):
+        async for message in ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                continue
+            data = json.loads(message.data)
+            now = time.monotonic()
+            if data.get("event") == "media":
+                call.media_frames_received += 1
+                call.last_media_at = now
+                if call.first_media_at is None:
+                    call.first_media_at = now
+                if call.bot_audio_until is None or now - call.bot_audio_until > BOT_QUIET_SECONDS:
+                    call.bot_turns += 1
+                # The bot sends audio faster than real time, so it plays out after the audio already received
+                duration = len(base64.b64decode(data["media"]["payload"])) / TWILIO_SAMPLE_RATE
+                call.bot_audio_until = max(call.bot_audio_until or now, now) + duration
+            elif data.get("event") == "clear":
+                call.bot_audio_until = now
+
+    async def _fetch_twiml(self, call: SimulatedCall) -> bool:
+        """
+        Asks the called number's voice webhook how to handle an inbound call. Returns whether it connected a media stream.
+        """
+        assert self._session is not None
+        voice_url = call.params.get("voice_url")
+        if not voice_url:
+            call.error = f"{call.to} has no voice webhook"
+            return False
+        try:
+            async with self._session.post(self._local_url(voice_url), data={
+                "CallSid": call.sid,
+                "AccountSid": self.account_sid,
+                "From": call.from_,
+                "To": call.to,
+                "CallStatus": "ringing",
+                "Direction": call.direction,
+            }) as response:
+                response.raise_for_status()
+                twiml = await response.text()
+        except aiohttp.ClientError as e:
+            call.error = f"voice webhook failed: {e}"
+            return False
+        return "<Stream" in twiml
+
+    def _post_call_status(self, call: SimulatedCall, event: str, status: str):
+        """
+        Posts a call progress event to the call's status callback, if it asked for that event.
+        Like Twilio, events are posted in the background, so the call doesn't wait for the server to answer.
+        """
+        callback = call.params.get("status_callback")
+        if not callback or event not in call.params.get("status_callback_event", ["completed"]):
+            return
+        call.status_callbacks.append(status)
+        self._spawn(self._post_status(call, callback, status))
+
+    async def _post_status(self, call: SimulatedCall, callback: str, status: str):
+        assert self._session is not None
+        data = {"CallSid": call.sid, "CallStatus": status, "To": call.to, "From": call.from_}
+        if status == "completed" and call.answered_at is not None and call.ended_at is not None:
+            data["CallDuration"] = str(int(call.ended_at - call.answered_at))
+        try:
+            async with self._session.post(self._local_url(callback), data=data) as response:
+                response.raise_for_status()
+        except aiohttp.ClientError as e:
+            call.error = call.error or f"status callback failed: {e}"
+
+    async def _post_recording(self, call: SimulatedCall):
+        callback = call.params.get("recording_status_callback")
+        if not callback:
+            return
+        assert self._session is not None
+        await asyncio.sleep(self.script.recording_delay_seconds)
+        recording_sid = f"RE{uuid.uuid4().hex}"
+        try:
+            async with self._session.post(self._local_url(callback), data={
+                "RecordingSid": recording_sid,
+                "RecordingUrl": f"https://api.twilio.com/2010-04-01/Accounts/{self.account_sid}/Recordings/{recording_sid}",
+                "CallSid": call.sid,
+            }) as response:
+                response.raise_for_status()
+        except aiohttp.ClientError as e:
+            call.error = call.error or f"recording callback failed: {e}"
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set
+import uuid
+
+import aiohttp
+from aiohttp import web
+
+class FixaObserveStub:
+    """
+    A local stand-in for the fixa-observe API that CloudEvaluator uploads calls to, answering every evaluation without analyzing the call.
+
+    Use it as an async context manager, and point CloudEvaluator at it with `api_url=stub.api_url`.
+    The uploaded calls, the times results were polled for and the statuses of the posted callbacks are kept on
+    `uploads`, `polls` and `callback_statuses`.
+    """
+    def __init__(self, polls_until_ready: Optional[int] = 0, send_callbacks: bool = True, callback_delay: float = 0, passed: bool = True):
+        """
+        Args:
+            polls_until_ready: How many polls for a call's results are answered with 404 before its results are returned.
+                Results are never returned by polling if None.
+            send_callbacks: Whether results are posted to the callback URL a call was uploaded with.
+            callback_delay: Seconds between a call being uploaded and its results being posted to its callback URL.
+            passed: Whether every evaluation criterion is reported as passed.
+        """
+        self.polls_until_ready = polls_until_ready
+        self.send_callbacks = send_callbacks
+        self.callback_delay = callback_delay
+        self.passed = passed
+        self.uploads: List[Dict[str, Any]] = []
+        self.polls: List[float] = []
+        self.callback_statuses: List[int] = []
+
+        self._calls: Dict[str, Dict[str, Any]] = {}
+        self._poll_counts: Dict[str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._runner: Optional[web.AppRunner] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._port: Optional[int] = None
+
+    async def __aenter__(self) -> "FixaObserveStub":
+        app = web.Application()
+        app.router.add_post("/v1/upload-call", self._upload_call)
+        app.router.add_get("/v1/calls/{call_id}", self._get_call)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self._port = self._runner.addresses[0][1]
+        self._session = aiohttp.ClientSession()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @property
+    def api_url(self) -> str:
+        """Base URL of the stub API, to pass to CloudEvaluator."""
+        assert self._port is not None, "Stub not started"
+        return f"http://127.0.0.1:{self._port}/v1"
+
+    def _results(self, call_id: str) -> Dict[str, Any]:
+        evaluations = self._calls[call_id]["scenario"]["evaluations"]
+        return {
+            "call": {
+                "evaluationResults": [
+                    {"evaluation": {"evaluationTemplate": {"name": e["name"]}}, "success": self.passed, "details": "stub evaluation"}
+                    for e in evaluations
+                ]
+            }
+        }
+
+    async def _upload_call(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self.uploads.append(payload)
+        call_id = f"observe-{uuid.uuid4().hex}"
+        self._calls[call_id] = payload
+        self._poll_counts[call_id] = 0
+        if self.send_callbacks and payload.get("callbackUrl"):
+            task = asyncio.create_task(self._send_callback(payload["callbackUrl"], call_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return web.json_response({"success": True, "callId": call_id})
+
+    async def _get_call(self, request: web.Request) -> web.Response:
+        call_id = request.match_info["call_id"]
+        self.polls.append(time.monotonic())
+        if call_id not in self._calls:
+            return web.json_response({"error": "Call not found"}, status=404)
+        self._poll_counts[call_id] += 1
+        if self.polls_until_ready is None or self._poll_counts[call_id] <= self.polls_until_ready:
+            return web.json_response({"error": "Call not evaluated yet"}, status=404)
+        return web.json_response(self._results(call_id))
+
+    async def _send_callback(self, callback_url: str, call_id: str):
+        assert self._session is not None
+        await asyncio.sleep(self.callback_delay)
+        async with self._session.post(callback_url, json=self._results(call_id)) as response:
+            self.callback_statuses.append(response.status)
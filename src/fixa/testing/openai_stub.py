@@ -0,0 +1,83 @@
+import ast
+import json
+import re
+import time
+import uuid
+from typing import Any, Dict, List
+
+import httpx
+from fastapi import FastAPI, Request
+from openai import AsyncOpenAI
+
+def _stub_results(criteria: List[Dict[str, Any]], passed: bool) -> List[Dict[str, Any]]:
+    return [{"name": c["name"], "passed": passed, "reason": "stub evaluation"} for c in criteria]
+
+def _stub_content(body: Dict[str, Any], passed: bool) -> str:
+    """
+    Builds a reply for the structured output formats used by LocalEvaluator, or plain text otherwise.
+    """
+    messages = body.get("messages", [])
+    schema_name = body.get("response_format", {}).get("json_schema", {}).get("name")
+    if schema_name == "BatchEvaluationResults":
+        content = messages[-1]["content"]
+        criteria_sets = {
+            int(match.group(1)): [{"name": name} for name in re.findall(r"^- (.+?): ", match.group(2), re.MULTILINE)]
+            for match in re.finditer(r"^Criteria (\d+):\n((?:- .*(?:\n|$))*)", content, re.MULTILINE)
+        }
+        calls = re.findall(r"^Call (\d+) \(criteria (\d+)\):$", content, re.MULTILINE)
+        return json.dumps({
+            "calls": [
+                {"call_index": int(call_index), "results": _stub_results(criteria_sets[int(criteria)], passed)}
+                for call_index, criteria in calls
+            ]
+        })
+    if schema_name == "EvaluationResults":
+        criteria = ast.literal_eval(messages[0]["content"].split("criteria:\n", 1)[1])
+        return json.dumps({"results": _stub_results(criteria, passed)})
+    return "stub response"
+
+def create_openai_stub_app(passed: bool = True) -> FastAPI:
+    """
+    Creates an OpenAI-compatible chat completions server that answers every evaluation without calling a model.
+
+    The number of requests and prompt characters it has received are kept on `app.state` as
+    `requests` and `prompt_chars`, and the request bodies as `bodies`.
+    Args:
+        passed (bool): Whether every evaluation criterion is reported as passed
+    """
+    app = FastAPI()
+    app.state.requests = 0
+    app.state.prompt_chars = 0
+    app.state.bodies = []
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        app.state.bodies.append(body)
+        app.state.prompt_chars += sum(len(str(m.get("content", ""))) for m in body.get("messages", []))
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": _stub_content(body, passed), "refusal": None},
+                "finish_reason": "stop",
+                "logprobs": None,
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    return app
+
+def create_openai_stub_client(app: FastAPI) -> AsyncOpenAI:
+    """
+    Creates an AsyncOpenAI client that sends its requests straight to a stub app, without opening a socket.
+    """
+    return AsyncOpenAI(
+        api_key="stub",
+        base_url="http://openai-stub/v1",
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=app)),
+    )
@@ -0,0 +1,132 @@
+from typing import AsyncGenerator, Optional
+
+import numpy as np
+from twilio.rest import Client
+
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
+from pipecat.frames.frames import (
+    Frame,
+    TextFrame,
+    TranscriptionFrame,
+    TTSAudioRawFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+    UserStoppedSpeakingFrame,
+)
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.ai_services import LLMService, STTService, TTSService
+from pipecat.services.openai import OpenAILLMService
+from pipecat.transcriptions.language import Language
+from pipecat.utils.time import time_now_iso8601
+
+from fixa.bot_services import BotServiceFactory
+
+class StubVADAnalyzer(VADAnalyzer):
+    """
+    A VAD analyzer that treats any audio above an energy threshold as speech, instead of running Silero.
+    """
+    def __init__(self, *, sample_rate: int = 16000, threshold: int = 500, params: VADParams = VADParams()):
+        self._threshold = threshold
+        super().__init__(sample_rate=sample_rate, num_channels=1, params=params)
+
+    def num_frames_required(self) -> int:
+        return 512 if self.sample_rate == 16000 else 256
+
+    def voice_confidence(self, buffer) -> float:
+        samples = np.frombuffer(buffer, np.int16).astype(np.float32)
+        rms = float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+        return 1.0 if rms >= self._threshold else 0.0
+
+class StubSTTService(STTService):
+    """
+    An STT service that emits a fixed transcription at the end of every user turn.
+    """
+    def __init__(self, text: str = "this is a simulated caller", **kwargs):
+        super().__init__(**kwargs)
+        self._text = text
+
+    async def set_model(self, model: str):
+        self.set_model_name(model)
+
+    async def set_language(self, language: Language):
+        pass
+
+    async def run_stt(self, audio: bytes) -> AsyncGenerator[Frame, None]:
+        # Audio is only needed for VAD, which runs in the transport
+        return
+        yield
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        if isinstance(frame, UserStoppedSpeakingFrame):
+            # The user aggregator expects the final transcription before the end of the turn
+            await self.push_frame(TranscriptionFrame(self._text, "", time_now_iso8601()), direction)
+        await super().process_frame(frame, direction)
+
+class StubLLMService(OpenAILLMService):
+    """
+    An OpenAI-compatible LLM service that answers every turn with a fixed reply, without calling a model.
+    """
+    def __init__(self, reply: str = "Sure, that sounds good.", **kwargs):
+        super().__init__(api_key="stub", **kwargs)
+        self._reply = reply
+
+    async def _process_context(self, context: OpenAILLMContext):
+        await self.push_frame(TextFrame(self._reply))
+
+class StubTTSService(TTSService):
+    """
+    A TTS service that synthesizes silence, sized to how long the text would take to say.
+    """
+    def __init__(self, seconds_per_word: float = 0.3, **kwargs):
+        super().__init__(**kwargs)
+        self._seconds_per_word = seconds_per_word
+
+    def can_generate_metrics(self) -> bool:
+        return False
+
+    async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
+        yield TTSStartedFrame()
+        num_samples = int(len(text.split()) * self._seconds_per_word * self.sample_rate)
+        yield TTSAudioRawFrame(audio=bytes(2 * num_samples), sample_rate=self.sample_rate, num_channels=1)
+        yield TTSStoppedFrame()
+
+class StubBotServiceFactory(BotServiceFactory):
+    """
+    Creates stub services for the bot, so calls run through the real pipeline without Silero,
+    Deepgram, OpenAI or Cartesia.
+    """
+    def __init__(
+        self,
+        twilio_client: Optional[Client] = None,
+        transcription: str = "this is a simulated caller",
+        reply: str = "Sure, that sounds good.",
+    ):
+        """
+        Args:
+            twilio_client (optional): The Twilio client to hand to the runner and bots, e.g. a SimulatedCarrier.
+            transcription (str): What the STT service hears every turn.
+            reply (str): What the LLM service says every turn.
+        """
+        super().__init__()
+        self._twilio_client = twilio_client
+        self.transcription = transcription
+        self.reply = reply
+
+    def preload(self):
+        pass
+
+    async def warm_llm(self):
+        pass
+
+    def create_vad_analyzer(self) -> VADAnalyzer:
+        return StubVADAnalyzer()
+
+    def create_llm(self, model: str = "gpt-4o") -> LLMService:
+        return StubLLMService(reply=self.reply, model=model)
+
+    def create_stt(self) -> STTService:
+        return StubSTTService(text=self.transcription)
+
+    def create_tts(self, voice_id: str) -> TTSService:
+        return StubTTSService()
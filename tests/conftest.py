@@ -0,0 +1,67 @@
+import os
+
+# the simulated carrier and stub services stand in for every external service
+for env_var in ["OPENAI_API_KEY", "DEEPGRAM_API_KEY", "CARTESIA_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "NGROK_AUTH_TOKEN"]:
+    os.environ.setdefault(env_var, "simulated")
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "false")
+
+from contextlib import AsyncExitStack
+import socket
+from typing import Callable, List, Optional, Type
+
+import pytest
+
+from fixa import Agent, Evaluation, Scenario, Test
+from fixa.bot_services import get_bot_service_factory, set_bot_service_factory
+from fixa.testing import SimulatedCallScript, SimulatedCarrier, StubBotServiceFactory
+
+def find_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@pytest.fixture
+def free_port() -> Callable[[], int]:
+    """
+    Finds a local TCP port that nothing is listening on, each time it is called.
+    """
+    return find_free_port
+
+@pytest.fixture
+def make_tests() -> Callable[..., List[Test]]:
+    """
+    Makes tests of one donut order scenario, each with its own agent.
+    """
+    scenario = Scenario(
+        name="order_donut",
+        prompt="order a dozen donuts with sprinkles and a coffee",
+        evaluations=[Evaluation(name="order_success", prompt="the order was successful")],
+    )
+    def make(count: int, prefix: str = "agent") -> List[Test]:
+        return [Test(scenario=scenario, agent=Agent(name=f"{prefix}_{i}", prompt="you are a simulated caller")) for i in range(count)]
+    return make
+
+@pytest.fixture
+async def simulated_carrier(free_port):
+    """
+    Starts simulated carriers, each calling a runner server on its own free port (`carrier.port`), and points the
+    bot services at the latest one. The carriers are waited on when the test ends, and the bot service factory is put back.
+
+        carrier = await simulated_carrier(script=SimulatedCallScript(turns=1))
+        test_runner = TestRunner(port=carrier.port, ngrok_url=carrier.server_url, ...)
+    """
+    previous_factory = get_bot_service_factory()
+
+    try:
+        async with AsyncExitStack() as stack:
+            async def start(
+                script: Optional[SimulatedCallScript] = None,
+                carrier_class: Type[SimulatedCarrier] = SimulatedCarrier,
+                factory_class: Type[StubBotServiceFactory] = StubBotServiceFactory,
+            ) -> SimulatedCarrier:
+                carrier = await stack.enter_async_context(carrier_class(f"http://127.0.0.1:{free_port()}", script=script))
+                set_bot_service_factory(factory_class(twilio_client=carrier))
+                return carrier
+            yield start
+    finally:
+        set_bot_service_factory(previous_factory)
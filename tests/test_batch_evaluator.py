@@ -0,0 +1,71 @@
+from openai.types.chat import ChatCompletionMessageParam
+from typing import List
+
+from fixa.evaluation import Evaluation
+from fixa.evaluators import EvaluationRequest, LocalEvaluator
+from fixa.evaluators.local import MAX_TOKENS_PER_CALL, MAX_TOKENS_PER_EVALUATION, compact_transcript
+from fixa.scenario import Scenario
+from fixa.testing.openai_stub import create_openai_stub_app, create_openai_stub_client
+
+order_donut = Scenario(
+    name="order_donut",
+    prompt="order a dozen donuts with sprinkles and a coffee",
+    evaluations=[
+        Evaluation(name="order_success", prompt="the order was successful"),
+        Evaluation(name="price_confirmed", prompt="the agent confirmed the price of the order"),
+    ],
+)
+order_coffee = Scenario(
+    name="order_coffee",
+    prompt="order a large coffee",
+    evaluations=[Evaluation(name="coffee_ordered", prompt="a large coffee was ordered")],
+)
+transcript: List[ChatCompletionMessageParam] = [
+    {"role": "user", "content": "Hello. This is Oliver Stone. How can I help you today?"},
+    {"role": "assistant", "content": "Um, like, hi Oliver! Could I get, like, a dozen donuts with sprinkles and, like, a coffee?"},
+    {"role": "user", "content": "Yeah. Sure. Dozen donuts and a coffee. Goodbye."},
+]
+
+async def test_batch_evaluator():
+    # runs against a local OpenAI-compatible stub, so no API key is needed
+    stub = create_openai_stub_app()
+    evaluator = LocalEvaluator(client=create_openai_stub_client(stub), batch_size=10)
+    requests = [EvaluationRequest(scenario=order_donut, transcript=transcript, stereo_recording_url="") for _ in range(25)]
+    evaluation_results = await evaluator.evaluate_batch(requests)
+
+    assert len(evaluation_results) == 25
+    assert all(r is not None and [e.name for e in r.evaluation_results] == ["order_success", "price_confirmed"] for r in evaluation_results)
+    assert stub.state.requests == 3
+    print(evaluation_results[0])
+
+async def test_batches_group_calls_by_criteria():
+    stub = create_openai_stub_app()
+    evaluator = LocalEvaluator(client=create_openai_stub_client(stub), batch_size=4)
+    scenarios = [order_donut, order_coffee, order_donut, order_coffee, order_donut, order_donut]
+    requests = [EvaluationRequest(scenario=scenario, transcript=transcript, stereo_recording_url="") for scenario in scenarios]
+    evaluation_results = await evaluator.evaluate_batch(requests)
+
+    # each result matches its own call's criteria, in the order the calls were given
+    assert [[e.name for e in r.evaluation_results] if r is not None else None for r in evaluation_results] == [
+        [e.name for e in scenario.evaluations] for scenario in scenarios
+    ]
+    # the four order_donut calls share a request, and the order_coffee calls the other, each sending its criteria once
+    prompts = sorted((body["messages"][-1]["content"], body["max_tokens"]) for body in stub.state.bodies)
+    assert len(prompts) == 2
+    (coffee_prompt, coffee_max_tokens), (donut_prompt, donut_max_tokens) = prompts
+    assert coffee_prompt.count("a large coffee was ordered") == 1 and "the order was successful" not in coffee_prompt
+    assert donut_prompt.count("the order was successful") == 1 and "a large coffee was ordered" not in donut_prompt
+    # the reply is sized for the number of criteria
+    assert coffee_max_tokens == 2 * MAX_TOKENS_PER_EVALUATION + 2 * MAX_TOKENS_PER_CALL
+    assert donut_max_tokens == 8 * MAX_TOKENS_PER_EVALUATION + 4 * MAX_TOKENS_PER_CALL
+
+def test_compact_transcript():
+    assert compact_transcript(transcript[:2] + [
+        {"role": "assistant", "content": None, "tool_calls": [{"id": "call_1", "type": "function", "function": {"name": "end_call", "arguments": "{}"}}]},
+        {"role": "tool", "content": "  call\nended ", "tool_call_id": "call_1"},
+    ]) == (
+        "user: Hello. This is Oliver Stone. How can I help you today?\n"
+        "assistant: Um, like, hi Oliver! Could I get, like, a dozen donuts with sprinkles and, like, a coffee?\n"
+        'assistant: [{"id":"call_1","type":"function","function":{"name":"end_call","arguments":"{}"}}]\n'
+        "tool: call ended"
+    )
@@ -0,0 +1,31 @@
+import time
+
+from fixa import TestRunner
+from fixa.test_runner.views import CallDeadlines
+from fixa.testing import SimulatedCallScript
+
+async def test_call_deadlines(simulated_carrier, make_tests):
+    # the recording arrives after the recording deadline
+    script = SimulatedCallScript(turns=1, speech_seconds=0.6, silence_seconds=3, recording_delay_seconds=5)
+    carrier = await simulated_carrier(script)
+
+    test_runner = TestRunner(
+        port=carrier.port,
+        ngrok_url=carrier.server_url,
+        twilio_phone_number="+15550000000",
+        deadlines=CallDeadlines(recording=2),
+    )
+    for test in make_tests(2):
+        test_runner.add_test(test)
+
+    test_results = await test_runner.run_tests(phone_number="+15551111111")
+    finished_at = time.monotonic()
+
+    assert len(test_results) == 2
+    for result in test_results:
+        assert result.error is not None and "did not arrive within 2s" in result.error, result.error
+        # what the call got before it was given up on is kept
+        assert any(m["role"] == "user" for m in result.transcript)
+    # the run didn't wait for the recordings
+    ended_at = min(call.ended_at for call in carrier.calls_by_sid.values() if call.ended_at is not None)
+    assert finished_at - ended_at < script.recording_delay_seconds, finished_at - ended_at
@@ -0,0 +1,60 @@
+import time
+
+from fixa import TestRunner
+from fixa.bot_services import get_bot_service_factory
+from fixa.testing import SimulatedCallScript, StubBotServiceFactory
+
+class CountingBotServiceFactory(StubBotServiceFactory):
+    """
+    Counts the calls whose bots picked up pre-warmed services.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.claimed = 0
+
+    async def claim_prewarmed(self, call_sid):
+        services = await super().claim_prewarmed(call_sid)
+        if services is not None:
+            self.claimed += 1
+        return services
+
+async def test_unanswered_calls_fail_fast(simulated_carrier, make_tests):
+    carrier = await simulated_carrier(SimulatedCallScript(ring_seconds=0.2, unanswered_status="busy"))
+
+    # one call at a time, so each failed call must give its slot back for the next one to be placed
+    test_runner = TestRunner(port=carrier.port, ngrok_url=carrier.server_url, twilio_phone_number="+15550000000", max_concurrent_calls=1)
+    for test in make_tests(3):
+        test_runner.add_test(test)
+
+    start = time.monotonic()
+    test_results = await test_runner.run_tests(phone_number="+15551111111")
+    elapsed = time.monotonic() - start
+    await carrier.wait_idle()
+
+    assert len(test_results) == 3
+    for result in test_results:
+        assert result.error == "call busy", result.error
+    for call in carrier.calls_by_sid.values():
+        assert call.status_callbacks == ["initiated", "ringing", "busy"], call.status_callbacks
+    # well within the 60s ringing deadline
+    assert elapsed < 15, elapsed
+
+async def test_ringing_prewarms_services(simulated_carrier, make_tests):
+    carrier = await simulated_carrier(
+        SimulatedCallScript(ring_seconds=0.5, turns=1, speech_seconds=0.6, silence_seconds=2),
+        factory_class=CountingBotServiceFactory,
+    )
+    services = get_bot_service_factory()
+
+    test_runner = TestRunner(port=carrier.port, ngrok_url=carrier.server_url, twilio_phone_number="+15550000000")
+    for test in make_tests(2):
+        test_runner.add_test(test)
+    test_results = await test_runner.run_tests(phone_number="+15551111111")
+    await carrier.wait_idle()
+
+    assert len(test_results) == 2
+    for result in test_results:
+        assert result.error is None, result.error
+    assert services.claimed == 2, services.claimed
+    for call in carrier.calls_by_sid.values():
+        assert call.status_callbacks == ["initiated", "ringing", "in-progress", "completed"], call.status_callbacks
@@ -0,0 +1,154 @@
+from typing import List, Optional
+
+from openai.types.chat import ChatCompletionMessageParam
+
+from fixa import Evaluation, Scenario
+from fixa.evaluators import BaseEvaluator, CachedEvaluator, EvaluationRequest, EvaluationResult, InMemoryEvaluationCache, SQLiteEvaluationCache
+from fixa.evaluators.cache import evaluation_cache_key
+from fixa.evaluators.evaluator import EvaluationResponse
+
+SCENARIO = Scenario(
+    name="order_donut",
+    prompt="order a dozen donuts with sprinkles and a coffee",
+    evaluations=[Evaluation(name="order_success", prompt="the order was successful")],
+)
+TRANSCRIPT: List[ChatCompletionMessageParam] = [{"role": "user", "content": "a dozen donuts please"}]
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class CountingEvaluator(BaseEvaluator):
+    """
+    Returns the recording it was given, so results reused for another call show up.
+    """
+    def __init__(self, uses_recording: bool = True):
+        self.uses_recording = uses_recording
+        self.calls = 0
+
+    async def evaluate(self, scenario: Scenario, transcript: List[ChatCompletionMessageParam], stereo_recording_url: str) -> Optional[EvaluationResponse]:
+        self.calls += 1
+        return response(stereo_recording_url)
+
+def response(name: str) -> EvaluationResponse:
+    return EvaluationResponse(evaluation_results=[EvaluationResult(name=name, passed=True, reason="")], extra_data={"recording": name})
+
+def test_in_memory_ttl_expiry(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("fixa.evaluators.cache.time.time", clock)
+    cache = InMemoryEvaluationCache(ttl=10)
+    cache.set("a", response("a"))
+
+    clock.now += 10
+    assert cache.get("a") == response("a")
+    clock.now += 1
+    assert cache.get("a") is None
+    assert cache.hits == 1 and cache.misses == 1
+
+def test_in_memory_lru_eviction():
+    cache = InMemoryEvaluationCache(max_entries=2)
+    cache.set("a", response("a"))
+    cache.set("b", response("b"))
+    # reading "a" makes "b" the least recently used
+    assert cache.get("a") is not None
+    cache.set("c", response("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+def test_sqlite_ttl_expiry(monkeypatch, tmp_path):
+    clock = Clock()
+    monkeypatch.setattr("fixa.evaluators.cache.time.time", clock)
+    path = str(tmp_path / "evaluations.sqlite3")
+    cache = SQLiteEvaluationCache(path, ttl=10)
+    cache.set("a", response("a"))
+
+    clock.now += 11
+    assert cache.get("a") is None
+    assert cache.get("a") is None
+    cache.close()
+
+    # the expired entry was removed from the database
+    reopened = SQLiteEvaluationCache(path)
+    assert reopened._db.execute("SELECT COUNT(*) FROM evaluations").fetchone() == (0,)
+    reopened.close()
+
+def test_sqlite_lru_eviction(monkeypatch, tmp_path):
+    clock = Clock()
+    monkeypatch.setattr("fixa.evaluators.cache.time.time", clock)
+    cache = SQLiteEvaluationCache(str(tmp_path / "evaluations.sqlite3"), max_entries=2)
+    cache.set("a", response("a"))
+    clock.now += 1
+    cache.set("b", response("b"))
+    clock.now += 1
+    # the access time of this hit is only held in memory until the next set
+    assert cache.get("a") is not None
+    assert cache._db.execute("SELECT accessed FROM evaluations WHERE key = 'a'").fetchone() == (1000.0,)
+    clock.now += 1
+    cache.set("c", response("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == response("a") and cache.get("c") == response("c")
+    assert cache.hits == 3 and cache.misses == 1
+    cache.close()
+
+def test_sqlite_hits_are_flushed(tmp_path):
+    path = str(tmp_path / "evaluations.sqlite3")
+    cache = SQLiteEvaluationCache(path, flush_every=2)
+    cache.set("a", response("a"))
+    cache.set("b", response("b"))
+    created = cache._db.execute("SELECT MAX(accessed) FROM evaluations").fetchone()
+
+    # hits are written once two calls' access times are pending
+    cache.get("a")
+    cache.get("a")
+    assert list(cache._accessed) == ["a"]
+    cache.get("b")
+    assert not cache._accessed
+    assert cache._db.execute("SELECT MIN(accessed) FROM evaluations").fetchone() >= created
+
+    # results persist between runs
+    cache.close()
+    reopened = SQLiteEvaluationCache(path)
+    assert reopened.get("a") == response("a")
+    reopened.close()
+
+async def test_cached_evaluator_hits_and_misses():
+    evaluator = CountingEvaluator(uses_recording=False)
+    cached = CachedEvaluator(evaluator, cache=InMemoryEvaluationCache())
+
+    await cached.evaluate(SCENARIO, TRANSCRIPT, "https://recordings/1")
+    # the same transcript with different whitespace is the same evaluation
+    await cached.evaluate(SCENARIO, [{"role": "user", "content": "a  dozen donuts please "}], "https://recordings/2")
+    results = await cached.evaluate_batch([
+        EvaluationRequest(SCENARIO, TRANSCRIPT, "https://recordings/3"),
+        EvaluationRequest(SCENARIO, [{"role": "user", "content": "just a coffee"}], "https://recordings/4"),
+    ])
+
+    assert evaluator.calls == 2
+    assert cached.hits == 2 and cached.misses == 2
+    assert [r.extra_data["recording"] for r in results if r is not None] == ["https://recordings/1", "https://recordings/4"]
+
+async def test_results_that_use_the_recording_are_not_shared():
+    evaluator = CountingEvaluator()
+    cached = CachedEvaluator(evaluator, cache=InMemoryEvaluationCache())
+
+    first = await cached.evaluate(SCENARIO, TRANSCRIPT, "https://recordings/1")
+    second = await cached.evaluate(SCENARIO, TRANSCRIPT, "https://recordings/2")
+    again = await cached.evaluate(SCENARIO, TRANSCRIPT, "https://recordings/1")
+
+    assert first is not None and first.extra_data["recording"] == "https://recordings/1"
+    assert second is not None and second.extra_data["recording"] == "https://recordings/2"
+    assert again == first
+    assert evaluator.calls == 2 and cached.hits == 1
+
+def test_cache_key():
+    evaluator = CountingEvaluator()
+    key = evaluation_cache_key(evaluator, SCENARIO, TRANSCRIPT, "https://recordings/1")
+    assert key != evaluation_cache_key(evaluator, SCENARIO, TRANSCRIPT, "https://recordings/2")
+    assert key != evaluation_cache_key(CountingEvaluator(uses_recording=False), SCENARIO, TRANSCRIPT, "https://recordings/1")
+    other_scenario = Scenario(name=SCENARIO.name, prompt=SCENARIO.prompt, evaluations=[Evaluation(name="order_success", prompt="a coffee was ordered")])
+    assert key != evaluation_cache_key(evaluator, other_scenario, TRANSCRIPT, "https://recordings/1")
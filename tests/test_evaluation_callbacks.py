@@ -0,0 +1,95 @@
+import asyncio
+import time
+from typing import List
+
+import httpx
+from openai.types.chat import ChatCompletionMessageParam
+import pytest
+
+from fixa import Evaluation, Scenario, TestRunner
+from fixa.evaluators import CloudEvaluator
+from fixa.evaluators.callbacks import EvaluationCallbacks, evaluation_callbacks
+from fixa.testing import FixaObserveStub
+
+SCENARIO = Scenario(
+    name="order_donut",
+    prompt="order a dozen donuts with sprinkles and a coffee",
+    evaluations=[
+        Evaluation(name="order_success", prompt="the order was successful"),
+        Evaluation(name="price_confirmed", prompt="the agent confirmed the price of the order"),
+    ],
+)
+TRANSCRIPT: List[ChatCompletionMessageParam] = [{"role": "user", "content": "a dozen donuts please"}]
+
+async def test_callback_registry():
+    callbacks = EvaluationCallbacks()
+    waiter = callbacks.expect("token")
+    assert callbacks.resolve("token", {"call": {}})
+    assert await waiter == {"call": {}}
+    # each token is resolved once, and unknown tokens are refused
+    assert not callbacks.resolve("token", {"call": {}})
+    assert not callbacks.resolve("other", {"call": {}})
+
+    discarded = callbacks.expect("discarded")
+    callbacks.discard("discarded")
+    assert discarded.cancelled()
+    assert not callbacks.resolve("discarded", {"call": {}})
+
+async def test_callback_route():
+    from fixa.test_runner.server import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://runner") as client:
+        waiter = evaluation_callbacks.expect("route-token")
+        try:
+            response = await client.post("/evaluation-callback/route-token", json={"call": {"evaluationResults": []}})
+            assert response.status_code == 200 and response.json() == {"success": True}
+            assert await waiter == {"call": {"evaluationResults": []}}
+
+            # a token nothing is waiting for (any more) is a 404
+            response = await client.post("/evaluation-callback/route-token", json={})
+            assert response.status_code == 404
+        finally:
+            evaluation_callbacks.discard("route-token")
+
+async def test_polling_backs_off():
+    async with FixaObserveStub(polls_until_ready=3) as observe:
+        evaluator = CloudEvaluator(api_key="stub", api_url=observe.api_url, initial_poll_interval=0.05, max_poll_interval=0.2)
+        start = time.monotonic()
+        response = await evaluator.evaluate(SCENARIO, TRANSCRIPT, "https://recordings/1")
+
+    assert response is not None
+    assert [r.name for r in response.evaluation_results] == ["order_success", "price_confirmed"]
+    assert response.extra_data["fixa_observe_call_url"].startswith("https://www.fixa.dev/observe/calls/observe-")
+    assert "callbackUrl" not in observe.uploads[0]
+    # the poll interval doubles from initial_poll_interval up to max_poll_interval
+    gaps = [later - earlier for earlier, later in zip([start] + observe.polls, observe.polls)]
+    assert len(gaps) == 4
+    for gap, expected in zip(gaps, [0.05, 0.1, 0.2, 0.2]):
+        assert expected <= gap < expected + 0.1, gaps
+
+async def test_polling_gives_up_at_the_deadline():
+    async with FixaObserveStub(polls_until_ready=None) as observe:
+        evaluator = CloudEvaluator(api_key="stub", api_url=observe.api_url, deadline=0.3, initial_poll_interval=0.05, max_poll_interval=0.1)
+        evaluator.set_callback_url("http://127.0.0.1:9/evaluation-callback")
+        with pytest.raises(Exception, match="within 0.3 seconds"):
+            await evaluator.evaluate(SCENARIO, TRANSCRIPT, "https://recordings/1")
+
+    # the callback token isn't left behind
+    token = observe.uploads[0]["callbackUrl"].rsplit("/", 1)[1]
+    assert not evaluation_callbacks.resolve(token, {})
+
+async def test_results_arrive_on_the_callback_route(simulated_carrier):
+    carrier = await simulated_carrier()
+    async with FixaObserveStub(polls_until_ready=None, callback_delay=0.05) as observe:
+        evaluator = CloudEvaluator(api_key="stub", api_url=observe.api_url, initial_poll_interval=10)
+        # a started runner tells the evaluator where its server takes evaluation results
+        async with TestRunner(port=carrier.port, ngrok_url=carrier.server_url, twilio_phone_number="+15550000000", evaluator=evaluator):
+            assert evaluator.callback_url == f"{carrier.server_url}/evaluation-callback"
+            start = time.monotonic()
+            response = await asyncio.wait_for(evaluator.evaluate(SCENARIO, TRANSCRIPT, "https://recordings/1"), timeout=5)
+            elapsed = time.monotonic() - start
+
+    assert response is not None and [r.passed for r in response.evaluation_results] == [True, True]
+    assert observe.callback_statuses == [200]
+    # the results came back without waiting for a poll
+    assert observe.polls == [] and elapsed < 1, elapsed
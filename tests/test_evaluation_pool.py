@@ -0,0 +1,121 @@
+import asyncio
+from typing import Dict, List
+
+import aiohttp
+import pytest
+
+from fixa.test_runner.evaluation_pool import EvaluationPool, is_retryable
+
+class StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+class FlakyEvaluator:
+    """
+    Fails each call's first `failures[call_id]` attempts with `error`, and tracks how many calls it evaluates at once.
+    """
+    def __init__(self, failures: Dict[str, int], error: Exception, seconds: float = 0.01):
+        self.failures = failures
+        self.error = error
+        self.seconds = seconds
+        self.attempts: Dict[str, int] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, call_id: str):
+        self.attempts[call_id] = self.attempts.get(call_id, 0) + 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.seconds)
+            if self.attempts[call_id] <= self.failures.get(call_id, 0):
+                raise self.error
+        finally:
+            self.in_flight -= 1
+
+def test_is_retryable():
+    assert is_retryable(aiohttp.ClientConnectionError())
+    assert is_retryable(asyncio.TimeoutError())
+    assert is_retryable(StatusError(429)) and is_retryable(StatusError(503))
+    assert not is_retryable(StatusError(400))
+    assert not is_retryable(ValueError("bad transcript"))
+
+async def test_retries_then_gives_up():
+    evaluator = FlakyEvaluator({"CA1": 2, "CA2": 10}, aiohttp.ClientConnectionError())
+    done: List[str] = []
+    logs: List[str] = []
+    pool = EvaluationPool(evaluator, workers=2, max_retries=3, base_delay=0.01, max_delay=0.02, on_done=done.append, log=logs.append)
+    pool.start()
+    for call_id in ["CA1", "CA2", "CA3"]:
+        pool.submit(call_id)
+    await pool.join()
+
+    # CA1 succeeds on its third attempt, CA2 is given up on after its three retries
+    assert evaluator.attempts == {"CA1": 3, "CA2": 4, "CA3": 1}
+    assert pool.metrics.completed == 2 and pool.metrics.failed == 1 and pool.metrics.retries == 5
+    assert sorted(done) == ["CA1", "CA2", "CA3"]
+    assert any("Failed to evaluate call CA2" in log for log in logs)
+
+async def test_errors_that_arent_retryable_fail_at_once():
+    evaluator = FlakyEvaluator({"CA1": 1}, StatusError(400))
+    pool = EvaluationPool(evaluator, workers=1, base_delay=0.01, log=lambda message: None)
+    pool.start()
+    pool.submit("CA1")
+    await pool.join()
+
+    assert evaluator.attempts == {"CA1": 1}
+    assert pool.metrics.failed == 1 and pool.metrics.retries == 0
+
+async def test_worker_limit_and_queue_depth():
+    evaluator = FlakyEvaluator({}, ValueError(), seconds=0.05)
+    pool = EvaluationPool(evaluator, workers=3)
+    pool.start()
+    for i in range(10):
+        pool.submit(f"CA{i}")
+    await pool.join()
+
+    assert evaluator.max_in_flight == 3
+    assert pool.metrics.completed == 10 and pool.metrics.in_flight == 0 and pool.metrics.queue_depth == 0
+    # every call was queued before a worker got to run
+    assert pool.metrics.max_queue_depth == 10
+
+async def test_backoff_is_full_jitter(monkeypatch):
+    bounds = []
+    def uniform(low, high):
+        bounds.append((low, high))
+        return 0
+    monkeypatch.setattr("fixa.test_runner.evaluation_pool.random.uniform", uniform)
+
+    evaluator = FlakyEvaluator({"CA1": 5}, StatusError(503))
+    pool = EvaluationPool(evaluator, workers=1, max_retries=5, base_delay=1, max_delay=4, log=lambda message: None)
+    pool.start()
+    pool.submit("CA1")
+    await pool.join()
+
+    # each delay is drawn from zero up to a doubling bound, capped at max_delay
+    assert bounds == [(0, 1), (0, 2), (0, 4), (0, 4), (0, 4)]
+    assert pool.metrics.completed == 1
+
+async def test_workers_take_batches():
+    batches: List[List[str]] = []
+    evaluator = FlakyEvaluator({"CA0": 1}, StatusError(503))
+    async def evaluate_batch(call_ids: List[str]):
+        batches.append(list(call_ids))
+        for call_id in call_ids:
+            await evaluator(call_id)
+    started: List[str] = []
+    pool = EvaluationPool(evaluator, workers=1, batch_size=3, evaluate_batch=evaluate_batch, base_delay=0.01, on_start=started.append, log=lambda message: None)
+    pool.start()
+    for i in range(5):
+        pool.submit(f"CA{i}")
+    await pool.join()
+
+    # the worker takes what is queued, up to a batch, and a retryable error retries the whole batch
+    assert batches == [["CA0", "CA1", "CA2"], ["CA0", "CA1", "CA2"], ["CA3", "CA4"]]
+    assert started == [f"CA{i}" for i in range(5)]
+    assert pool.metrics.completed == 5 and pool.metrics.retries == 1 and pool.metrics.in_flight == 0
+
+def test_batches_need_evaluate_batch():
+    with pytest.raises(ValueError):
+        EvaluationPool(FlakyEvaluator({}, ValueError()), batch_size=2)
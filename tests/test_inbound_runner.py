@@ -0,0 +1,64 @@
+from fixa import Test, TestRunner
+from fixa.test_runner.views import CallDeadlines
+from fixa.testing import SimulatedCallScript
+
+AGENT_NUMBER = "+15552222222"
+LISTENING_NUMBERS = ["+15550000001", "+15550000002", "+15550000003"]
+
+async def test_inbound_tests(simulated_carrier, make_tests):
+    carrier = await simulated_carrier(SimulatedCallScript(turns=1, speech_seconds=0.6, silence_seconds=2))
+    # one of the numbers already answers calls somewhere else
+    production = {"voice_url": "https://example.com/voice", "voice_method": "GET", "status_callback": "https://example.com/status", "status_callback_method": "POST"}
+    carrier.numbers[LISTENING_NUMBERS[0]] = dict(production)
+
+    # the agent under test calls whichever number its test was given
+    async def dial_agent(test: Test, number: str):
+        carrier.dial(from_=AGENT_NUMBER, to=number)
+
+    test_runner = TestRunner(
+        port=carrier.port,
+        ngrok_url=carrier.server_url,
+        twilio_phone_number="+15559999999",
+        inbound_numbers=LISTENING_NUMBERS,
+        inbound_trigger=dial_agent,
+    )
+    for test in make_tests(6):
+        test_runner.add_test(test)
+    test_results = await test_runner.run_tests(phone_number=AGENT_NUMBER, type=TestRunner.INBOUND)
+    await carrier.wait_idle()
+
+    assert len(test_results) == 6
+    for result in test_results:
+        assert result.error is None, result.error
+        assert result.stereo_recording_url, result
+        assert any(m["role"] == "user" for m in result.transcript)
+    # every listening number was pointed at the server and used, and is pointed back where it was once the run is over
+    assert carrier.numbers[LISTENING_NUMBERS[0]] == production
+    for number in LISTENING_NUMBERS[1:]:
+        assert carrier.numbers[number]["voice_url"] == "" and carrier.numbers[number]["status_callback"] == ""
+    calls = list(carrier.calls_by_sid.values())
+    assert len(calls) == 6 and {call.to for call in calls} == set(LISTENING_NUMBERS)
+    assert all(call.direction == "inbound" and call.status == "completed" for call in calls)
+
+async def test_unexpected_caller_is_rejected(simulated_carrier, make_tests):
+    carrier = await simulated_carrier()
+
+    async def dial_from_elsewhere(test: Test, number: str):
+        carrier.dial(from_="+15553333333", to=number)
+
+    test_runner = TestRunner(
+        port=carrier.port,
+        ngrok_url=carrier.server_url,
+        twilio_phone_number=LISTENING_NUMBERS[0],
+        inbound_trigger=dial_from_elsewhere,
+        deadlines=CallDeadlines(ringing=1),
+    )
+    for test in make_tests(1):
+        test_runner.add_test(test)
+    test_results = await test_runner.run_tests(phone_number=AGENT_NUMBER, type=TestRunner.INBOUND)
+    await carrier.wait_idle()
+
+    assert len(test_results) == 1
+    assert test_results[0].error == f"No call to {LISTENING_NUMBERS[0]} arrived within 1s", test_results[0].error
+    [call] = carrier.calls_by_sid.values()
+    assert call.status == "busy", call
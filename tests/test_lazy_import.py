@@ -0,0 +1,35 @@
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ["pipecat", "twilio", "uvicorn", "fastapi", "aiohttp", "openai", "dotenv", "loguru"]
+
+def run_in_fresh_interpreter(code: str) -> dict:
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def test_defining_tests_loads_no_heavy_modules():
+    result = run_in_fresh_interpreter(f"""
+import json, sys
+import fixa
+test = fixa.Test(
+    scenario=fixa.Scenario(name="order_donut", prompt="order a dozen donuts", evaluations=[fixa.Evaluation(name="order_success", prompt="the order was successful")]),
+    agent=fixa.Agent(name="jessica", prompt="you are a simulated caller"),
+)
+print(json.dumps(sorted({{name.split(".")[0] for name in sys.modules}} & set({HEAVY_MODULES!r}))))
+""")
+    assert result == [], result
+
+def test_runner_is_loaded_on_first_use():
+    result = run_in_fresh_interpreter("""
+import json
+import fixa
+from fixa.test_runner.service import TestRunner
+try:
+    fixa.NotAThing
+    missing = None
+except AttributeError as e:
+    missing = str(e)
+print(json.dumps({"same": fixa.TestRunner is TestRunner, "in_dir": "TestRunner" in dir(fixa), "missing": missing}))
+""")
+    assert result == {"same": True, "in_dir": True, "missing": "module 'fixa' has no attribute 'NotAThing'"}, result
@@ -0,0 +1,45 @@
+import httpx
+
+from fixa import metrics
+from fixa.metrics import MetricsRegistry
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("fixa_test_seconds", "Time taken.", (0.1, 1, 0.5))
+    registry.gauge("fixa_test_active", "Things going on.").set(3)
+    registry.counter("fixa_test_total", "Things that happened.").inc(2)
+    for value in [0.05, 0.1, 0.3, 0.7, 5]:
+        histogram.observe(value)
+
+    assert registry.render() == (
+        "# HELP fixa_test_seconds Time taken.\n"
+        "# TYPE fixa_test_seconds histogram\n"
+        # each bucket counts every observation up to its bound, so the counts only go up
+        'fixa_test_seconds_bucket{le="0.1"} 2\n'
+        'fixa_test_seconds_bucket{le="0.5"} 3\n'
+        'fixa_test_seconds_bucket{le="1.0"} 4\n'
+        'fixa_test_seconds_bucket{le="+Inf"} 5\n'
+        "fixa_test_seconds_sum 6.15\n"
+        "fixa_test_seconds_count 5\n"
+        "# HELP fixa_test_active Things going on.\n"
+        "# TYPE fixa_test_active gauge\n"
+        "fixa_test_active 3.0\n"
+        "# HELP fixa_test_total Things that happened.\n"
+        "# TYPE fixa_test_total counter\n"
+        "fixa_test_total 2.0\n"
+    )
+
+async def test_metrics_route():
+    from fixa.test_runner.server import app
+
+    metrics.outbound_to_connect.observe(0.2)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://runner") as client:
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    assert response.text == metrics.registry.render()
+    lines = response.text.splitlines()
+    assert "# TYPE fixa_outbound_to_connect_seconds histogram" in lines
+    assert 'fixa_outbound_to_connect_seconds_bucket{le="+Inf"} ' + str(metrics.outbound_to_connect.count) in lines
+    assert "# TYPE fixa_active_calls gauge" in lines
@@ -0,0 +1,95 @@
+from typing import List, Optional
+
+import aiohttp
+from openai.types.chat import ChatCompletionMessageParam
+
+from fixa import Scenario, TestRunner
+from fixa.evaluators import BaseEvaluator, LocalEvaluator
+from fixa.evaluators.evaluator import EvaluationResponse, EvaluationResult
+from fixa.test_runner.server import get_state_store
+from fixa.test_runner.views import HttpPoolConfig
+from fixa.testing import SimulatedCallScript, create_openai_stub_app, create_openai_stub_client
+
+class SessionRecordingEvaluator(BaseEvaluator):
+    """
+    Passes every evaluation, recording the sessions it is given and the session it had for each call it evaluated.
+    """
+    def __init__(self):
+        self.sessions: List[Optional[aiohttp.ClientSession]] = []
+        self.evaluated_with: List[Optional[aiohttp.ClientSession]] = []
+
+    def set_session(self, session: Optional[aiohttp.ClientSession]):
+        super().set_session(session)
+        self.sessions.append(session)
+
+    async def evaluate(self, scenario: Scenario, transcript: List[ChatCompletionMessageParam], stereo_recording_url: str) -> Optional[EvaluationResponse]:
+        self.evaluated_with.append(self.session)
+        return EvaluationResponse(
+            evaluation_results=[EvaluationResult(name=e.name, passed=True, reason="") for e in scenario.evaluations],
+            extra_data={},
+        )
+
+async def test_persistent_runner(simulated_carrier, make_tests):
+    carrier = await simulated_carrier(SimulatedCallScript(turns=1, speech_seconds=0.6, silence_seconds=3))
+
+    async with TestRunner(
+        port=carrier.port,
+        ngrok_url=carrier.server_url,
+        twilio_phone_number="+15550000000",
+        evaluator=LocalEvaluator(client=create_openai_stub_client(create_openai_stub_app())),
+        # calls whose evaluations queue up together are evaluated with one request
+        evaluation_batch_size=2,
+    ) as test_runner:
+        server = test_runner.server
+        for run in range(2):
+            test_runner.clear_tests()
+            for test in make_tests(2, prefix=f"agent_{run}"):
+                test_runner.add_test(test)
+            test_results = await test_runner.run_tests(phone_number="+15551111111")
+
+            # each run only sees its own calls, on the same server
+            assert test_runner.server is server and server.started
+            assert len(test_results) == 2
+            assert {result.test.agent.name for result in test_results} == {f"agent_{run}_0", f"agent_{run}_1"}
+            for result in test_results:
+                assert result.error is None, result.error
+                assert result.evaluation_results is not None
+            assert get_state_store().statuses() == {}
+            # the evaluation counters only cover this run
+            assert test_runner.evaluation_pool.metrics.completed == 2
+
+    assert not server.started or server.should_exit
+    assert len(carrier.calls_by_sid) == 4
+
+async def test_shared_http_session(simulated_carrier, make_tests):
+    carrier = await simulated_carrier(SimulatedCallScript(turns=1, speech_seconds=0.6, silence_seconds=3))
+    evaluator = SessionRecordingEvaluator()
+    http_pool = HttpPoolConfig(limit=7, limit_per_host=3, keepalive_timeout=12, dns_cache_ttl=45)
+
+    async with TestRunner(
+        port=carrier.port,
+        ngrok_url=carrier.server_url,
+        twilio_phone_number="+15550000000",
+        evaluator=evaluator,
+        http_pool=http_pool,
+    ) as test_runner:
+        for run in range(2):
+            test_runner.clear_tests()
+            for test in make_tests(2, prefix=f"agent_{run}"):
+                test_runner.add_test(test)
+            test_results = await test_runner.run_tests(phone_number="+15551111111")
+            assert all(result.error is None for result in test_results), [result.error for result in test_results]
+
+        # the evaluator got one session when the runner started, pooled as configured
+        [session] = evaluator.sessions
+        assert session is not None
+        connector = session.connector
+        assert isinstance(connector, aiohttp.TCPConnector)
+        assert connector.limit == 7 and connector.limit_per_host == 3
+        assert connector._keepalive_timeout == 12 and connector._cached_hosts._ttl == 45
+
+    # and evaluated every call of both runs with it
+    assert evaluator.evaluated_with == [session] * 4
+    # which was closed, and taken back from the evaluator, when the runner stopped
+    assert evaluator.sessions == [session, None]
+    assert session.closed and evaluator.session is None
@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+from twilio.base.exceptions import TwilioRestException
+
+from fixa import TestRunner, PhoneNumberPool
+from fixa.testing import SimulatedCallScript, SimulatedCarrier
+
+BLOCKED = "+15550000002"
+INVALID = "+15550000000"
+
+class BlockingCarrier(SimulatedCarrier):
+    """
+    Refuses every call from the blocked number, as Twilio does for a caller ID it won't accept, and every call to the invalid number.
+    """
+    def _create_call(self, to, from_, params):
+        if from_ == BLOCKED:
+            raise TwilioRestException(400, "/Calls.json", f"The source phone number provided, {from_}, is not yet verified for your account", code=21210, method="POST")
+        if to == INVALID:
+            raise TwilioRestException(400, "/Calls.json", f"Invalid 'To' Phone Number: {to}", code=21211, method="POST")
+        return super()._create_call(to, from_, params)
+
+async def test_assignment():
+    numbers = ["+15550000001", "+15550000002", "+15550000003"]
+
+    pool = PhoneNumberPool(numbers, strategy="round_robin")
+    assert [await pool.acquire() for _ in range(4)] == numbers + numbers[:1]
+
+    pool = PhoneNumberPool(numbers, strategy="least_loaded")
+    picked = [await pool.acquire() for _ in range(3)]
+    assert sorted(picked) == numbers, picked
+    pool.release(numbers[1])
+    assert await pool.acquire() == numbers[1]
+
+async def test_budgets():
+    pool = PhoneNumberPool(["+15550000001", "+15550000002"], max_concurrent_calls_per_number=1)
+    first, second = await pool.acquire(), await pool.acquire()
+    third = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0.05)
+    assert not third.done()
+    pool.release(second)
+    assert await third == second
+    pool.release(first)
+
+    pool = PhoneNumberPool(["+15550000001", "+15550000002"], calls_per_second_per_number=10)
+    start = time.monotonic()
+    for _ in range(6):
+        await pool.acquire()
+    # two calls right away, then one per number every 0.1s
+    elapsed = time.monotonic() - start
+    assert 0.15 < elapsed < 0.5, elapsed
+
+def test_split():
+    numbers = ["+15550000001", "+15550000002", "+15550000003"]
+
+    # enough numbers for each part to get its own
+    pools = PhoneNumberPool(numbers, max_concurrent_calls_per_number=2).split(2)
+    assert [pool.numbers for pool in pools] == [numbers[0::2], numbers[1:2]]
+
+    # otherwise the parts share each number's budget, and the shares add up to it
+    pools = PhoneNumberPool(numbers[:2], max_concurrent_calls_per_number=5, calls_per_second_per_number=3).split(4)
+    assert [pool.max_concurrent_calls_per_number for pool in pools] == [2, 1, 1, 1]
+    assert all(pool.numbers == numbers[:2] and pool.calls_per_second_per_number == 0.75 for pool in pools)
+
+    # and there are no more parts than a number's calls can be shared between
+    pools = PhoneNumberPool(numbers[:1], max_concurrent_calls_per_number=2).split(4)
+    assert [pool.max_concurrent_calls_per_number for pool in pools] == [1, 1]
+
+async def test_health():
+    pool = PhoneNumberPool(["+15550000001", "+15550000002"], max_consecutive_failures=2, cooldown_seconds=0.2)
+    for _ in range(2):
+        number = await pool.acquire(exclude=["+15550000002"])
+        pool.release(number, failed=True)
+    assert pool.available == ["+15550000002"]
+    assert await pool.acquire() == "+15550000002"
+
+    # the last number in rotation stays in it
+    for _ in range(2):
+        pool.release("+15550000002", failed=True)
+        await pool.acquire()
+    assert pool.available == ["+15550000002"]
+
+    await asyncio.sleep(0.25)
+    assert pool.available == ["+15550000001", "+15550000002"]
+    assert pool.health[0].consecutive_failures == 0
+
+async def test_runner_skips_blocked_number(simulated_carrier, make_tests):
+    carrier = await simulated_carrier(SimulatedCallScript(turns=1, speech_seconds=0.6, silence_seconds=2), carrier_class=BlockingCarrier)
+
+    pool = PhoneNumberPool(
+        ["+15550000001", BLOCKED, "+15550000003"],
+        strategy="round_robin",
+        max_concurrent_calls_per_number=2,
+        max_consecutive_failures=1,
+    )
+    test_runner = TestRunner(port=carrier.port, ngrok_url=carrier.server_url, twilio_phone_number=pool)
+    for test in make_tests(6):
+        test_runner.add_test(test)
+    test_results = await test_runner.run_tests(phone_number="+15551111111")
+
+    assert len(test_results) == 6
+    for result in test_results:
+        assert result.error is None, result.error
+        assert result.from_number in ("+15550000001", "+15550000003"), result.from_number
+    assert pool.available == ["+15550000001", "+15550000003"]
+    blocked = pool.health[1]
+    # calls placed at the same time may each have tried it before its first failure
+    assert blocked.failures == blocked.calls and blocked.disabled_until is not None, blocked
+    assert all(health.active == 0 for health in pool.health)
+
+async def test_runner_fails_calls_to_an_invalid_number(simulated_carrier, make_tests):
+    carrier = await simulated_carrier(SimulatedCallScript(turns=1, speech_seconds=0.6, silence_seconds=2), carrier_class=BlockingCarrier)
+
+    pool = PhoneNumberPool(["+15550000001", "+15550000003"], max_consecutive_failures=1)
+    test_runner = TestRunner(port=carrier.port, ngrok_url=carrier.server_url, twilio_phone_number=pool)
+    for test in make_tests(3):
+        test_runner.add_test(test)
+    test_results = await test_runner.run_tests(phone_number=INVALID)
+
+    # every test gets its result, and the refusals don't count against the numbers
+    assert len(test_results) == 3
+    for result in test_results:
+        assert result.error is not None and "Invalid 'To' Phone Number" in result.error, result.error
+    assert pool.available == ["+15550000001", "+15550000003"]
+    assert all(health.failures == 0 and health.active == 0 for health in pool.health)
+    assert sum(health.calls for health in pool.health) == 3
+
+async def test_runner_fails_calls_once_every_number_is_refused(simulated_carrier, make_tests):
+    carrier = await simulated_carrier(SimulatedCallScript(turns=1, speech_seconds=0.6, silence_seconds=2), carrier_class=BlockingCarrier)
+
+    test_runner = TestRunner(port=carrier.port, ngrok_url=carrier.server_url, twilio_phone_number=BLOCKED)
+    for test in make_tests(2):
+        test_runner.add_test(test)
+    test_results = await test_runner.run_tests(phone_number="+15551111111")
+
+    # the other tests in the run go on when one runs out of numbers
+    assert len(test_results) == 2
+    for result in test_results:
+        assert result.error is not None and "not yet verified" in result.error, result.error
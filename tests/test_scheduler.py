@@ -0,0 +1,70 @@
+import asyncio
+import time
+from typing import List
+
+from fixa.test_runner.scheduler import CallScheduler
+
+async def test_priority_order_under_rate_limit():
+    scheduler = CallScheduler(calls_per_second=50)
+    # use up the burst, so that every call below has to wait for a token
+    await scheduler.acquire()
+    scheduler.release()
+
+    started: List[str] = []
+    times: List[float] = []
+    async def place(name: str, priority: int):
+        await scheduler.acquire(priority)
+        started.append(name)
+        times.append(time.monotonic())
+        scheduler.release()
+
+    calls = [("a", 0), ("b", 5), ("c", 1), ("d", 5), ("e", 0)]
+    tasks = [asyncio.create_task(place(name, priority)) for name, priority in calls]
+    await asyncio.sleep(0)
+    assert scheduler.pending == 5
+    await asyncio.gather(*tasks)
+
+    # highest priority first, and in the order they were queued within a priority
+    assert started == ["b", "d", "c", "a", "e"]
+    # the rate limit still spaces them out
+    assert all(later - earlier >= 0.015 for earlier, later in zip(times, times[1:])), times
+
+async def test_concurrency_cap():
+    scheduler = CallScheduler(max_concurrent_calls=2)
+    max_active = 0
+    async def place():
+        nonlocal max_active
+        await scheduler.acquire()
+        max_active = max(max_active, scheduler.active)
+        await asyncio.sleep(0.01)
+        scheduler.release()
+
+    await asyncio.gather(*(place() for _ in range(6)))
+
+    assert max_active == 2
+    assert scheduler.active == 0 and scheduler.pending == 0
+
+async def test_cancelled_acquire_does_not_leak_a_slot():
+    scheduler = CallScheduler(max_concurrent_calls=1)
+    await scheduler.acquire()
+
+    # a call cancelled while waiting never takes the slot
+    waiting = asyncio.create_task(scheduler.acquire())
+    await asyncio.sleep(0)
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    assert scheduler.pending == 0
+
+    # a call cancelled after the slot was granted, before it got to run, hands the slot back
+    granted = asyncio.create_task(scheduler.acquire())
+    await asyncio.sleep(0)
+    scheduler.release()
+    assert scheduler.active == 1
+    granted.cancel()
+    await asyncio.gather(granted, return_exceptions=True)
+    assert granted.cancelled()
+    assert scheduler.active == 0
+
+    # so the next call gets the slot straight away
+    await asyncio.wait_for(scheduler.acquire(), timeout=1)
+    assert scheduler.active == 1
@@ -0,0 +1,106 @@
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fixa import PhoneNumberPool, Shard, ShardedTestRunner, Test, TestRunner
+from fixa.bot_services import set_bot_service_factory
+from fixa.evaluators import LocalEvaluator
+from fixa.testing import SimulatedCallScript, SimulatedCarrier, StubBotServiceFactory, create_openai_stub_app, create_openai_stub_client
+
+AGENT_NUMBER = "+15552222222"
+LISTENING_NUMBERS = ["+15550000001", "+15550000002", "+15550000003"]
+
+# the carrier of the shard running in this process
+shard_carrier: Optional[SimulatedCarrier] = None
+
+@asynccontextmanager
+async def simulated_shard(shard: Shard):
+    global shard_carrier
+    # each shard's process gets its own carrier, calling its own server
+    async with SimulatedCarrier(shard.ngrok_url, script=SimulatedCallScript(turns=1, speech_seconds=0.6, silence_seconds=3)) as carrier:
+        shard_carrier = carrier
+        set_bot_service_factory(StubBotServiceFactory(twilio_client=carrier))
+        yield
+
+async def dial_agent(test: Test, number: str):
+    assert shard_carrier is not None
+    shard_carrier.dial(from_=AGENT_NUMBER, to=number)
+
+def stub_evaluator() -> LocalEvaluator:
+    return LocalEvaluator(client=create_openai_stub_client(create_openai_stub_app()))
+
+async def test_sharded_runner(free_port, make_tests):
+    ports = [free_port() for _ in range(2)]
+    test_runner = ShardedTestRunner(
+        shards=[Shard(port=port, ngrok_url=f"http://127.0.0.1:{port}") for port in ports],
+        twilio_phone_number="+15550000000",
+        evaluator_factory=stub_evaluator,
+        shard_context=simulated_shard,
+    )
+    tests = make_tests(4)
+    for test in tests:
+        test_runner.add_test(test)
+
+    test_results = await test_runner.run_tests(phone_number="+15551111111")
+
+    assert len(test_results) == 4
+    # the results are in the order the tests were added, although shards get every other test
+    assert [id(result.test) for result in test_results] == [id(test) for test in tests]
+    for result in test_results:
+        assert result.error is None, result.error
+        assert result.evaluation_results is not None
+
+async def test_sharded_inbound_tests(free_port, make_tests):
+    ports = [free_port() for _ in range(2)]
+    test_runner = ShardedTestRunner(
+        shards=[Shard(port=port, ngrok_url=f"http://127.0.0.1:{port}") for port in ports],
+        twilio_phone_number="+15559999999",
+        shard_context=simulated_shard,
+        inbound_numbers=LISTENING_NUMBERS,
+        inbound_trigger=dial_agent,
+    )
+    for test in make_tests(4):
+        test_runner.add_test(test)
+
+    test_results = await test_runner.run_tests(phone_number=AGENT_NUMBER, type=TestRunner.INBOUND)
+
+    assert len(test_results) == 4
+    for result in test_results:
+        assert result.error is None, result.error
+
+def test_inbound_numbers_are_split_across_shards(make_tests):
+    shards = [Shard(port=8000 + i, ngrok_url=f"http://127.0.0.1:{8000 + i}") for i in range(4)]
+    tests = [(test, 0) for test in make_tests(8)]
+
+    # each shard points its own numbers at its server, so there are no more shards than numbers
+    test_runner = ShardedTestRunner(shards=shards, twilio_phone_number="+15559999999", inbound_numbers=LISTENING_NUMBERS)
+    split = test_runner._split(tests, TestRunner.INBOUND)
+    assert [config.inbound_numbers for config, _ in split] == [[number] for number in LISTENING_NUMBERS]
+    assert sum(len(shard_tests) for _, shard_tests in split) == 8
+
+    # by default the numbers calls are placed from are the listening numbers
+    test_runner = ShardedTestRunner(shards=shards, twilio_phone_number=PhoneNumberPool(LISTENING_NUMBERS[:2]))
+    split = test_runner._split(tests, TestRunner.INBOUND)
+    assert [config.inbound_numbers for config, _ in split] == [[number] for number in LISTENING_NUMBERS[:2]]
+
+def test_call_limits_are_shared_across_shards(make_tests):
+    shards = [Shard(port=8000 + i, ngrok_url=f"http://127.0.0.1:{8000 + i}") for i in range(4)]
+    tests = [(test, 0) for test in make_tests(8)]
+
+    # the shares add up to the limit
+    test_runner = ShardedTestRunner(shards=shards, twilio_phone_number="+15550000000", max_concurrent_calls=5, calls_per_second=2)
+    split = test_runner._split(tests)
+    assert [config.max_concurrent_calls for config, _ in split] == [2, 1, 1, 1]
+    assert sum(config.calls_per_second for config, _ in split) == 2
+    assert sum(len(shard_tests) for _, shard_tests in split) == 8
+
+    # with a limit below the number of shards, only that many shards run
+    test_runner = ShardedTestRunner(shards=shards, twilio_phone_number="+15550000000", max_concurrent_calls=3)
+    split = test_runner._split(tests)
+    assert [config.max_concurrent_calls for config, _ in split] == [1, 1, 1]
+    assert sum(len(shard_tests) for _, shard_tests in split) == 8
+
+    # a pool whose numbers can't be shared four ways runs on fewer shards
+    pool = PhoneNumberPool(["+15550000001", "+15550000002"], max_concurrent_calls_per_number=3)
+    test_runner = ShardedTestRunner(shards=shards, twilio_phone_number=pool)
+    split = test_runner._split(tests)
+    assert [config.twilio_phone_number.max_concurrent_calls_per_number for config, _ in split] == [1, 1, 1]
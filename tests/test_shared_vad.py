@@ -0,0 +1,51 @@
+from importlib.metadata import version
+from pathlib import Path
+import re
+
+import numpy as np
+
+from pipecat.audio.vad.silero import SileroVADAnalyzer
+
+from fixa.bot_services import SharedSileroVADAnalyzer, load_silero_model
+
+def audio_frames(count: int, samples: int = 512, seed: int = 0) -> list[bytes]:
+    """
+    Frames of noise that swell and fade, so the model's confidence moves around.
+    """
+    rng = np.random.default_rng(seed)
+    return [
+        (rng.standard_normal(samples) * 8000 * (0.1 + abs(np.sin(i / 5)))).astype(np.int16).tobytes()
+        for i in range(count)
+    ]
+
+def test_pipecat_is_the_pinned_version():
+    # SharedSileroVADAnalyzer depends on SileroVADAnalyzer's internals, so check it again before changing the pin
+    pyproject = (Path(__file__).parent.parent / "pyproject.toml").read_text()
+    pinned = re.search(r'"pipecat-ai\[[^\]]*\]==([^"]+)"', pyproject)
+    assert pinned is not None
+    assert version("pipecat-ai") == pinned.group(1)
+
+def test_shared_analyzer_matches_silero_analyzer():
+    reference = SileroVADAnalyzer()
+    shared = SharedSileroVADAnalyzer(load_silero_model())
+
+    # it sets up everything SileroVADAnalyzer's constructor does
+    assert set(vars(shared)) == set(vars(reference))
+    assert shared.num_frames_required() == reference.num_frames_required()
+
+    # the model is called directly, as voice_confidence turns errors into a confidence of 0
+    for frame in audio_frames(20):
+        samples = np.frombuffer(frame, np.int16).astype(np.float32) / 32768.0
+        assert shared._model(samples, 16000)[0] == reference._model(samples, 16000)[0]
+
+def test_shared_analyzers_keep_their_own_state():
+    model = load_silero_model()
+    first = SharedSileroVADAnalyzer(model)
+    second = SharedSileroVADAnalyzer(model)
+    assert first._model.session is second._model.session is model.session
+
+    # interleaving two calls gives each the confidences it would get on its own
+    first_frames, second_frames = audio_frames(10, seed=1), audio_frames(10, seed=2)
+    interleaved = [(first.voice_confidence(a), second.voice_confidence(b)) for a, b in zip(first_frames, second_frames)]
+    alone = SharedSileroVADAnalyzer(model)
+    assert [a for a, _ in interleaved] == [alone.voice_confidence(frame) for frame in first_frames]
@@ -0,0 +1,26 @@
+from fixa import TestRunner
+from fixa.evaluators import LocalEvaluator
+from fixa.testing import SimulatedCallScript, create_openai_stub_app, create_openai_stub_client
+
+async def test_simulated_carrier(simulated_carrier, make_tests):
+    carrier = await simulated_carrier(SimulatedCallScript(turns=2, speech_seconds=0.6, silence_seconds=3, response_delay_seconds=0.3))
+
+    test_runner = TestRunner(
+        port=carrier.port,
+        ngrok_url=carrier.server_url,
+        twilio_phone_number="+15550000000",
+        evaluator=LocalEvaluator(client=create_openai_stub_client(create_openai_stub_app())),
+    )
+    for test in make_tests(3):
+        test_runner.add_test(test)
+
+    test_results = await test_runner.run_tests(phone_number="+15551111111", type=TestRunner.OUTBOUND)
+
+    assert len(test_results) == 3
+    for result in test_results:
+        assert result.error is None, result.error
+        assert any(m["role"] == "user" for m in result.transcript)
+        assert result.evaluation_results is not None
+        assert result.timings is not None and result.timings.outbound_to_connect is not None
+        assert result.timings.response_latency_p50 is not None
+    assert all(call.media_frames_received > 0 for call in carrier.completed_calls)
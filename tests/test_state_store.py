@@ -0,0 +1,63 @@
+import os
+import tempfile
+
+from fixa import Agent, Scenario, Evaluation
+from fixa.metrics import CallTimings, TurnTimings
+from fixa.test_runner.state import CallStateStore, InMemoryCallStateStore, SQLiteCallStateStore
+
+def check_store(store: CallStateStore):
+    scenario = Scenario(name="order_donut", prompt="order a dozen donuts", evaluations=[Evaluation(name="order_success", prompt="the order was successful")])
+    agent = Agent(name="jessica", prompt="you are a young woman named jessica")
+
+    store.add_call("CA1", scenario, agent, run_id="run_a")
+    store.add_call("CA2", scenario, agent, run_id="run_b")
+    assert store.get_pair("CA1") == (scenario, agent)
+    assert store.active_calls() == 2
+
+    cursor = store.cursor
+    store.set_status("CA1", "in_progress")
+    store.set_status("CA2", "in_progress")
+    store.set_status("CA1", "completed", transcript=[{"role": "user", "content": "hi"}], connected=True)
+    assert store.cursor == cursor + 3
+    assert store.get_status("CA1")["connected"] and not store.get_status("CA2")["connected"]
+    assert list(store.statuses()) == ["CA2", "CA1"]
+    assert list(store.statuses("run_a")) == ["CA1"]
+
+    new_cursor, changes = store.changes(cursor + 2, run_id="run_a")
+    assert new_cursor == cursor + 3
+    assert list(changes) == ["CA1"] and changes["CA1"]["transcript"] == [{"role": "user", "content": "hi"}]
+    assert store.changes(cursor + 3)[1] == {}
+
+    store.set_timings("CA1", CallTimings(outbound_to_connect=0.5, turns=[TurnTimings(total=0.8)]))
+    timings = store.get_timings("CA1")
+    assert timings is not None and timings.outbound_to_connect == 0.5 and timings.turns[0].total == 0.8
+
+    store.remove_pair("CA1")
+    assert store.get_pair("CA1") is None and store.active_calls() == 1
+
+    # Ending a run drops all of its calls and nothing else
+    store.end_run("run_a")
+    assert store.get_status("CA1") is None and store.get_timings("CA1") is None
+    assert store.get_status("CA2") is not None
+
+    # Finished calls left behind are evicted once they are older than the ttl
+    store.remove_pair("CA2")
+    store.set_status("CA2", "error", error="agent failed to start")
+    store.finished_call_ttl = -1
+    store.evict_stale()
+    assert store.statuses() == {}
+
+async def test_state_store():
+    check_store(InMemoryCallStateStore())
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.db")
+        check_store(SQLiteCallStateStore(path))
+
+        # Stores opened on the same database share state and versions
+        first, second = SQLiteCallStateStore(path), SQLiteCallStateStore(path)
+        cursor = first.cursor
+        first.set_status("CA3", "in_progress")
+        assert second.get_status("CA3") is not None
+        second.set_status("CA3", "completed")
+        assert first.changes(cursor)[1]["CA3"]["status"] == "completed"
+        assert first.cursor == second.cursor == cursor + 2
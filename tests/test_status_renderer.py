@@ -0,0 +1,37 @@
+import asyncio
+import io
+import json
+
+from fixa.test_runner.renderer import JsonLinesStatusRenderer, TtyStatusRenderer
+
+async def test_status_renderer():
+    phases = {"ringing": 2, "connected": 0, "done": 0}
+    failed = 0
+    counts = lambda: (dict(phases), failed)
+
+    # json lines are only written when progress changed, plus a final line
+    stream = io.StringIO()
+    renderer = JsonLinesStatusRenderer(interval=0.05, stream=stream, name="ci")
+    renderer.start(4, counts)
+    await asyncio.sleep(0.2)
+    phases.update(ringing=0, connected=1, done=1)
+    await asyncio.sleep(0.2)
+    renderer.log("hello")
+    await renderer.stop()
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert all(record["name"] == "ci" for record in records)
+    assert [record["event"] for record in records] == ["start", "progress", "progress", "log", "finish"]
+    assert records[1]["phases"]["pending"] == 2 and records[1]["done"] == 0
+    assert records[-1]["done"] == 1 and records[-1]["calls_per_minute"] > 0 and records[-1]["eta_seconds"] > 0
+
+    # the terminal renderer redraws one line
+    stream = io.StringIO()
+    renderer = TtyStatusRenderer(interval=0.05, stream=stream)
+    renderer.start(4, counts)
+    await asyncio.sleep(0.12)
+    await renderer.stop()
+    output = stream.getvalue()
+    assert "Running 4 tests" in output
+    assert "\r\033[K📞 1/4 done (0 failed) | pending 2 · connected 1" in output
+    assert output.endswith("\n")
@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from fixa import TestRunner
+from fixa.test_runner import server
+from fixa.test_runner.events import CallStatusChannel
+from fixa.test_runner.state import InMemoryCallStateStore
+
+@pytest.fixture
+def state_store():
+    """
+    Gives the server an empty in-memory state store, putting the previous one back afterwards.
+    """
+    previous = server.get_state_store()
+    store = InMemoryCallStateStore()
+    server.set_state_store(store)
+    try:
+        yield store
+    finally:
+        server.set_state_store(previous)
+
+async def read_events(lines, count: int):
+    events = []
+    async for line in lines:
+        if line.startswith("data: "):
+            events.append(json.loads(line[len("data: "):]))
+            if len(events) == count:
+                return events
+    raise AssertionError(f"Stream ended after {len(events)} events")
+
+async def test_status_stream(simulated_carrier, state_store, make_tests):
+    test = make_tests(1)[0]
+    state_store.add_call("CA-stream", test.scenario, test.agent)
+    server.set_call_status("CA-stream", "in_progress")
+
+    carrier = await simulated_carrier()
+    async with TestRunner(port=carrier.port, ngrok_url=carrier.server_url, twilio_phone_number="+15550000000"):
+        async with httpx.AsyncClient(timeout=5) as client:
+            async with client.stream("GET", f"http://127.0.0.1:{carrier.port}/status/stream") as response:
+                assert response.status_code == 200
+                assert response.headers["content-type"].startswith("text/event-stream")
+                lines = response.aiter_lines()
+
+                # the stream starts with the current status of every call
+                [snapshot] = await asyncio.wait_for(read_events(lines, 1), timeout=5)
+                assert snapshot["call_id"] == "CA-stream" and snapshot["status"]["status"] == "in_progress"
+
+                # then sends each change as it happens
+                server.set_call_status("CA-stream", "completed", transcript=[{"role": "user", "content": "hi"}])
+                [change] = await asyncio.wait_for(read_events(lines, 1), timeout=5)
+                assert change["call_id"] == "CA-stream"
+                assert change["status"]["status"] == "completed"
+                assert change["status"]["transcript"] == [{"role": "user", "content": "hi"}]
+                assert change["status"]["version"] > snapshot["status"]["version"]
+
+                # a client that falls too far behind has its stream ended, rather than holding up the server
+                for _ in range(server.status_channel.max_pending_events + 1):
+                    server.set_call_status("CA-stream", "completed")
+                remaining = [line async for line in lines if line.startswith("data: ")]
+                assert remaining == []
+
+async def test_slow_subscribers_are_dropped(state_store, make_tests):
+    test = make_tests(1)[0]
+    state_store.add_call("CA-slow", test.scenario, test.agent)
+    channel = CallStatusChannel(max_pending_events=3)
+    reader = channel.subscribe()
+    stalled = channel.subscribe()
+    closed = channel.subscribe()
+    channel.unsubscribe(closed)
+
+    # publishing never waits, even on a subscriber that stopped reading
+    received = []
+    for _ in range(10):
+        channel.publish("CA-slow", state_store.set_status("CA-slow", "in_progress"))
+        received.append(reader.get_nowait())
+
+    assert [event.status["version"] for event in received] == list(range(1, 11))
+    # the stalled subscriber is dropped, its unread events replaced by the None that ends its stream
+    assert channel.is_subscribed(reader) and not channel.is_subscribed(stalled)
+    assert stalled.qsize() == 1 and stalled.get_nowait() is None
+    # and an unsubscribed one gets nothing more
+    assert not channel.is_subscribed(closed) and closed.empty()
+
+async def test_status_route(state_store, make_tests):
+    first, second = make_tests(2)
+    state_store.add_call("CA-1", first.scenario, first.agent, run_id="run-a")
+    state_store.add_call("CA-2", second.scenario, second.agent, run_id="run-b")
+    server.set_call_status("CA-1", "in_progress")
+    server.set_call_status("CA-2", "in_progress")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://runner") as client:
+        # without a cursor, every call's full status
+        statuses = (await client.get("/status")).json()
+        assert list(statuses) == ["CA-1", "CA-2"]
+        assert list((await client.get("/status", params={"run_id": "run-a"})).json()) == ["CA-1"]
+
+        first_page = (await client.get("/status", params={"since": 0})).json()
+        assert list(first_page["calls"]) == ["CA-1", "CA-2"]
+
+        # the returned cursor gets only the calls that changed since
+        transcript = [{"role": "user", "content": "a dozen donuts please"}]
+        server.set_call_status("CA-2", "completed", transcript=transcript)
+        second_page = (await client.get("/status", params={"since": first_page["cursor"]})).json()
+        assert list(second_page["calls"]) == ["CA-2"] and second_page["cursor"] > first_page["cursor"]
+        assert second_page["calls"]["CA-2"]["status"] == "completed"
+        # leaving the transcript out unless it's asked for
+        assert "transcript" not in second_page["calls"]["CA-2"]
+        with_transcript = (await client.get("/status", params={"since": first_page["cursor"], "include_transcript": "true"})).json()
+        assert with_transcript["calls"]["CA-2"]["transcript"] == transcript
+
+        # and nothing once caught up
+        assert (await client.get("/status", params={"since": second_page["cursor"]})).json() == {"cursor": second_page["cursor"], "calls": {}}
+
+        # run_id narrows the changes to one run's calls
+        server.set_call_status("CA-1", "completed")
+        assert (await client.get("/status", params={"since": 0, "run_id": "run-b"})).json()["calls"].keys() == {"CA-2"}
+        assert list((await client.get("/status", params={"since": second_page["cursor"], "run_id": "run-a"})).json()["calls"]) == ["CA-1"]
+        assert (await client.get("/status", params={"since": second_page["cursor"], "run_id": "run-b"})).json()["calls"] == {}
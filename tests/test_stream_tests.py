@@ -0,0 +1,45 @@
+import time
+
+from fixa import TestRunner
+from fixa.evaluators import LocalEvaluator
+from fixa.testing import SimulatedCallScript, create_openai_stub_app, create_openai_stub_client
+
+async def test_stream_tests(simulated_carrier, make_tests):
+    carrier = await simulated_carrier(SimulatedCallScript(turns=1, speech_seconds=0.6, silence_seconds=3))
+
+    # one call at a time, so that the calls finish one after another
+    test_runner = TestRunner(
+        port=carrier.port,
+        ngrok_url=carrier.server_url,
+        twilio_phone_number="+15550000000",
+        evaluator=LocalEvaluator(client=create_openai_stub_client(create_openai_stub_app())),
+        max_concurrent_calls=1,
+    )
+    for test in make_tests(3):
+        test_runner.add_test(test)
+
+    received_at = []
+    test_results = []
+    async for result in test_runner.stream_tests(phone_number="+15551111111"):
+        received_at.append(time.monotonic())
+        test_results.append(result)
+
+    assert len(test_results) == 3
+    for result in test_results:
+        assert result.error is None, result.error
+        assert result.evaluation_results is not None
+    # each result arrives as soon as its own call is done
+    assert received_at[1] - received_at[0] > 2 and received_at[2] - received_at[1] > 2
+
+async def test_run_tests_keeps_the_order_tests_were_added(simulated_carrier, make_tests):
+    carrier = await simulated_carrier(SimulatedCallScript(turns=1, speech_seconds=0.6, silence_seconds=1))
+
+    test_runner = TestRunner(port=carrier.port, ngrok_url=carrier.server_url, twilio_phone_number="+15550000000", max_concurrent_calls=1)
+    tests = make_tests(3)
+    # the first call is placed straight away, and the others by priority, so they finish in the order 0, 2, 1
+    for test, priority in zip(tests, [0, 0, 1]):
+        test_runner.add_test(test, priority)
+
+    test_results = await test_runner.run_tests(phone_number="+15551111111")
+
+    assert [result.test.agent.name for result in test_results] == [test.agent.name for test in tests]
@@ -0,0 +1,54 @@
+import asyncio
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+from fixa.telephony import run_twilio_request
+
+async def test_twilio_requests_run_off_the_event_loop():
+    started = threading.Semaphore(0)
+    release = threading.Event()
+    def create(**kwargs):
+        # a Twilio request that blocks until the test lets it finish
+        started.release()
+        release.wait(timeout=5)
+        return threading.current_thread().name, kwargs
+
+    requests = [asyncio.create_task(run_twilio_request(create, to=f"+1555000000{i}")) for i in range(3)]
+    # the requests all get a thread at once
+    for _ in requests:
+        assert await asyncio.to_thread(started.acquire, timeout=5)
+
+    # and the event loop keeps running while they block
+    ticks = 0
+    start = time.monotonic()
+    while time.monotonic() - start < 0.2:
+        await asyncio.sleep(0.01)
+        ticks += 1
+    assert ticks >= 10, ticks
+    assert not any(request.done() for request in requests)
+
+    release.set()
+    results = await asyncio.wait_for(asyncio.gather(*requests), timeout=5)
+    assert [kwargs for _, kwargs in results] == [{"to": f"+1555000000{i}"} for i in range(3)]
+    assert all(name.startswith("fixa-twilio") for name, _ in results), results
+
+def test_twilio_thread_pool_shuts_down_with_the_process():
+    script = textwrap.dedent("""
+        import asyncio
+        import threading
+        from fixa.telephony import run_twilio_request
+
+        async def main():
+            names = await asyncio.gather(*(run_twilio_request(lambda: threading.current_thread().name) for _ in range(4)))
+            assert all(name.startswith("fixa-twilio") for name in names), names
+
+        asyncio.run(main())
+        print("done")
+    """)
+    # the pool's idle threads don't keep the interpreter from exiting
+    process = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=30)
+    assert process.returncode == 0, process.stderr
+    assert process.stdout.strip() == "done"